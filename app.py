@@ -1,46 +1,150 @@
-import streamlit as st
-import pandas as pd
-
-from nba_sim.data_csv import get_team_list, get_roster
-from nba_sim.team_model import Team
-from nba_sim.possession_engine import simulate_game
-
-st.title("NBA Simulator")
-
-# --- Sidebar: pick teams & season ---
-teams_df = get_team_list()
-team_names = teams_df['team_name'].tolist()
-
-season = st.sidebar.number_input("Season (year)", min_value=1947, max_value=2100, value=2023)
-home_team = st.sidebar.selectbox("Home team", team_names)
-away_team = st.sidebar.selectbox("Away team", team_names, index=1)
-
-# Fetch the rosters for the selected season
-home_id = teams_df.loc[teams_df.team_name == home_team, "team_id"].iloc[0]
-away_id = teams_df.loc[teams_df.team_name == away_team, "team_id"].iloc[0]
-
-home_roster_df = get_roster(home_id, season)
-away_roster_df = get_roster(away_id, season)
-
-home_names = home_roster_df['display_first_last'].tolist()
-away_names = away_roster_df['display_first_last'].tolist()
-
-# Pick your starters & bench
-home_start = st.sidebar.multiselect("Home starters (5)", home_names, default=home_names[:5])
-home_bench = st.sidebar.multiselect("Home bench", [n for n in home_names if n not in home_start])
-
-away_start = st.sidebar.multiselect("Away starters (5)", away_names, default=away_names[:5])
-away_bench = st.sidebar.multiselect("Away bench", [n for n in away_names if n not in away_start])
-
-# Run simulation
-def run_sim():
-    home = Team(home_id, season, starters=home_start, bench=home_bench)
-    away = Team(away_id, season, starters=away_start, bench=away_bench)
-    events = simulate_game(home, away)
-
-    st.subheader("Play-by-Play")
-    for ev in events:
-        st.write(ev)
-
-if st.button("Run Simulation"):
-    run_sim()
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from nba_sim.data_csv import data_version, get_team_list, get_roster
+from nba_sim.team_model import get_team
+from nba_sim.possession_engine import compile_teams, simulate_game, simulate_matchups
+
+# Games simulated per background step; progress is reported between steps
+SIM_BATCH = 250
+# Background simulations running at once for the whole server
+SIM_WORKERS = 2
+
+
+# --- Data layer: loaded once per server process, shared by every session ---
+# The data version is part of each cache key, so changed data files are reloaded
+
+@st.cache_data(show_spinner=False)
+def load_team_list(version) -> pd.DataFrame:
+    return get_team_list()
+
+
+@st.cache_data(show_spinner=False)
+def load_roster_names(team_id: int, season: int, version) -> list:
+    return get_roster(team_id, season)['display_first_last'].tolist()
+
+
+@st.cache_resource
+def sim_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=SIM_WORKERS, thread_name_prefix="nba-sim")
+
+
+class SimulationJob:
+    """
+    A background simulation of n games; `progress` is read by the UI while it
+    runs, waking through `wait` after each batch and when the job ends.
+    """
+
+    def __init__(self, home_key: tuple, away_key: tuple, n_games: int, seed=None):
+        self.home_key, self.away_key = home_key, away_key
+        self.n_games = n_games
+        self.seed = seed
+        self.done_games = 0
+        self._changed = threading.Event()
+        self.future = sim_executor().submit(self._run)
+        self.future.add_done_callback(lambda _: self._changed.set())
+
+    def wait(self, timeout=None) -> bool:
+        """Block until the next batch is simulated or the job ends."""
+        changed = self._changed.wait(timeout)
+        self._changed.clear()
+        return changed
+
+    @property
+    def progress(self) -> float:
+        return self.done_games / max(1, self.n_games)
+
+    def _run(self) -> dict:
+        # Teams come from the process-wide cache, built off the request thread
+        home, away = get_team(*self.home_key), get_team(*self.away_key)
+        compiled = compile_teams([home, away])
+        rng = np.random.default_rng(self.seed)
+        scores, box = [], None
+        while self.done_games < self.n_games:
+            n = min(SIM_BATCH, self.n_games - self.done_games)
+            batch = simulate_matchups(compiled, np.zeros(n, np.intp), np.ones(n, np.intp), seed=rng)
+            scores.append(np.stack([batch.home_score, batch.away_score], axis=1))
+            part = batch.box_score().set_index(['team', 'player']) * n
+            box = part if box is None else box + part
+            self.done_games += n
+            self._changed.set()
+        box_pbp = simulate_game(home, away, seed=rng)
+        return {
+            'scores': pd.DataFrame(np.concatenate(scores), columns=['home', 'away']),
+            'box_score': (box / self.n_games).reset_index(),
+            'sample_game': box_pbp,
+        }
+
+
+def show_results(result: dict, home_name: str, away_name: str):
+    scores = result['scores']
+    margin = scores['home'] - scores['away']
+    c1, c2, c3 = st.columns(3)
+    c1.metric(f"{home_name} win %", f"{(margin > 0).mean():.1%}")
+    c2.metric("Mean score", f"{scores['home'].mean():.1f} - {scores['away'].mean():.1f}")
+    c3.metric("Games simulated", f"{len(scores):,}")
+
+    st.subheader("Home margin distribution")
+    st.bar_chart(margin.value_counts().sort_index())
+
+    st.subheader("Per-game player means")
+    st.dataframe(result['box_score'].round(1), hide_index=True)
+
+    _, pbp = result['sample_game']
+    with st.expander("One sampled game: play-by-play"):
+        st.dataframe(pbp, hide_index=True)
+
+
+st.title("NBA Simulator")
+
+# --- Sidebar: pick teams & season ---
+version = data_version()
+teams_df = load_team_list(version)
+team_names = teams_df['team_name'].tolist()
+
+season = int(st.sidebar.number_input("Season (year)", min_value=1947, max_value=2100, value=2023))
+home_team = st.sidebar.selectbox("Home team", team_names)
+away_team = st.sidebar.selectbox("Away team", team_names, index=1)
+
+# Fetch the rosters for the selected season
+home_id = int(teams_df.loc[teams_df.team_name == home_team, "team_id"].iloc[0])
+away_id = int(teams_df.loc[teams_df.team_name == away_team, "team_id"].iloc[0])
+
+home_names = load_roster_names(home_id, season, version)
+away_names = load_roster_names(away_id, season, version)
+
+# Pick your starters & bench
+home_start = st.sidebar.multiselect("Home starters (5)", home_names, default=home_names[:5])
+home_bench = st.sidebar.multiselect("Home bench", [n for n in home_names if n not in home_start])
+
+away_start = st.sidebar.multiselect("Away starters (5)", away_names, default=away_names[:5])
+away_bench = st.sidebar.multiselect("Away bench", [n for n in away_names if n not in away_start])
+
+n_games = int(st.sidebar.number_input("Games to simulate", min_value=1, max_value=100_000, value=2_000, step=500))
+
+# Run simulation in the background; each session keeps its own job
+if st.button("Run Simulation"):
+    st.session_state['job'] = SimulationJob(
+        (home_id, season, tuple(home_start), tuple(home_bench)),
+        (away_id, season, tuple(away_start), tuple(away_bench)),
+        n_games,
+    )
+    st.session_state['labels'] = (home_team, away_team)
+
+job = st.session_state.get('job')
+if job is not None:
+    if not job.future.done():
+        bar = st.progress(0.0, text="Simulating…")
+        while not job.future.done():
+            bar.progress(job.progress, text=f"Simulating… {job.done_games:,} / {job.n_games:,} games")
+            job.wait()
+        bar.empty()
+    error = job.future.exception()
+    if error is not None:
+        st.error(f"Simulation failed: {error}")
+    else:
+        show_results(job.future.result(), *st.session_state['labels'])
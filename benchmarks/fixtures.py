@@ -0,0 +1,199 @@
+"""
+Synthetic data directory for the benchmarks: the same files and columns as data/,
+generated from a seed so every run (and every machine) measures the same input.
+
+Two seasons are written:
+  - RICH_SEASON: every player's common_player_info row lists his current team,
+    so rosters come straight from the career spans;
+  - SPARSE_SEASON: most players have no team in common_player_info, so
+    get_roster falls back to scanning that season's play-by-play.
+
+Usage:
+    python benchmarks/fixtures.py OUT_DIR [--teams 30] [--games 20] [--seed 0]
+"""
+import argparse
+import gzip
+import json
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RICH_SEASON = 2022
+SPARSE_SEASON = 1999
+
+TEAMS = 30
+PLAYERS_PER_TEAM = 15
+GAMES_PER_TEAM = 20
+EVENTS_PER_GAME = 420
+# Share of sparse-season players whose common_player_info row has a team
+SPARSE_LISTED = 0.3
+
+MANIFEST_NAME = 'fixtures.json'
+
+_PBP_COLUMNS = [
+    'game_id', 'eventnum', 'eventmsgtype', 'eventmsgactiontype', 'period', 'wctimestring',
+    'pctimestring', 'homedescription', 'neutraldescription', 'visitordescription', 'score',
+    'scoremargin', 'person1type', 'player1_id', 'player1_name', 'player1_team_id',
+    'player1_team_city', 'player1_team_nickname', 'player1_team_abbreviation', 'person2type',
+    'player2_id', 'player2_name', 'player2_team_id', 'player2_team_city', 'player2_team_nickname',
+    'player2_team_abbreviation', 'person3type', 'player3_id', 'player3_name', 'player3_team_id',
+    'player3_team_city', 'player3_team_nickname', 'player3_team_abbreviation',
+    'video_available_flag', 'season_id',
+]
+_POSITIONS = ['Guard', 'Guard', 'Guard-Forward', 'Forward', 'Forward', 'Forward-Center', 'Center']
+
+
+def _teams(n_teams: int) -> pd.DataFrame:
+    ids = 1610612737 + np.arange(n_teams)
+    return pd.DataFrame({
+        'id': ids,
+        'full_name': [f"City{i} Team{i}" for i in range(n_teams)],
+        'abbreviation': [f"T{i:02d}" for i in range(n_teams)],
+        'nickname': [f"Team{i}" for i in range(n_teams)],
+        'city': [f"City{i}" for i in range(n_teams)],
+        'state': 'State',
+        'year_founded': 1970.0,
+    })
+
+
+def _players(rng, team_ids, season, first_pid, listed_share) -> pd.DataFrame:
+    n = len(team_ids) * PLAYERS_PER_TEAM
+    pid = first_pid + np.arange(n)
+    team = np.repeat(team_ids, PLAYERS_PER_TEAM)
+    listed = rng.random(n) < listed_share
+    start = season - rng.integers(0, 8, n)
+    born = [f"{season - 20 - rng.integers(0, 15)}-{rng.integers(1, 13):02d}-{rng.integers(1, 29):02d}"
+            for _ in range(n)]
+    inches = rng.integers(73, 86, n)
+    return pd.DataFrame({
+        'person_id': pid,
+        'first_name': [f"First{p}" for p in pid],
+        'last_name': [f"Last{p}" for p in pid],
+        'display_first_last': [f"First{p} Last{p}" for p in pid],
+        'birthdate': [f"{b} 00:00:00" for b in born],
+        'height': [f"{h // 12}-{h % 12}" for h in inches],
+        'position': [_POSITIONS[i] for i in rng.integers(0, len(_POSITIONS), n)],
+        'team_id': np.where(listed, team, 0),
+        'from_year': start.astype(float),
+        'to_year': (season + rng.integers(0, 3, n)).astype(float),
+        # Team the player actually appears for in the play-by-play
+        '_plays_for': team,
+    })
+
+
+def _schedule(rng, team_ids, season, games_per_team) -> pd.DataFrame:
+    n_games = len(team_ids) * games_per_team // 2
+    home = rng.integers(0, len(team_ids), n_games)
+    away = (home + rng.integers(1, len(team_ids), n_games)) % len(team_ids)
+    yy = season % 100
+    return pd.DataFrame({
+        'season_id': 20000 + season,
+        'team_id_home': team_ids[home],
+        'game_id': 20000000 + yy * 100000 + np.arange(1, n_games + 1),
+        'game_date': pd.Timestamp(season, 11, 1) + pd.to_timedelta(np.arange(n_games) // 8, unit='D'),
+        'team_id_away': team_ids[away],
+    })
+
+
+def _play_by_play(rng, games: pd.DataFrame, players: pd.DataFrame) -> pd.DataFrame:
+    """EVENTS_PER_GAME events per game: shots, rebounds, turnovers and fouls."""
+    by_team = {t: g['person_id'].to_numpy() for t, g in players.groupby('_plays_for')}
+    names = dict(zip(players['person_id'], players['display_first_last']))
+    frames = []
+    for gid, home, away in zip(games['game_id'], games['team_id_home'], games['team_id_away']):
+        n = EVENTS_PER_GAME
+        side = rng.integers(0, 2, n)                      # 0 = home
+        team = np.where(side == 0, home, away)
+        roster = np.stack([by_team[home], by_team[away]])
+        pid = roster[side, rng.integers(0, PLAYERS_PER_TEAM, n)]
+        msg = rng.choice([1, 2, 4, 5, 6], n, p=[0.2, 0.25, 0.3, 0.1, 0.15])
+        three = (msg <= 2) & (rng.random(n) < 0.35)
+        pts = np.where(msg == 1, np.where(three, 3, 2), 0)
+        home_pts = np.cumsum(np.where(side == 0, pts, 0))
+        away_pts = np.cumsum(np.where(side == 1, pts, 0))
+        text = np.where(three, 'Jump Shot 3PT', 'Jump Shot')
+        text = np.where(msg == 4, 'REBOUND', np.where(msg == 5, 'Turnover', np.where(msg == 6, 'Foul', text)))
+        period = 1 + np.arange(n) * 4 // n
+        remaining = 720 - (np.arange(n) % (n // 4)) * 720 // (n // 4)
+        frames.append(pd.DataFrame({
+            'game_id': gid,
+            'eventnum': np.arange(1, n + 1),
+            'eventmsgtype': msg,
+            'eventmsgactiontype': 1,
+            'period': period,
+            'pctimestring': [f"{s // 60}:{s % 60:02d}" for s in remaining],
+            'homedescription': np.where(side == 0, text, ''),
+            'visitordescription': np.where(side == 1, text, ''),
+            'score': np.where(msg == 1, [f"{a} - {h}" for a, h in zip(away_pts, home_pts)], ''),
+            'person1type': np.where(side == 0, 4.0, 5.0),
+            'player1_id': pid,
+            'player1_name': [names[p] for p in pid],
+            'player1_team_id': team.astype(float),
+            'video_available_flag': 1,
+        }))
+    pbp = pd.concat(frames, ignore_index=True).reindex(columns=_PBP_COLUMNS)
+    pbp['season_id'] = games['season_id'].iloc[0]
+    return pbp
+
+
+def build(directory, n_teams: int = TEAMS, games_per_team: int = GAMES_PER_TEAM, seed: int = 0) -> Path:
+    """
+    Write the fixture data directory (idempotent: an existing directory built
+    with the same parameters is reused). Returns its path.
+    """
+    directory = Path(directory)
+    params = {'teams': n_teams, 'games_per_team': games_per_team, 'seed': seed,
+              'rich_season': RICH_SEASON, 'sparse_season': SPARSE_SEASON}
+    manifest = directory / MANIFEST_NAME
+    if manifest.exists() and json.loads(manifest.read_text()) == params:
+        return directory
+    directory.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    teams = _teams(n_teams)
+    team_ids = teams['id'].to_numpy()
+    rich = _players(rng, team_ids, RICH_SEASON, 1_000_000, 1.0)
+    sparse = _players(rng, team_ids, SPARSE_SEASON, 2_000_000, SPARSE_LISTED)
+    schedules = {s: _schedule(rng, team_ids, s, games_per_team) for s in (RICH_SEASON, SPARSE_SEASON)}
+    pbps = {s: _play_by_play(rng, schedules[s], p)
+            for s, p in ((RICH_SEASON, rich), (SPARSE_SEASON, sparse))}
+
+    teams.to_csv(directory / 'team.csv', index=False)
+    info = pd.concat([rich, sparse], ignore_index=True).drop(columns='_plays_for')
+    info.to_csv(directory / 'common_player_info.csv', index=False)
+    games = pd.concat(schedules.values(), ignore_index=True)
+    games.to_csv(directory / 'game.csv', index=False)
+    pd.DataFrame({'game_id': games['game_id'], 'team_id_home': games['team_id_home'],
+                  'team_id_away': games['team_id_away']}).to_csv(directory / 'line_score.csv', index=False)
+    # Inactive listings are not season-scoped, so the fixture leaves them empty
+    pd.DataFrame(columns=['game_id', 'player_id', 'team_id']).to_csv(
+        directory / 'inactive_players.csv', index=False)
+
+    with sqlite3.connect(directory / 'nba.sqlite') as con:
+        con.execute('DROP TABLE IF EXISTS play_by_play')
+        for season, pbp in pbps.items():
+            key = f"2{season}"
+            with gzip.open(directory / f"play_by_play_{key}.csv.gz", 'wt', compresslevel=1) as f:
+                pbp.to_csv(f, index=False)
+            pbp[['game_id', 'eventmsgtype', 'player1_id', 'season_id']].to_sql(
+                'play_by_play', con, if_exists='append', index=False)
+        # The index StatsProvider.build_index creates (nba_sim is not imported here: it reads the data dir on import)
+        con.execute('CREATE INDEX IF NOT EXISTS idx_pbp_player_season_msg '
+                    'ON play_by_play (player1_id, season_id, eventmsgtype, game_id)')
+    manifest.write_text(json.dumps(params))
+    return directory
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write the synthetic benchmark data directory.")
+    parser.add_argument("out", type=Path)
+    parser.add_argument("--teams", type=int, default=TEAMS)
+    parser.add_argument("--games", type=int, default=GAMES_PER_TEAM, help="games per team and season")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    print(build(args.out, args.teams, args.games, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness: data loading, roster building and simulation throughput.
+
+Every benchmark runs against the synthetic data directory of fixtures.py
+(built once under benchmarks/.fixtures), which the package is pointed at
+through NBA_SIM_DATA_DIR, so results do not depend on the local data/ or the
+network. Each benchmark reports the min / median wall time over its repeats,
+items per second where it processes several items, and the peak traced
+memory (tracemalloc) of one extra run. Import benchmarks run in a fresh
+interpreter; "cold" ones start without the column cache.
+
+Results are written as JSON (default benchmarks/results/<commit>.json) and
+two result files can be compared:
+
+Usage:
+    python benchmarks/run.py [--only NAME ...] [--repeats 5] [--out FILE]
+        [--fixtures DIR] [--teams 30] [--games 20] [--seed 0]
+    python benchmarks/run.py --compare BASE.json [HEAD.json] [--threshold 0.1]
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+BENCH_DIR = ROOT / "benchmarks"
+FIXTURES_DIR = BENCH_DIR / ".fixtures"
+RESULTS_DIR = BENCH_DIR / "results"
+
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(BENCH_DIR))
+import fixtures  # noqa: E402
+
+REPEATS = 5
+# Relative slowdown of the median reported as a regression by --compare
+THRESHOLD = 0.10
+BATCH_SIZES = (1, 100, 10_000)
+
+# Run in a fresh interpreter: import data_csv, then build the first roster
+_IMPORT_SNIPPET = """
+import json, time, tracemalloc
+tracemalloc.start()
+t0 = time.perf_counter()
+import nba_sim.data_csv as data_csv
+t1 = time.perf_counter()
+data_csv.get_roster(data_csv.get_team_list()['team_id'].iloc[0], {season})
+t2 = time.perf_counter()
+print(json.dumps({{'import': t1 - t0, 'first_roster': t2 - t1,
+                   'peak': tracemalloc.get_traced_memory()[1]}}))
+"""
+
+
+def measure(fn, repeats: int, setup=None, items: int = 1) -> dict:
+    """Time fn() `repeats` times (setup() runs untimed before each), then trace one run's peak memory."""
+    times = []
+    for _ in range(repeats):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    median = statistics.median(times)
+    return {
+        "repeats": repeats,
+        "min_s": min(times),
+        "median_s": median,
+        "items": items,
+        "items_per_s": items / median if median > 0 else None,
+        "peak_bytes": peak,
+    }
+
+
+def _import_runs(data_dir: Path, cold: bool, repeats: int) -> dict:
+    env = {**os.environ, "NBA_SIM_DATA_DIR": str(data_dir), "PYTHONPATH": str(ROOT)}
+    snippet = _IMPORT_SNIPPET.format(season=fixtures.RICH_SEASON)
+    runs = []
+    for _ in range(repeats):
+        if cold:
+            shutil.rmtree(data_dir / ".cache", ignore_errors=True)
+        out = subprocess.run([sys.executable, "-c", snippet], env=env, cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    results = {}
+    for part in ("import", "first_roster"):
+        times = [r[part] for r in runs]
+        results[part] = {"repeats": repeats, "min_s": min(times), "median_s": statistics.median(times),
+                         "items": 1, "items_per_s": None, "peak_bytes": max(r["peak"] for r in runs)}
+    return results
+
+
+def run_benchmarks(data_dir: Path, repeats: int = REPEATS, only=None) -> dict:
+    """Run every benchmark whose name contains one of `only` (all if None)."""
+    def wanted(name):
+        return not only or any(o in name for o in only)
+
+    results = {}
+
+    def record(name, result):
+        results[name] = result
+        rate = f", {result['items_per_s']:,.0f}/s" if result["items"] > 1 else ""
+        print(f"  {name:<40} {result['median_s'] * 1e3:10.2f} ms{rate}"
+              f"  peak {result['peak_bytes'] / 1e6:.1f} MB", flush=True)
+
+    for cold in (True, False):
+        label = "cold" if cold else "warm"
+        if wanted(f"import_data_csv[{label}]") or wanted(f"first_roster[{label}]"):
+            parts = _import_runs(data_dir, cold, repeats)
+            record(f"import_data_csv[{label}]", parts["import"])
+            record(f"first_roster[{label}]", parts["first_roster"])
+
+    # The package reads NBA_SIM_DATA_DIR at import time
+    os.environ["NBA_SIM_DATA_DIR"] = str(data_dir)
+    from nba_sim import data_csv
+    from nba_sim.possession_engine import simulate_game, simulate_games
+    from nba_sim.team_model import Team
+    from nba_sim.utils.stats_utils import stats_provider
+    if Path(data_csv.data_dir) != data_dir.resolve():
+        raise SystemExit("nba_sim was imported before the fixture directory was set")
+
+    team_ids = data_csv.get_team_list()["team_id"].tolist()
+    seasons = {"rich": fixtures.RICH_SEASON, "sparse": fixtures.SPARSE_SEASON}
+
+    for kind, season in seasons.items():
+        name = f"get_roster[{kind},cold]"
+        if wanted(name):
+            record(name, measure(lambda: data_csv.get_roster(team_ids[0], season), repeats,
+                                 setup=data_csv.reload_tables))
+        name = f"get_roster[{kind},warm]"
+        if wanted(name):
+            data_csv.get_roster(team_ids[0], season)
+            record(name, measure(lambda: [data_csv.get_roster(t, season) for t in team_ids], repeats,
+                                 items=len(team_ids)))
+
+    for kind, season in seasons.items():
+        name = f"team_build[{kind}]"
+        if wanted(name):
+            Team(team_ids[0], season)
+            record(name, measure(lambda: Team(team_ids[1], season), repeats))
+
+    info = data_csv.get_roster(team_ids[0], fixtures.RICH_SEASON)
+    pids = data_csv._table("_common_player_info_df")["person_id"].astype(int).tolist()
+    season = fixtures.RICH_SEASON
+    name = "stats_provider.get_player_stats[cold]"
+    if wanted(name):
+        record(name, measure(lambda: stats_provider.get_player_stats(pids[0], season), repeats,
+                             setup=stats_provider.ratings.clear))
+    name = "stats_provider.get_player_stats[warm]"
+    if wanted(name):
+        stats_provider.get_player_stats(pids[0], season)
+        record(name, measure(lambda: [stats_provider.get_player_stats(p, season) for p in pids],
+                             repeats, items=len(pids)))
+    name = "stats_provider.get_many[roster]"
+    if wanted(name):
+        roster_ids = info["person_id"].astype(int).tolist()
+        stats_provider.get_many(roster_ids, season)
+        record(name, measure(lambda: stats_provider.get_many(roster_ids, season), repeats,
+                             items=len(roster_ids)))
+
+    if any(wanted(f"simulate_game[{n}]") for n in BATCH_SIZES):
+        home, away = Team(team_ids[0], season), Team(team_ids[1], season)
+        for n in BATCH_SIZES:
+            name = f"simulate_game[{n}]"
+            if not wanted(name):
+                continue
+            # One game goes through simulate_game (with its play-by-play), batches through simulate_games
+            fn = (lambda: simulate_game(home, away)) if n == 1 else (lambda n=n: simulate_games(home, away, n))
+            record(name, measure(fn, min(repeats, 3) if n >= 10_000 else repeats, items=n))
+    return results
+
+
+def _git(*args) -> str:
+    try:
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def metadata(params: dict, repeats: int) -> dict:
+    import numpy as np
+    import pandas as pd
+    return {
+        "commit": _git("rev-parse", "HEAD") or None,
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "repeats": repeats,
+        "fixtures": params,
+    }
+
+
+def compare(base: dict, head: dict, threshold: float = THRESHOLD) -> list:
+    """Print median times side by side; return the names that slowed down by more than `threshold`."""
+    regressions = []
+    print(f"{'benchmark':<40} {'base ms':>10} {'head ms':>10} {'ratio':>7}")
+    for name in sorted(set(base["results"]) | set(head["results"])):
+        b, h = base["results"].get(name), head["results"].get(name)
+        if b is None or h is None:
+            cells = ["-" if r is None else f"{r['median_s'] * 1e3:.2f}" for r in (b, h)]
+            print(f"{name:<40} {cells[0]:>10} {cells[1]:>10}")
+            continue
+        ratio = h["median_s"] / b["median_s"] if b["median_s"] > 0 else float("inf")
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  slower"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            flag = "  faster"
+        print(f"{name:<40} {b['median_s'] * 1e3:10.2f} {h['median_s'] * 1e3:10.2f} {ratio:7.2f}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the nba_sim benchmarks on synthetic fixtures.")
+    parser.add_argument("--only", nargs="*", help="run benchmarks whose name contains any of these")
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--out", type=Path, help="result file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES_DIR)
+    parser.add_argument("--teams", type=int, default=fixtures.TEAMS)
+    parser.add_argument("--games", type=int, default=fixtures.GAMES_PER_TEAM)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--compare", nargs="+", type=Path, metavar="JSON",
+                        help="compare BASE [HEAD] result files instead of running (HEAD: a fresh run)")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args(argv)
+
+    if args.compare and len(args.compare) > 2:
+        parser.error("--compare takes BASE and at most one HEAD file")
+    if args.compare and len(args.compare) == 2:
+        base, head = (json.loads(p.read_text()) for p in args.compare)
+        return 1 if compare(base, head, args.threshold) else 0
+
+    params = {"teams": args.teams, "games_per_team": args.games, "seed": args.seed}
+    print(f"Building fixtures in {args.fixtures}…", flush=True)
+    data_dir = fixtures.build(args.fixtures, args.teams, args.games, args.seed)
+    print("Running benchmarks…", flush=True)
+    results = run_benchmarks(data_dir, args.repeats, args.only)
+    report = {"meta": metadata(params, args.repeats), "results": results}
+
+    out = args.out or RESULTS_DIR / f"{(report['meta']['commit'] or 'unknown')[:10]}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {out}")
+    if args.compare:
+        base = json.loads(args.compare[0].read_text())
+        return 1 if compare(base, report, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,32 +1,224 @@
 # nba_sim/calibration.py
+"""
+Tune the engine factors (see possession_engine.DEFAULT_FACTORS) against real games.
+
+Targets are historical games that have both play-by-play (final score) and an
+other_stats.csv row (team ids, total turnovers). Every trial simulates each
+target game a few times at a time, with increasing fidelity (FIDELITIES sims
+per game); after each rung the trial reports its loss so the pruner can stop
+unpromising factor sets early. Trials run in worker processes that share one
+optuna study in a local journal (or SQLite) storage, so an interrupted
+calibration resumes where it stopped.
+"""
 import json
-from nba_sim.main import play_game  # Added import for play_game
+import math
+import os
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import optuna
+import pandas as pd
+
 import nba_sim.weights as W
+from nba_sim import data_csv
+from nba_sim.possession_engine import DEFAULT_FACTORS, compile_teams, simulate_matchups
+from nba_sim.team_model import get_team
+from nba_sim.utils import precompute
+from nba_sim.utils.pool import SHARED, shared_pool
+
+# (low, high) search range per factor
+SEARCH_SPACE = {
+    'pace': (90.0, 110.0),
+    'turnover_rate': (0.09, 0.17),
+    'ft_trip_rate': (0.07, 0.15),
+    'ft_pct': (0.70, 0.82),
+    'oreb_rate': (0.18, 0.36),
+    'home_advantage': (0.0, 0.04),
+    'shot_scale': (0.85, 1.15),
+}
+
+# Simulations per game at each rung; pruning decisions are made between rungs
+FIDELITIES = (4, 16, 64)
 
+# Turnover error is weighted against points error (turnovers vary ~3x less)
+TURNOVER_WEIGHT = 3.0
 
-def calibrate(game_id: int, config: dict) -> dict:
+# Final scores below this are treated as incomplete play-by-play
+MIN_POINTS = 60
+
+STUDY_NAME = 'nba-sim-factors'
+DEFAULT_STORAGE = os.path.join(data_csv.data_dir, '.cache', 'calibration.journal')
+_OTHER_STATS_CSV = os.path.join(data_csv.data_dir, 'other_stats.csv')
+
+def load_targets(n_games: Optional[int] = 200, seasons: Optional[Sequence[int]] = None,
+                 seed=None) -> pd.DataFrame:
     """
-    Run a single simulation against provided game config to calibrate parameters.
+    Historical games to calibrate against: game_id, season, team_id_home,
+    team_id_away, pts_home, pts_away, tov_home, tov_away (NaN if unknown).
+    Games against non-NBA clubs or with an incomplete log are left out, and a
+    random sample of `n_games` is drawn when more are available.
+    """
+    # Final scores per game, precomputed once per season file
+    if seasons is None:
+        games = data_csv.precomputed.aggregate(precompute.GAMES)
+    else:
+        games = data_csv.precomputed.partitions(precompute.GAMES, seasons)
+    scores = games[['game_id', 'season', 'pts_home', 'pts_away']].dropna()
+    other = pd.read_csv(_OTHER_STATS_CSV, usecols=[
+        'game_id', 'team_id_home', 'team_id_away', 'total_turnovers_home', 'total_turnovers_away',
+    ]).drop_duplicates('game_id')
+    other['game_id'] = other['game_id'].astype(np.int64)
+    targets = scores.merge(other, on='game_id').rename(columns={
+        'total_turnovers_home': 'tov_home', 'total_turnovers_away': 'tov_away',
+    })
+    # Only NBA franchises have rosters; very low scores mark truncated play-by-play logs
+    nba = data_csv.get_team_list()['team_id'].to_numpy()
+    targets = targets[
+        targets['team_id_home'].isin(nba) & targets['team_id_away'].isin(nba)
+        & (targets[['pts_home', 'pts_away']].min(axis=1) >= MIN_POINTS)
+    ]
+    if n_games is not None and len(targets) > n_games:
+        targets = targets.sample(n=n_games, random_state=np.random.default_rng(seed))
+    return targets.sort_values('game_id', ignore_index=True)[[
+        'game_id', 'season', 'team_id_home', 'team_id_away', 'pts_home', 'pts_away', 'tov_home', 'tov_away',
+    ]]
+
+
+def prepare(targets: pd.DataFrame, teams: Optional[Dict[tuple, object]] = None) -> dict:
+    """
+    Build and compile every (team_id, season) in the targets once.
+    `teams` maps (team_id, season) to prebuilt Teams (default: get_team).
+    """
+    home = list(zip(targets['team_id_home'].astype(int), targets['season'].astype(int)))
+    away = list(zip(targets['team_id_away'].astype(int), targets['season'].astype(int)))
+    keys = sorted(set(home) | set(away))
+    teams = teams or {}
+    built = [teams[k] if k in teams else get_team(*k) for k in keys]
+    slot = {k: i for i, k in enumerate(keys)}
+    return {
+        'compiled': compile_teams(built),
+        'home_idx': np.array([slot[k] for k in home], dtype=np.intp),
+        'away_idx': np.array([slot[k] for k in away], dtype=np.intp),
+        'points': targets[['pts_home', 'pts_away']].to_numpy(dtype=float),
+        'turnovers': targets[['tov_home', 'tov_away']].to_numpy(dtype=float),
+    }
+
+
+def evaluate(prepared: dict, factors: dict, n_sims: int, seed=None) -> float:
+    """
+    Loss of one factor set: RMSE of the mean simulated points per team and game,
+    plus TURNOVER_WEIGHT x the turnover RMSE over games with known turnovers.
+    """
+    n = len(prepared['home_idx'])
+    batch = simulate_matchups(
+        prepared['compiled'],
+        np.repeat(prepared['home_idx'], n_sims), np.repeat(prepared['away_idx'], n_sims),
+        seed=seed, factors=factors,
+    )
+    points = np.stack([batch.home_score, batch.away_score], axis=1).reshape(n, n_sims, 2).mean(axis=1)
+    turnovers = batch.stats['turnovers'].sum(axis=2).reshape(n, n_sims, 2).mean(axis=1)
+    loss = math.sqrt(np.mean((points - prepared['points']) ** 2))
+    known = ~np.isnan(prepared['turnovers'])
+    if known.any():
+        loss += TURNOVER_WEIGHT * math.sqrt(np.mean((turnovers[known] - prepared['turnovers'][known]) ** 2))
+    return float(loss)
+
+
+def _objective(trial: optuna.Trial) -> float:
+    factors = {k: trial.suggest_float(k, lo, hi) for k, (lo, hi) in SEARCH_SPACE.items()}
+    loss = math.inf
+    for step, n_sims in enumerate(SHARED['fidelities']):
+        # Same seed for every trial: factor sets are compared on common random numbers
+        loss = evaluate(SHARED['prepared'], factors, n_sims, seed=SHARED['seed'])
+        trial.report(loss, step)
+        if trial.should_prune():
+            raise optuna.TrialPruned()
+    return loss
+
+
+def _storage(storage):
+    """A storage URL is used as-is, a *.db / *.sqlite path becomes SQLite, anything else a journal file."""
+    if '://' in storage:
+        return storage
+    if storage.endswith(('.db', '.sqlite', '.sqlite3')):
+        return f"sqlite:///{os.path.abspath(storage)}"
+    os.makedirs(os.path.dirname(os.path.abspath(storage)), exist_ok=True)
+    return optuna.storages.JournalStorage(optuna.storages.journal.JournalFileBackend(storage))
+
+
+def _load_study(storage, study_name, seed):
+    return optuna.create_study(
+        study_name=study_name, storage=_storage(storage), direction='minimize', load_if_exists=True,
+        sampler=optuna.samplers.TPESampler(seed=seed),
+        pruner=optuna.pruners.MedianPruner(n_startup_trials=5),
+    )
+
+
+def _run_worker(task) -> int:
+    """Run trials in one process until the study holds `n_trials` finished trials."""
+    storage, study_name, n_trials, worker_seed = task
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    study = _load_study(storage, study_name, worker_seed)
+    finished = (optuna.trial.TrialState.COMPLETE, optuna.trial.TrialState.PRUNED)
+    if len(study.get_trials(deepcopy=False, states=finished)) < n_trials:
+        study.optimize(_objective, callbacks=[optuna.study.MaxTrialsCallback(n_trials, states=finished)])
+    return os.getpid()
+
+
+def calibrate(n_trials: int = 100, workers: Optional[int] = None, *,
+              n_games: Optional[int] = 200,
+              seasons: Optional[Sequence[int]] = None,
+              storage: str = DEFAULT_STORAGE,
+              study_name: str = STUDY_NAME,
+              fidelities: Sequence[int] = FIDELITIES,
+              seed: int = 0,
+              targets: Optional[pd.DataFrame] = None,
+              teams: Optional[Dict[tuple, object]] = None,
+              save: bool = False) -> optuna.Study:
+    """
+    Tune the engine factors against historical games.
 
     Args:
-        game_id: ID of the real NBA game to calibrate against.
-        config: Configuration dict with teams, rosters, etc.
+        n_trials: finished (complete or pruned) trials the study should hold;
+            trials from earlier runs in the same storage count toward it (parallel
+            workers may finish up to workers - 1 extra trials)
+        workers: worker processes (default: all cores; 1 runs in-process)
+        n_games: target games sampled by load_targets (None: all)
+        seasons: season years to draw games from (default: all)
+        storage: journal file, SQLite file (*.db) or storage URL
+        study_name: optuna study name within the storage
+        fidelities: simulations per game at each pruning rung
+        seed: seeds the game sample, the samplers and the simulations
+        targets: explicit target games (see load_targets) instead of sampling
+        teams: prebuilt Teams by (team_id, season)
+        save: write the best factors to factors.json (see nba_sim.weights)
 
     Returns:
-        A dict containing simulation results and applied weight values.
+        The optuna study; study.best_params holds the tuned factors
     """
-    # Perform the game simulation
-    sim_output = play_game(game_id, config)
+    if targets is None:
+        targets = load_targets(n_games, seasons, seed)
+    shared = {'prepared': prepare(targets, teams), 'fidelities': tuple(fidelities), 'seed': seed}
+    workers = workers or os.cpu_count() or 1
+    tasks = [(storage, study_name, n_trials, seed + i) for i in range(workers)]
+    # Create the study once so workers do not race to create it
+    study = _load_study(storage, study_name, seed)
 
-    # Retrieve saved calibration weights
-    # Use W.load() instead of non-existent W.get_weights()
-    weights_used = W.load()
+    with shared_pool(shared, workers) as pool:
+        if pool is None:
+            _run_worker(tasks[0])
+        else:
+            pool.map(_run_worker, tasks)
 
-    # Return combined calibration output
-    return {
-        'sim_output': sim_output,
-        'weights_used': weights_used,
-    }
+    if save:
+        W.save({**W.load(), **study.best_params})
+    return study
+
+
+def default_loss(targets: Optional[pd.DataFrame] = None, n_sims: int = FIDELITIES[-1], seed: int = 0) -> float:
+    """Loss of DEFAULT_FACTORS, as a baseline for calibrated factors."""
+    prepared = prepare(targets if targets is not None else load_targets(seed=seed))
+    return evaluate(prepared, DEFAULT_FACTORS, n_sims, seed=seed)
 
 # Optionally, you can add JSON I/O helpers if needed:
 
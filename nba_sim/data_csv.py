@@ -1,102 +1,663 @@
 import os
 import glob
+import threading
+from collections import OrderedDict
+import numpy as np
 import pandas as pd
 
+from nba_sim.utils import column_cache
+from nba_sim.utils import pbp_features
+from nba_sim.utils import precompute
+from nba_sim.utils import instrumentation as instr
+
+# NBA_SIM_DATA_DIR points the package at another data directory (e.g. benchmark fixtures)
 data_dir = os.path.abspath(
-    os.path.join(os.path.dirname(__file__), '..', 'data')
+    os.environ.get('NBA_SIM_DATA_DIR') or os.path.join(os.path.dirname(__file__), '..', 'data')
 )
 
-# Load core tables
+# Core tables
 _team_csv = os.path.join(data_dir, 'team.csv')
 _game_csv = os.path.join(data_dir, 'game.csv')
 _line_score_csv = os.path.join(data_dir, 'line_score.csv')
 _common_player_info_csv = os.path.join(data_dir, 'common_player_info.csv')
 _inactive_players_csv = os.path.join(data_dir, 'inactive_players.csv')
 
-_team_df = pd.read_csv(_team_csv)
-_game_df = pd.read_csv(_game_csv)
-_line_score_df = pd.read_csv(_line_score_csv)
-_common_player_info_df = pd.read_csv(_common_player_info_csv)
-_inactive_players_df = pd.read_csv(_inactive_players_csv)
-
-# Load all play-by-play gzip files with low_memory to suppress dtype warnings
-_pbp_files = glob.glob(os.path.join(data_dir, 'play_by_play_*.csv.gz'))
-_pbp_df = pd.concat(
-    (pd.read_csv(f, compression='gzip', low_memory=False) for f in _pbp_files),
-    ignore_index=True
-)
-# Expose for in-memory access
-pbp_df = _pbp_df
+# Module attribute -> source CSV. Tables are read on first use through the
+# column cache; assigning the attribute (e.g. in tests) replaces the table.
+_TABLES = {
+    '_team_df': _team_csv,
+    '_game_df': _game_csv,
+    '_line_score_df': _line_score_csv,
+    '_common_player_info_df': _common_player_info_csv,
+    '_inactive_players_df': _inactive_players_csv,
+}
+_table_lock = threading.Lock()
+
+
+def _table(name):
+    """Return a core table, loading it through the column cache on first use."""
+    df = globals().get(name)
+    if df is None:
+        with _table_lock:
+            df = globals().get(name)
+            if df is None:
+                with instr.timer('data_csv.load_table'):
+                    df = column_cache.read_csv(_TABLES[name], low_memory=False)
+                instr.count('data_csv.rows_loaded', len(df))
+                globals()[name] = df
+    return df
+
+
+# Bumped by reload_tables so caches built on the tables can tell they are stale
+_generation = 0
+
+
+def reload_tables():
+    """Forget loaded core tables and play-by-play seasons so the next access rereads them."""
+    global _generation
+    for name in _TABLES:
+        globals().pop(name, None)
+    _indexes.clear()
+    pbp_store.clear()
+    precomputed.clear()
+    _generation += 1
+
+
+def data_generation() -> int:
+    """Counter bumped by every reload_tables call; cheap, unlike data_version()."""
+    return _generation
+
+
+def data_version():
+    """
+    Token that changes whenever reload_tables runs or a core table / play-by-play
+    file is added, removed or modified on disk (size and mtime).
+    """
+    paths = list(_TABLES.values()) + sorted(
+        glob.glob(os.path.join(pbp_store.directory, f'{_PBP_PREFIX}*{_PBP_SUFFIX}'))
+    )
+    signature = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            signature.append((path, None))
+        else:
+            signature.append((path, st.st_size, st.st_mtime_ns))
+    return _generation, tuple(signature)
 
 MIN_ROSTER_SIZE = 8
 
+# Upper bound on the memory held by loaded play-by-play seasons
+PBP_CACHE_BYTES = 1 << 30
+
+_PBP_PREFIX = 'play_by_play_'
+_PBP_SUFFIX = '.csv.gz'
+
+# Helper: map a game_id to its play-by-play season key
+
+def season_key_for_game(game_id):
+    """
+    Return the play-by-play season key (e.g. '42022') for an NBA game_id.
+    Game ids look like 0042200161: season type digit, two-digit year, game number.
+    Returns None for ids that do not follow that layout (e.g. simulated games).
+    """
+    try:
+        gid = str(int(game_id)).zfill(10)
+    except (TypeError, ValueError):
+        return None
+    if len(gid) != 10:
+        return None
+    yy = int(gid[3:5])
+    century = '19' if yy >= 46 else '20'
+    return f"{gid[2]}{century}{gid[3:5]}"
+
+# Play-by-play schema: applied once when a season file is parsed, before it is cached
+
+PBP_SCHEMA_VERSION = 1
+
+# Free text: only loaded when a caller asks for it
+DESCRIPTION_COLUMNS = ('homedescription', 'neutraldescription', 'visitordescription')
+
+# Integer width of id / code columns (nullable Int* where a file has gaps)
+_PBP_INTS = {
+    'game_id': 'int32', 'eventnum': 'int16', 'eventmsgtype': 'int8', 'eventmsgactiontype': 'int16',
+    'period': 'int8', 'video_available_flag': 'int8', 'season_id': 'int32',
+    **{f'person{i}type': 'int8' for i in (1, 2, 3)},
+    **{f'player{i}_id': 'int32' for i in (1, 2, 3)},
+    **{f'player{i}_team_id': 'int32' for i in (1, 2, 3)},
+}
+
+
+def clock_seconds(clock) -> np.ndarray:
+    """Seconds left in the period (int16) from 'MM:SS' game clocks; -1 where missing or malformed."""
+    cat = pd.Categorical(clock)
+    parts = pd.Series(cat.categories.astype(str)).str.extract(r'^(\d+):(\d{2})$')
+    secs = pd.to_numeric(parts[0]) * 60 + pd.to_numeric(parts[1])
+    # Code -1 (missing) picks the trailing -1
+    lookup = np.append(secs.fillna(-1).to_numpy(dtype=np.int16), np.int16(-1))
+    return lookup[cat.codes]
+
+
+def compact_pbp(df):
+    """
+    Compact dtypes for a parsed play-by-play frame: narrow integers for ids and
+    codes (int32 team / player ids instead of 1610612745.0 floats), categoricals
+    for repeated strings (names, team cities and nicknames, clocks, scores) and
+    `clock_seconds` parsed from pctimestring. Description text is left as is.
+    """
+    out = {}
+    for col in df.columns:
+        values = df[col]
+        if col in _PBP_INTS:
+            num = pd.to_numeric(values, errors='coerce')
+            width = _PBP_INTS[col]
+            out[col] = num.astype(width if num.notna().all() else width.capitalize())
+        elif col in DESCRIPTION_COLUMNS or values.dtype.kind in 'biufcmM':
+            out[col] = values
+        else:
+            out[col] = values.astype('category')
+    if 'pctimestring' in df.columns:
+        out['clock_seconds'] = clock_seconds(df['pctimestring'])
+    return pd.DataFrame(out)
+
+
+# Recorded with every cached season file and everything derived from it
+PBP_CACHE_TAG = f'pbp-schema-{PBP_SCHEMA_VERSION}-features-{pbp_features.FEATURES_VERSION}'
+
+
+def _prepare_pbp(df):
+    return pbp_features.add_features(compact_pbp(df))
+
+
+def read_play_by_play(path, columns=None, exclude=()):
+    """
+    Read one play-by-play file through the column cache, in the compact schema
+    and with the derived event features of pbp_features.
+    """
+    return column_cache.read_csv(
+        path, columns=columns, exclude=exclude, compression='gzip', low_memory=False,
+        transform=_prepare_pbp, transform_tag=PBP_CACHE_TAG,
+    )
+
+# Helper: group play-by-play rows by game
+
+def _game_index(gids):
+    """
+    Return (order, game_ids, starts, stops): row range [start, stop) of each game
+    once the rows are taken in `order`, with game_ids sorted for searchsorted
+    lookups. Season files are already grouped by game, so `order` is usually
+    None and only the small run table gets sorted.
+    """
+    if len(gids) == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return None, empty, empty, empty
+    row_order = None
+    starts = np.flatnonzero(np.r_[True, gids[1:] != gids[:-1]])
+    run_ids = gids[starts]
+    if len(np.unique(run_ids)) != len(run_ids):
+        # A game is split across the file: regroup the rows once
+        row_order = np.argsort(gids, kind='stable')
+        gids = gids[row_order]
+        starts = np.flatnonzero(np.r_[True, gids[1:] != gids[:-1]])
+        run_ids = gids[starts]
+    stops = np.r_[starts[1:], len(gids)]
+    order = np.argsort(run_ids, kind='stable')
+    return row_order, run_ids[order], starts[order], stops[order]
+
+
+def _game_ids_array(game_ids):
+    """Coerce game ids (ints or zero-padded strings) to int64, dropping unparsable ones."""
+    out = []
+    for gid in game_ids:
+        try:
+            out.append(int(gid))
+        except (TypeError, ValueError):
+            continue
+    return np.asarray(out, dtype=np.int64)
+
+# Lazy play-by-play store
+
+class PlayByPlayStore:
+    """
+    Loads play_by_play_<season>.csv.gz files on demand, keyed by the season
+    part of the file name (e.g. '12013', '32019', '42022'), in the compact
+    schema of compact_pbp.
+    Only the columns callers ask for are read: `columns=None` means every
+    column except the descriptions, which are loaded on request
+    (`descriptions=True` or by naming them). Columns asked for later are read
+    into the already loaded season.
+    Loaded seasons are kept in an LRU bounded by max_bytes, together with a
+    game_id -> row range index built once per season.
+    """
+
+    schema_tag = PBP_CACHE_TAG
+
+    def __init__(self, directory, max_bytes=PBP_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._files = None
+        self._frames = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.RLock()
+
+    @property
+    def files(self):
+        """Dict of season key -> file path, discovered on first use."""
+        if self._files is None:
+            pattern = os.path.join(self.directory, f'{_PBP_PREFIX}*{_PBP_SUFFIX}')
+            self._files = {
+                os.path.basename(f)[len(_PBP_PREFIX):-len(_PBP_SUFFIX)]: f
+                for f in glob.glob(pattern)
+            }
+        return self._files
+
+    def seasons(self):
+        """Return all available season keys, sorted."""
+        return sorted(self.files)
+
+    def season_keys(self, season):
+        """Return the season keys (preseason, all-star, playoffs, ...) for a season year."""
+        season = str(int(season))
+        return [k for k in self.seasons() if k[1:] == season]
+
+    def _entry(self, key, columns=None, descriptions=False):
+        """The loaded season entry, reading whatever requested columns it still lacks."""
+        key = str(key)
+        with self._lock:
+            entry = self._frames.get(key)
+            if entry is not None:
+                self._frames.move_to_end(key)
+                instr.count('data_csv.pbp_cache_hits')
+        if entry is None:
+            if key not in self.files:
+                raise KeyError(f"No play-by-play file for season key: {key}")
+            instr.count('data_csv.pbp_cache_misses')
+            with instr.timer('data_csv.load_pbp'):
+                if columns is None:
+                    skip = () if descriptions else DESCRIPTION_COLUMNS
+                    df = read_play_by_play(self.files[key], exclude=skip)
+                else:
+                    df = read_play_by_play(self.files[key], columns=['game_id', *columns])
+                row_order, ids, starts, stops = _game_index(df['game_id'].to_numpy())
+                if row_order is not None:
+                    df = df.take(row_order).reset_index(drop=True)
+            instr.count('data_csv.pbp_rows_loaded', len(df))
+            entry = {'df': df, 'row_order': row_order, 'index': (ids, starts, stops),
+                     'complete': columns is None, 'descriptions': columns is None and descriptions}
+            with self._lock:
+                self._frames[key] = entry
+                self._resize(key)
+                self._evict()
+            return entry
+        self._extend(key, entry, columns, descriptions)
+        return entry
+
+    def _extend(self, key, entry, columns, descriptions):
+        df = entry['df']
+        if columns is None:
+            if entry['complete'] and (entry['descriptions'] or not descriptions):
+                return
+            skip = set(df.columns) | (set() if descriptions else set(DESCRIPTION_COLUMNS))
+            extra = read_play_by_play(self.files[key], exclude=skip)
+        else:
+            missing = [c for c in columns if c not in df.columns]
+            if not missing:
+                return
+            extra = read_play_by_play(self.files[key], columns=missing)
+        if entry['row_order'] is not None:
+            extra = extra.take(entry['row_order']).reset_index(drop=True)
+        with self._lock:
+            df = entry['df']
+            df = pd.concat([df, extra[[c for c in extra.columns if c not in df.columns]]], axis=1)
+            # Keep file column order however the columns were requested
+            names = column_cache.column_names(self.files[key]) or list(df.columns)
+            entry['df'] = df[[c for c in names if c in df.columns]]
+            if columns is None:
+                entry['complete'] = True
+                entry['descriptions'] = entry['descriptions'] or descriptions
+            if key in self._frames:
+                self._resize(key)
+                self._evict()
+
+    def load(self, key, columns=None, descriptions=False):
+        """
+        Return the play-by-play DataFrame for one season key, reading it if needed:
+        `columns` in that order, or every column but the descriptions (plus them
+        if `descriptions`).
+        """
+        df = self._entry(key, columns, descriptions)['df']
+        if columns is not None:
+            return df[list(columns)]
+        if descriptions:
+            return df
+        return df[[c for c in df.columns if c not in DESCRIPTION_COLUMNS]]
+
+    def game_ids(self, key):
+        """Return the sorted game_ids present in one season file."""
+        return self._entry(key, ['game_id'])['index'][0]
+
+    def rows(self, key, game_ids):
+        """
+        Return row positions in season `key` for the given game_ids, game by game
+        in request order. Unknown game_ids are skipped.
+        """
+        ids, starts, stops = self._entry(key, ['game_id'])['index']
+        wanted = _game_ids_array(game_ids)
+        wanted = wanted[np.isin(wanted, ids)]
+        pos = np.searchsorted(ids, wanted)
+        lo, hi = starts[pos], stops[pos]
+        lengths = hi - lo
+        # arange over all games at once: offset each run by its start
+        shift = np.repeat(lo - np.r_[0, np.cumsum(lengths)[:-1]], lengths)
+        return np.arange(int(lengths.sum()), dtype=np.int64) + shift
+
+    def events(self, key, game_ids, columns=None, descriptions=False):
+        """Return the events of many games in one season file as a single DataFrame."""
+        df = self.load(key, columns, descriptions)
+        return df.take(self.rows(key, game_ids)).reset_index(drop=True)
+
+    def frame(self, keys=None, columns=None, descriptions=False):
+        """Return one concatenated DataFrame for the given season keys (all if None)."""
+        keys = self.seasons() if keys is None else [str(k) for k in keys]
+        frames = [self.load(k, columns, descriptions) for k in keys]
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+    def loaded(self):
+        """Return the season keys currently held in memory, least recently used first."""
+        with self._lock:
+            return list(self._frames)
+
+    def memory_usage(self):
+        """Return the bytes held by loaded seasons."""
+        with self._lock:
+            return sum(self._sizes.values())
+
+    def clear(self):
+        """Drop all loaded seasons, their indexes and the discovered files."""
+        with self._lock:
+            self._frames.clear()
+            self._sizes.clear()
+            self._files = None
+
+    def _resize(self, key):
+        self._sizes[key] = int(self._frames[key]['df'].memory_usage(deep=True).sum())
+
+    def _evict(self):
+        # Always keep the most recently loaded season, even if it alone exceeds the budget
+        while len(self._frames) > 1 and sum(self._sizes.values()) > self.max_bytes:
+            old, _ = self._frames.popitem(last=False)
+            del self._sizes[old]
+
+
+pbp_store = PlayByPlayStore(data_dir)
+# Products derived from the season files (rosters seen in play-by-play, final scores, ...)
+precomputed = precompute.PrecomputeStore(pbp_store)
+
+
+def __getattr__(name):
+    # Opt-in compatibility view: `pbp_df` concatenates every season on access
+    if name in ('pbp_df', '_pbp_df'):
+        return pbp_store.frame()
+    if name in _TABLES:
+        return _table(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Lookup indexes, built once per loaded table
+
+_indexes = {}
+_index_lock = threading.Lock()
+
+
+def _index(table, build):
+    """
+    Return build(df) for a core table, cached until the table object changes
+    (reload_tables or a reassigned module attribute).
+    """
+    df = _table(table)
+    key = (table, build.__name__)
+    cached = _indexes.get(key)
+    if cached is None or cached[0] is not df:
+        with _index_lock:
+            cached = _indexes.get(key)
+            if cached is None or cached[0] is not df:
+                instr.count('data_csv.index_builds')
+                with instr.timer('data_csv.build_index'):
+                    cached = (df, build(df))
+                _indexes[key] = cached
+    return cached[1]
+
+
+def _team_keys(team_df):
+    """id / abbreviation / full name -> team_id; ids win, then abbreviations, then names."""
+    ids = team_df['id'].astype(int).tolist()
+    keys = {tid: tid for tid in ids}
+    for col in ('abbreviation', 'full_name'):
+        for k, tid in zip(team_df[col], ids):
+            if not pd.isna(k):
+                keys.setdefault(str(k), tid)
+    return keys
+
+
+def _player_index(info):
+    """
+    Indexes over common_player_info:
+      'careers': name -> (sorted from_years, to_years, person_ids, row positions)
+      'rows':    person_id -> row positions
+    """
+    careers, rows = {}, {}
+    pids = info['person_id'].astype(int).tolist()
+    for pos, (name, start, end, pid) in enumerate(
+            zip(info['display_first_last'], info['from_year'], info['to_year'], pids)):
+        rows.setdefault(pid, []).append(pos)
+        if not pd.isna(start) and not pd.isna(end):
+            careers.setdefault(name, []).append((int(start), int(end), pid, pos))
+    for name, spans in careers.items():
+        spans.sort()
+        careers[name] = tuple(np.array(col) for col in zip(*spans))
+    return {'careers': careers, 'rows': rows}
+
+
+def _active_rosters(info):
+    """team_id -> season -> set of person_ids whose career span covers the season."""
+    rosters = {}
+    for tid, start, end, pid in zip(info['team_id'], info['from_year'], info['to_year'], info['person_id']):
+        if pd.isna(tid) or pd.isna(start) or pd.isna(end):
+            continue
+        seasons = rosters.setdefault(int(tid), {})
+        for season in range(int(start), int(end) + 1):
+            seasons.setdefault(season, set()).add(int(pid))
+    return rosters
+
+
+def _inactive_rosters(inactive_df):
+    """team_id -> set of player_ids listed inactive for that team."""
+    rosters = {}
+    for tid, pid in zip(inactive_df['team_id'], inactive_df['player_id']):
+        if not pd.isna(tid) and not pd.isna(pid):
+            rosters.setdefault(int(tid), set()).add(int(pid))
+    return rosters
+
 # Helper: resolve team key to team_id
 
 def _resolve_team_key(key):
+    keys = _index('_team_df', _team_keys)
     # if integer or numeric string
     try:
-        tid = int(key)
-        if tid in _team_df['id'].values:
+        tid = keys.get(int(key))
+        if tid is not None:
             return tid
-    except Exception:
+    except (TypeError, ValueError):
         pass
-    # match by abbreviation
-    match = _team_df[_team_df['abbreviation'] == str(key)]
-    if not match.empty:
-        return int(match['id'].iloc[0])
-    # match by full name
-    match = _team_df[_team_df['full_name'] == str(key)]
-    if not match.empty:
-        return int(match['id'].iloc[0])
+    # match by abbreviation, then full name
+    tid = keys.get(str(key))
+    if tid is not None:
+        return tid
     raise KeyError(f"Unknown team key: {key}")
 
 # Team list
 
 def get_team_list():
     """Return DataFrame with columns ['team_id','team_name','team_abbreviation']."""
-    return _team_df.rename(
+    return _table('_team_df').rename(
         columns={'id': 'team_id', 'full_name': 'team_name', 'abbreviation': 'team_abbreviation'}
     )[['team_id', 'team_name', 'team_abbreviation']]
 
 # Schedule
 
+def _season_mask(season_ids, season):
+    season = int(season)
+    if season >= 10000:
+        return season_ids == season
+    return season_ids % 10000 == season
+
+
 def get_team_schedule(team, season=None):
     """
     Return schedule for a given team (ID, abbreviation, or full name).
     If season is None, returns all seasons; else filters on season_id.
+    `season` may be a full season_id (e.g. 22022) or a year (2022), which
+    matches every season type of that year.
     """
     tid = _resolve_team_key(team)
-    df = _game_df
+    df = _table('_game_df')
     if season is not None:
-        df = df[df['season_id'] == int(season)]
+        df = df[_season_mask(df['season_id'], season)]
     mask = (df['team_id_home'] == tid) | (df['team_id_away'] == tid)
     return df[mask].copy()
 
+def get_season_schedule(season, season_type=2):
+    """
+    Return every game of one season. `season` is a year (2022) or a full
+    season_id (22022); for a year, `season_type` picks the prefix (2 = regular season).
+    """
+    season = int(season)
+    if season < 10000:
+        season = season_type * 10000 + season
+    df = _table('_game_df')
+    return df[df['season_id'] == season].drop_duplicates('game_id').copy()
+
 # Player ID lookup
 
+def _career_match(careers, name, season):
+    spans = careers.get(name)
+    if spans is None:
+        return None
+    starts, ends, pids, rows = spans
+    # Careers starting on or before the season; of those covering it, the first in table order
+    k = np.searchsorted(starts, season, side='right')
+    covering = np.flatnonzero(ends[:k] >= season)
+    if len(covering) == 0:
+        return None
+    return int(pids[covering[np.argmin(rows[covering])]])
+
+
 def get_player_id(name, season):
     """
     Return the person_id for a player matching display_first_last in common_player_info,
     filtering by career span containing season.
     """
+    pid = _career_match(_index('_common_player_info_df', _player_index)['careers'], name, int(season))
+    if pid is None:
+        raise KeyError(f"Player '{name}' not found for season {season}")
+    return pid
+
+
+def get_player_ids(names, season):
+    """
+    Bulk get_player_id: person_ids aligned with `names`, None where a name has
+    no career covering the season.
+    """
+    careers = _index('_common_player_info_df', _player_index)['careers']
     season = int(season)
-    df = _common_player_info_df
-    df_season = df[(df['from_year'] <= season) & (df['to_year'] >= season)]
-    match = df_season[df_season['display_first_last'] == name]
-    if not match.empty:
-        return int(match['person_id'].iloc[0])
-    raise KeyError(f"Player '{name}' not found for season {season}")
+    return [_career_match(careers, name, season) for name in names]
+
+# Player bio
+
+def _height_inches(height):
+    """Parse '6-10' style heights into inches; None if missing or malformed."""
+    try:
+        feet, inches = str(height).split('-')
+        return int(feet) * 12 + int(inches)
+    except ValueError:
+        return None
+
+
+def get_player_bio(person_id, season):
+    """
+    Return {'age', 'position', 'height'} for a player: age on Feb 1 of the given
+    season (mid-season, e.g. 2023-02-01 for season 2022), position as listed in
+    common_player_info (e.g. 'Guard-Forward') and height in inches.
+    Unknown values are None.
+    """
+    info = _table('_common_player_info_df')
+    rows = _index('_common_player_info_df', _player_index)['rows'].get(int(person_id))
+    bio = {'age': None, 'position': None, 'height': None}
+    if not rows:
+        return bio
+    row = info.iloc[rows[0]]
+    born = pd.to_datetime(row.get('birthdate'), errors='coerce')
+    if not pd.isna(born):
+        mid = pd.Timestamp(int(season) + 1, 2, 1)
+        bio['age'] = int(mid.year - born.year - ((mid.month, mid.day) < (born.month, born.day)))
+    position = row.get('position')
+    bio['position'] = position if isinstance(position, str) and position else None
+    bio['height'] = _height_inches(row.get('height'))
+    return bio
+
+
+def get_player_age(person_id, season):
+    """Return a player's mid-season age (see get_player_bio), or None if unknown."""
+    return get_player_bio(person_id, season)['age']
 
 # Play-by-play iterator
 
-def iter_play_by_play(game_id):
-    """Yield each play-by-play event dict for the given game_id."""
-    sub = _pbp_df[_pbp_df['game_id'] == game_id]
-    for _, row in sub.iterrows():
-        yield row.to_dict()
+def iter_play_by_play(game_id, season=None):
+    """
+    Yield each play-by-play event dict for the given game_id.
+    Only the season file the game belongs to is loaded; if the game_id does not
+    encode a season, the files for `season` (a year) are searched instead.
+    """
+    key = season_key_for_game(game_id)
+    if key in pbp_store.files:
+        keys = [key]
+    elif season is not None:
+        keys = pbp_store.season_keys(season)
+    else:
+        keys = []
+    for k in keys:
+        yield from pbp_store.events(k, [game_id], descriptions=True).to_dict('records')
+
+# Batched play-by-play
+
+def get_play_by_play(game_ids, columns=None, descriptions=False):
+    """
+    Return the events of many games as one DataFrame, grouped by game in request order.
+    Each season file is touched once, through its game_id index.
+    `columns` restricts the returned (and loaded) columns; otherwise every
+    column is returned, the description text only if `descriptions`.
+    """
+    by_key = OrderedDict()
+    for gid in game_ids:
+        key = season_key_for_game(gid)
+        if key in pbp_store.files:
+            by_key.setdefault(key, []).append(gid)
+    frames = [pbp_store.events(k, gids, columns, descriptions) for k, gids in by_key.items()]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(frames, ignore_index=True)
+
+
+def get_schedule_play_by_play(team, season, columns=None):
+    """Return every play-by-play event of a team's games in a season in one call."""
+    sched = get_team_schedule(team, season)
+    return get_play_by_play(sched['game_id'], columns=columns)
 
 # Roster fetch
 
+@instr.timed('data_csv.get_roster')
 def get_roster(team, season):
     """
     Return active + inactive roster for a team in a season.
@@ -105,27 +666,26 @@ def get_roster(team, season):
     tid = _resolve_team_key(team)
     season = int(season)
 
+    info = _table('_common_player_info_df')
+
     # Active players by career span
-    active = _common_player_info_df[
-        ( _common_player_info_df['team_id'] == tid ) &
-        ( _common_player_info_df['from_year'] <= season ) &
-        ( _common_player_info_df['to_year'] >= season )
-    ]
+    active = _index('_common_player_info_df', _active_rosters).get(tid, {}).get(season, set())
     # Inactive players (no span, just game entries)
-    inactive = _inactive_players_df[_inactive_players_df['team_id'] == tid]
+    inactive = _index('_inactive_players_df', _inactive_rosters).get(tid, set())
 
-    player_ids = set(active['person_id'].astype(int)) | set(inactive['player_id'].astype(int))
+    player_ids = set(active) | inactive
 
     # Fallback via play-by-play
     if len(player_ids) < MIN_ROSTER_SIZE:
-        sched = get_team_schedule(tid, season)
-        for gid in sched['game_id']:
-            for ev in iter_play_by_play(gid):
-                pid = ev.get('player1_id')
-                if ev.get('player1_team_id') == tid and pid is not None:
-                    player_ids.add(int(pid))
-
-    roster_df = _common_player_info_df[_common_player_info_df['person_id'].isin(player_ids)].copy()
+        instr.count('data_csv.roster_fallbacks')
+        for key in pbp_store.season_keys(season):
+            seen = precomputed.partition(precompute.PBP_ROSTERS, key)
+            instr.count('data_csv.fallback_rows_scanned', len(seen))
+            player_ids.update(seen['player_id'].to_numpy()[seen['team_id'].to_numpy() == tid].tolist())
+
+    rows = _index('_common_player_info_df', _player_index)['rows']
+    positions = sorted(pos for pid in player_ids for pos in rows.get(pid, ()))
+    roster_df = info.iloc[positions].copy()
     return roster_df
 
 # Alias for compatibility
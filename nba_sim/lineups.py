@@ -0,0 +1,177 @@
+"""
+Bulk lineup selection over compact rosters (TeamArrays).
+
+Every five-man unit of a roster is scored at once: the candidate units of an
+n-player roster are the C(n, 5) rows of a cached index table, so scoring many
+rosters is a gather and a sum over a (rosters, units, 5) array.
+
+    unit score = sum of player values - POSITION_PENALTY * missing positions
+
+A player's value is the expected points per shot from the precomputed rating
+columns (two_pct, three_pct, three_prop), scaled by the age multiplier, plus
+REBOUND_WEIGHT * reb_rate. Units are expected to field 2 guards, 2 forwards
+and a center (as roster_utils.lineup_slots picks starters); each missing one
+costs POSITION_PENALTY. Players with a 0-minute cap (out) are never picked.
+
+Rosters are scored in groups of equal size, each against its own unit table,
+so one long roster does not pad the whole batch to its C(n, 5).
+
+The top-k units of a roster share its 48 minutes by a softmax over their
+scores, which gives each player's minutes; minutes above a player's cap are
+handed to teammates with room under theirs.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import combinations
+from typing import List, Sequence
+
+import numpy as np
+
+from nba_sim.team_model import TEAM_MINUTES, team_arrays
+from nba_sim.utils.roster_utils import CENTER, FORWARD, GUARD
+
+UNIT_SIZE = 5
+GAME_MINUTES = TEAM_MINUTES // UNIT_SIZE
+
+TOP_K = 10
+# Softmax temperature of the minute split, in unit-score points
+TEMPERATURE = 0.25
+REBOUND_WEIGHT = 1.0
+POSITION_PENALTY = 0.15
+# Guards, forwards and centers a unit should field
+POSITION_NEEDS = ((GUARD, 2), (FORWARD, 2), (CENTER, 1))
+
+
+@dataclass(frozen=True)
+class Rotation:
+    """
+    Best units of one roster: `units` (k, 5) roster slots, best first (-1 for
+    empty slots of rosters under five), with their `scores`; `minutes` per
+    roster slot (summing to 240 unless caps leave too few players).
+    """
+    units: np.ndarray
+    scores: np.ndarray
+    minutes: np.ndarray
+
+    @property
+    def starters(self) -> np.ndarray:
+        return self.units[0]
+
+    @property
+    def bench(self) -> np.ndarray:
+        """Slots with minutes outside the starting unit, most minutes first."""
+        order = np.argsort(-self.minutes, kind='stable')
+        rest = order[~np.isin(order, self.units[0])]
+        return rest[self.minutes[rest] > 0]
+
+
+# Tables for a few roster sizes; each holds C(n, 5) rows (26k for 22 players)
+@lru_cache(maxsize=8)
+def unit_index(n_players: int, size: int = UNIT_SIZE) -> np.ndarray:
+    """Read-only (C(n, size), size) table of every unit's roster slots."""
+    flat = np.fromiter((i for unit in combinations(range(n_players), size) for i in unit), dtype=np.intp)
+    units = flat.reshape(-1, size)
+    units.setflags(write=False)
+    return units
+
+
+def player_values(arrays) -> np.ndarray:
+    """Per-slot player value (see module docstring); -inf for players capped at 0 minutes."""
+    three_prop = np.asarray(arrays.three_prop)
+    points = (1 - three_prop) * 2 * np.asarray(arrays.two_pct) + three_prop * 3 * np.asarray(arrays.three_pct)
+    value = points * np.asarray(arrays.age_mult) + REBOUND_WEIGHT * np.asarray(arrays.reb_rate)
+    return np.where(np.asarray(arrays.minutes_cap) > 0, value, -np.inf)
+
+
+def score_units(values: np.ndarray, positions: np.ndarray, units: np.ndarray) -> np.ndarray:
+    """
+    Scores of `units` (m, 5 slot indexes) for stacked rosters: `values` and
+    `positions` are (rosters, slots). Returns (rosters, m).
+    """
+    scores = values[:, units].sum(axis=2)
+    unit_pos = positions[:, units]
+    for code, need in POSITION_NEEDS:
+        have = (unit_pos == code).sum(axis=2)
+        scores -= POSITION_PENALTY * np.maximum(0, need - have)
+    return scores
+
+
+def _stack(rosters: Sequence) -> tuple:
+    """Pad rosters (of one size) to at least five slots: values (-inf), positions (-1), caps (0)."""
+    n = max(UNIT_SIZE, max(len(a.two_pct) for a in rosters))
+    values = np.full((len(rosters), n), -np.inf)
+    positions = np.full((len(rosters), n), -1, dtype=np.int8)
+    caps = np.zeros((len(rosters), n))
+    for r, arrays in enumerate(rosters):
+        size = len(arrays.two_pct)
+        values[r, :size] = player_values(arrays)
+        positions[r, :size] = arrays.position
+        caps[r, :size] = arrays.minutes_cap
+    return values, positions, caps
+
+
+def _split_minutes(units: np.ndarray, scores: np.ndarray, caps: np.ndarray,
+                   temperature: float) -> np.ndarray:
+    """(rosters, slots) minutes from the top units' softmax weights, with caps enforced."""
+    n_rosters, k = scores.shape
+    finite = np.isfinite(scores)
+    top = scores.max(axis=1, keepdims=True)
+    top = np.where(np.isfinite(top), top, 0.0)
+    weights = np.exp(np.where(finite, scores - top, -np.inf) / temperature)
+    total = weights.sum(axis=1, keepdims=True)
+    # Rosters without a full available unit: spread over the best candidates
+    weights = np.where(total > 0, weights / np.where(total > 0, total, 1), 1.0 / k)
+
+    minutes = np.zeros(caps.shape)
+    rows = np.repeat(np.arange(n_rosters), k * UNIT_SIZE)
+    np.add.at(minutes, (rows, units.reshape(-1)), np.repeat(weights.reshape(-1) * GAME_MINUTES, UNIT_SIZE))
+
+    # Hand minutes above a cap to teammates with room, in proportion to their room
+    excess = np.maximum(0.0, minutes - caps).sum(axis=1, keepdims=True)
+    minutes = np.minimum(minutes, caps)
+    room = caps - minutes
+    spare = room.sum(axis=1, keepdims=True)
+    share = np.divide(room, spare, out=np.zeros_like(room), where=spare > 0)
+    return minutes + np.minimum(room, excess * share)
+
+
+def _plan_group(rosters: Sequence, k: int, temperature: float) -> List[Rotation]:
+    """plan_rotations for rosters of one size."""
+    values, positions, caps = _stack(rosters)
+    units = unit_index(values.shape[1])
+    scores = score_units(values, positions, units)
+    k = min(k, len(units))
+    best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    best_scores = np.take_along_axis(scores, best, axis=1)
+    order = np.argsort(-best_scores, axis=1, kind='stable')
+    best = np.take_along_axis(best, order, axis=1)
+    best_scores = np.take_along_axis(best_scores, order, axis=1)
+    best_units = units[best]
+    minutes = _split_minutes(best_units, best_scores, caps, temperature)
+    size = len(rosters[0].two_pct)
+    best_units = np.where(best_units < size, best_units, -1)
+    return [
+        Rotation(units=best_units[r], scores=best_scores[r], minutes=minutes[r, :size])
+        for r in range(len(rosters))
+    ]
+
+
+def plan_rotations(rosters: Sequence, k: int = TOP_K, temperature: float = TEMPERATURE) -> List[Rotation]:
+    """
+    Top-k units and minute distributions for many rosters at once. `rosters`
+    are TeamArrays or Team-like objects (see team_model.team_arrays).
+    """
+    rosters = [team_arrays(r) if not hasattr(r, 'two_pct') else r for r in rosters]
+    groups = {}
+    for i, arrays in enumerate(rosters):
+        groups.setdefault(len(arrays.two_pct), []).append(i)
+    out = [None] * len(rosters)
+    for members in groups.values():
+        for i, rotation in zip(members, _plan_group([rosters[i] for i in members], k, temperature)):
+            out[i] = rotation
+    return out
+
+
+def plan_rotation(roster, k: int = TOP_K, temperature: float = TEMPERATURE) -> Rotation:
+    """plan_rotations for a single roster."""
+    return plan_rotations([roster], k, temperature)[0]
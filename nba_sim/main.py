@@ -1,22 +1,315 @@
+# nba_sim/main.py
+"""
+Headless entry points: one game (play_game) and batches of matchups from a job file.
+
+A job file lists matchups to simulate, as JSON (a list of objects, or
+{"jobs": [...]}) or CSV with one row per job:
+
+    id, home, away, season, n_sims, seed,
+    home_starters, home_bench, away_starters, away_bench
+
+`home` / `away` are team ids, abbreviations or full names; lineups are lists
+of player names (';'-separated in CSV) and default to the automatic lineup.
+Starters must name five players; without a bench the rest of the automatic
+lineup comes off it.
+Every distinct team is built once (through the shared team cache) and all
+teams are compiled into one table; jobs are cut into chunks of games that a
+process pool simulates, and each chunk draws from its own SeedSequence child,
+so results do not depend on the worker count.
+
+Usage:
+    python -m nba_sim.main JOBS.json [--out results/] [--workers N] [--seed S]
+        [--format parquet|csv] [--chunk-games 2000]
+"""
+import argparse
+import csv
+import importlib.util
+import json
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
 import pandas as pd
 
+from nba_sim import data_csv
+from nba_sim.possession_engine import compile_teams, load_factors, simulate_game, simulate_matchups
+from nba_sim.team_model import get_team
+from nba_sim.utils.pool import SHARED, shared_pool
+
+# Games simulated per pool task
+CHUNK_GAMES = 2000
+N_SIMS = 1000
+MARGIN_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+_LINEUPS = ('home_starters', 'home_bench', 'away_starters', 'away_bench')
+
+def _team_id(key) -> int:
+    """Team id of an id, abbreviation or full name."""
+    try:
+        return int(key)
+    except (TypeError, ValueError):
+        return data_csv._resolve_team_key(str(key).strip())
+
+
+def _split_lineup(players: Optional[Sequence[str]]):
+    """First five names start, the rest come off the bench; empty means the automatic lineup."""
+    players = list(players or [])
+    if not players:
+        return None, None
+    return players[:5], players[5:]
+
 
 def play_game(home_name: str,
               away_name: str,
               season: int,
               home_players: list[str],
               away_players: list[str],
-              speed: float = 1.0) -> tuple[pd.DataFrame, pd.DataFrame]:
+              speed: float = 1.0,
+              seed=None) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Simulate one game between two teams (ids, abbreviations or full names).
+
+    home_players / away_players list the starters first (five names) and then
+    the bench; an empty list uses the automatic lineup. `speed` is the replay
+    speed of an interactive front end and does not affect the simulation.
+
+    Returns:
+        (box_score_df, pbp_df) as in possession_engine.simulate_game
+    """
+    home = get_team(_team_id(home_name), season, *_split_lineup(home_players))
+    away = get_team(_team_id(away_name), season, *_split_lineup(away_players))
+    return simulate_game(home, away, seed=seed)
+
+
+# Job files
+
+def _names(value) -> Optional[List[str]]:
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, str):
+        value = [v.strip() for v in value.split(';')]
+    names = [str(v) for v in value if str(v)]
+    return names or None
+
+
+def _normalize_job(raw: dict, i: int) -> dict:
+    missing = [k for k in ('home', 'away', 'season') if raw.get(k) in (None, '')]
+    if missing:
+        raise ValueError(f"job {i}: missing {', '.join(missing)}")
+    seed, n_sims = raw.get('seed'), raw.get('n_sims')
+    n_sims = N_SIMS if n_sims in (None, '') else int(n_sims)
+    if n_sims < 1:
+        raise ValueError(f"job {i}: n_sims must be at least 1, got {n_sims}")
+    lineups = {k: _names(raw.get(k)) for k in _LINEUPS}
+    for side in ('home', 'away'):
+        starters = lineups[f'{side}_starters']
+        if starters is not None and len(starters) != 5:
+            raise ValueError(f"job {i}: {side}_starters needs 5 players, got {len(starters)}")
+    return {
+        'id': str(raw.get('id') or i),
+        'home': raw['home'],
+        'away': raw['away'],
+        'season': int(raw['season']),
+        'n_sims': n_sims,
+        'seed': None if seed in (None, '') else int(seed),
+        **lineups,
+    }
+
+
+def load_jobs(path) -> List[dict]:
+    """Read and validate a JSON or CSV job file (see the module docstring)."""
+    path = Path(path)
+    if path.suffix.lower() == '.csv':
+        with open(path, newline='') as f:
+            raw = list(csv.DictReader(f))
+    else:
+        with open(path) as f:
+            raw = json.load(f)
+        if isinstance(raw, dict):
+            raw = raw['jobs']
+    return [_normalize_job(job, i) for i, job in enumerate(raw)]
+
+
+# Simulation
+
+def _run_chunk(task) -> dict:
+    """Simulate one chunk of a job; return its scores and per-slot stat sums."""
+    job, chunk, home, away, n_games, seed_seq = task
+    batch = simulate_matchups(SHARED['compiled'], np.full(n_games, home, np.intp),
+                              np.full(n_games, away, np.intp), seed=seed_seq, factors=SHARED['factors'])
+    return {
+        'job': job, 'chunk': chunk,
+        'scores': np.stack([batch.home_score, batch.away_score], axis=1).astype(np.int16),
+        'overtimes': int((batch.overtimes > 0).sum()),
+        'stats': {k: v.sum(axis=0, dtype=np.int64) for k, v in batch.stats.items()},
+    }
+
+
+def _summary_row(job: dict, home_id: int, away_id: int, scores: np.ndarray, overtimes: int) -> dict:
+    home, away = scores[:, 0].astype(float), scores[:, 1].astype(float)
+    margin = home - away
+    row = {
+        'job': job['id'], 'home': str(job['home']), 'away': str(job['away']), 'season': job['season'],
+        'home_team_id': home_id, 'away_team_id': away_id,
+        'games': len(scores),
+        'home_win_pct': float((margin > 0).mean()),
+        'home_pts_mean': home.mean(), 'home_pts_std': home.std(),
+        'away_pts_mean': away.mean(), 'away_pts_std': away.std(),
+        'margin_mean': margin.mean(), 'margin_std': margin.std(),
+        'total_mean': (home + away).mean(),
+        'overtime_pct': overtimes / len(scores),
+    }
+    for q, v in zip(MARGIN_QUANTILES, np.quantile(margin, MARGIN_QUANTILES)):
+        row[f'margin_p{round(q * 100):02d}'] = float(v)
+    return row
+
+
+def run_jobs(jobs: Sequence[dict], workers: Optional[int] = None, *,
+             seed=None,
+             factors: Optional[dict] = None,
+             teams: Optional[Dict[tuple, object]] = None,
+             chunk_games: int = CHUNK_GAMES,
+             progress: Optional[Callable[[int, int], None]] = None) -> dict:
     """
-    Stub implementation of play_game. Returns empty box score and play-by-play DataFrames.
-    Replace with full simulation logic when ready.
+    Simulate every job (see load_jobs) and aggregate the results per job.
+
+    Args:
+        jobs: normalized jobs
+        workers: worker processes (default: all cores; 1 runs in-process)
+        seed: seed for jobs without their own seed
+        factors: engine factor overrides
+        teams: prebuilt Teams by (team_id, season), used for jobs without a lineup
+        chunk_games: games simulated per task
+        progress: optional callback(done_games, total_games) as chunks stream back
+
+    Returns:
+        dict with 'summary' (one row per job: win %, score means, margin
+        quantiles), 'scores' (job, home_score, away_score, games: the final
+        score distribution), 'players' (per-game player means per job),
+        'games' and 'seconds' (wall time of the simulation)
     """
-    # Create an empty box score DataFrame
-    box_columns = ['player', 'team', 'points', 'rebounds', 'assists']
-    box_score_df = pd.DataFrame(columns=box_columns)
+    teams = teams or {}
+    keys, built, sides = {}, [], []
+    for job in jobs:
+        pair = []
+        for side in ('home', 'away'):
+            team_id = _team_id(job[side])
+            starters, bench = job[f'{side}_starters'], job[f'{side}_bench']
+            key = (team_id, job['season'], *(None if x is None else tuple(x) for x in (starters, bench)))
+            if key not in keys:
+                # Each distinct team and lineup is built and compiled once for all jobs
+                keys[key] = len(built)
+                if starters is None and bench is None and (team_id, job['season']) in teams:
+                    built.append(teams[(team_id, job['season'])])
+                else:
+                    built.append(get_team(team_id, job['season'], starters, bench))
+            pair.append((team_id, keys[key]))
+        sides.append(pair)
+
+    shared = {'compiled': compile_teams(built), 'factors': load_factors(factors)}
+    root = np.random.SeedSequence(seed).spawn(len(jobs))
+    tasks = []
+    for j, (job, ((_, home), (_, away))) in enumerate(zip(jobs, sides)):
+        job_seed = root[j] if job['seed'] is None else np.random.SeedSequence(job['seed'])
+        sizes = [min(chunk_games, job['n_sims'] - i) for i in range(0, job['n_sims'], chunk_games)]
+        tasks += [(j, c, home, away, n, s) for c, (n, s) in enumerate(zip(sizes, job_seed.spawn(len(sizes))))]
+
+    total = sum(t[4] for t in tasks)
+    parts = {}
+    done = 0
+
+    def collect(res):
+        nonlocal done
+        parts[res['job'], res['chunk']] = res
+        done += len(res['scores'])
+        if progress is not None:
+            progress(done, total)
+
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    # Workers get the compiled tables once; tasks only carry indexes and a seed
+    with shared_pool(shared, min(workers, len(tasks))) as pool:
+        for res in (map(_run_chunk, tasks) if pool is None else pool.imap_unordered(_run_chunk, tasks)):
+            collect(res)
+    seconds = time.perf_counter() - start
+
+    compiled = shared['compiled']
+    summary, scores, players = [], [], []
+    for j, (job, pair) in enumerate(zip(jobs, sides)):
+        chunks = [parts[k] for k in sorted(k for k in parts if k[0] == j)]
+        if not chunks:
+            continue
+        sc = np.concatenate([c['scores'] for c in chunks])
+        summary.append(_summary_row(job, pair[0][0], pair[1][0], sc,
+                                    sum(c['overtimes'] for c in chunks)))
+        pairs, counts = np.unique(sc, axis=0, return_counts=True)
+        scores.append(pd.DataFrame({'job': job['id'], 'home_score': pairs[:, 0],
+                                    'away_score': pairs[:, 1], 'games': counts}))
+        stats = {k: sum(c['stats'][k] for c in chunks) / len(sc) for k in chunks[0]['stats']}
+        for t, (team_id, slot) in enumerate(pair):
+            for s, name in enumerate(compiled['names'][slot]):
+                if compiled['minutes'][slot, s] <= 0:
+                    continue
+                players.append({
+                    'job': job['id'], 'team': 'home' if t == 0 else 'away', 'team_id': team_id,
+                    'player': name, 'minutes': float(compiled['minutes'][slot, s]),
+                    **{k: float(v[t, s]) for k, v in stats.items()},
+                })
+
+    return {
+        'summary': pd.DataFrame(summary),
+        'scores': pd.concat(scores, ignore_index=True) if scores else pd.DataFrame(
+            columns=['job', 'home_score', 'away_score', 'games']),
+        'players': pd.DataFrame(players),
+        'games': total,
+        'seconds': seconds,
+    }
+
+
+def write_results(results: dict, out_dir, fmt: str = 'parquet') -> List[Path]:
+    """Write the summary, scores and players tables to out_dir as parquet or CSV files."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for name in ('summary', 'scores', 'players'):
+        path = out_dir / f"{name}.{fmt}"
+        if fmt == 'parquet':
+            results[name].to_parquet(path, index=False)
+        else:
+            results[name].to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def _default_format() -> str:
+    """Parquet when a parquet engine is installed, otherwise CSV."""
+    engines = ('pyarrow', 'fastparquet')
+    return 'parquet' if any(importlib.util.find_spec(e) for e in engines) else 'csv'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate batches of matchups from a job file.")
+    parser.add_argument("jobs", type=Path, help="JSON or CSV job file")
+    parser.add_argument("--out", type=Path, default=Path("results"))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--format", choices=("parquet", "csv"), default=None,
+                        help="output format (default: parquet if available, else csv)")
+    parser.add_argument("--chunk-games", type=int, default=CHUNK_GAMES)
+    args = parser.parse_args(argv)
+
+    jobs = load_jobs(args.jobs)
+    print(f"Simulating {len(jobs)} jobs, {sum(j['n_sims'] for j in jobs):,} games…")
+    results = run_jobs(jobs, args.workers, seed=args.seed, chunk_games=args.chunk_games)
+    paths = write_results(results, args.out, args.format or _default_format())
+    rate = results['games'] / max(results['seconds'], 1e-9)
+    print(f"Done: {results['games']:,} games in {results['seconds']:.1f}s ({rate:,.0f} games/sec)")
+    for path in paths:
+        print(f"  • {path}")
+    return results
 
-    # Create an empty play-by-play DataFrame
-    pbp_columns = ['time', 'description', 'home_score', 'away_score']
-    pbp_df = pd.DataFrame(columns=pbp_columns)
 
-    return box_score_df, pbp_df
+if __name__ == "__main__":
+    main()
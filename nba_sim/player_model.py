@@ -1,25 +1,30 @@
 # nba_sim/player_model.py
 from dataclasses import dataclass, field
-from nba_sim.data_csv import get_player_id
+from typing import Optional
+from nba_sim.data_csv import get_player_id, get_player_bio
+from nba_sim.utils import instrumentation as instr
 from nba_sim.utils.stats_utils import stats_provider
 
-@dataclass
+@dataclass(slots=True)
 class Player:
     name: str
     season: int
     stats: dict = field(init=False)
     person_id: int = field(init=False)
+    age: Optional[int] = field(init=False)
+    position: Optional[str] = field(init=False)
+    height: Optional[int] = field(init=False)
+    status: str = field(default="healthy", init=False)
 
+    @instr.timed('player_model.player_init')
     def __post_init__(self):
         # Resolve the display name into the NBA Stats person_id
         self.person_id = get_player_id(self.name, self.season)
+        bio = get_player_bio(self.person_id, self.season)
+        self.age, self.position, self.height = bio['age'], bio['position'], bio['height']
 
-        # Fetch shooting and rebounding stats from your SQLite DB
-        shooting = stats_provider.get_player_shooting(self.person_id, self.season)
-        rebounding = stats_provider.get_player_rebounding(self.person_id, self.season)
-
-        # Merge them into a single stats dict
-        self.stats = {**shooting, **rebounding}
+        # Shooting and rebounding rates from the precomputed season rating table
+        self.stats = stats_provider.get_player_stats(self.person_id, self.season)
 
     def __repr__(self):
         return f"<Player {self.name!r} (ID={self.person_id}, Season={self.season})>"
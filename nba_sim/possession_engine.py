@@ -1,49 +1,387 @@
 import numpy as np
 import pandas as pd
-from typing import Tuple
+from dataclasses import dataclass
+from typing import Callable, Generator, Iterator, Optional, Sequence, Tuple
 
-from nba_sim.data_csv import iter_play_by_play
-from nba_sim.team_model import Team
-from nba_sim.utils.roster_utils import assign_lineup
+from nba_sim.team_model import TEAM_MINUTES, Team, team_arrays
+from nba_sim.utils import instrumentation as instr
+from nba_sim.utils.event_sinks import ArraySink
+from nba_sim.utils.fatigue import fatigue_factors
+import nba_sim.weights as W
 
+# Tunable engine factors; values saved in factors.json (see nba_sim.weights) override these
+DEFAULT_FACTORS = {
+    'pace': 100.0,            # possessions per team per 48 minutes
+    'turnover_rate': 0.13,    # share of possessions ending in a turnover
+    'ft_trip_rate': 0.11,     # share of possessions ending in two free throws
+    'ft_pct': 0.77,
+    'oreb_rate': 0.27,        # league offensive rebound rate between equal teams
+    'home_advantage': 0.015,  # added to the make probability of home shots
+    'shot_scale': 1.0,        # multiplies every field-goal make probability
+}
 
-def simulate_game(home_team: Team, away_team: Team) -> Tuple[pd.DataFrame, pd.DataFrame]:
+REGULATION_SECONDS = 48 * 60
+PERIOD_SECONDS = 12 * 60
+OVERTIME_SECONDS = 5 * 60
+MAX_SHOTS_PER_POSSESSION = 4
+
+# Event codes emitted by the kernel
+MADE_2, MISS_2, MADE_3, MISS_3, FT_MADE, FT_MISS, OREB, DREB, TURNOVER = range(9)
+EVENT_NAMES = {
+    MADE_2: 'makes 2PT shot', MISS_2: 'misses 2PT shot',
+    MADE_3: 'makes 3PT shot', MISS_3: 'misses 3PT shot',
+    FT_MADE: 'makes free throw', FT_MISS: 'misses free throw',
+    OREB: 'offensive rebound', DREB: 'defensive rebound',
+    TURNOVER: 'turnover',
+}
+
+_STATS = ('points', 'rebounds', 'fgm', 'fga', 'fg3m', 'fg3a', 'turnovers')
+
+
+def load_factors(factors: Optional[dict] = None) -> dict:
+    """Engine factors: defaults, then saved weights, then explicit overrides."""
+    saved = {k: v for k, v in W.load().items() if k in DEFAULT_FACTORS}
+    return {**DEFAULT_FACTORS, **saved, **(factors or {})}
+
+
+def _pad(a: np.ndarray, n: int) -> np.ndarray:
+    return np.pad(a, (0, n - len(a)))
+
+
+def _cumulative(weights: np.ndarray) -> np.ndarray:
+    cum = np.cumsum(weights, axis=-1) / weights.sum(axis=-1, keepdims=True)
+    cum[..., -1] = 1.0
+    return cum
+
+
+def _pick(cum: np.ndarray, u: np.ndarray) -> np.ndarray:
+    """Sample one slot per row from row-wise cumulative weights."""
+    return (u[:, None] > cum).sum(axis=1)
+
+
+@instr.timed('possession_engine.compile_teams')
+def compile_teams(teams: Sequence[Team]) -> dict:
+    """
+    Stack the TeamArrays of several teams into (n_teams, slots) tables, padded
+    with zero-minute slots. Build once and reuse across simulate_matchups calls.
+    """
+    arrays = [team_arrays(t) for t in teams]
+    for a in arrays:
+        if len(a) == 0:
+            raise ValueError(f"Team {a.team_id!r} has no players to simulate")
+    S = max(len(a) for a in arrays)
+
+    def stack(key):
+        return np.stack([_pad(getattr(a, key), S) for a in arrays])
+
+    minutes, reb_rate = stack('minutes'), stack('reb_rate')
+    strength = (minutes / TEAM_MINUTES * reb_rate).sum(axis=1)
+    return {
+        'names': [a.names for a in arrays],
+        'minutes': minutes,
+        'two_pct': np.clip(stack('two_pct'), 0.2, 0.8),
+        'three_pct': np.clip(stack('three_pct'), 0.0, 0.6),
+        'three_prop': np.clip(stack('three_prop'), 0.0, 1.0),
+        'age_mult': stack('age_mult'),
+        'reb_rate': reb_rate,
+        'usage': _cumulative(minutes),
+        'rebounders': _cumulative(minutes * reb_rate + 1e-12 * (minutes > 0)),
+        'reb_strength': np.maximum(strength, 1e-9),
+    }
+
+
+@dataclass
+class GameBatch:
+    """
+    Results of n simulated games. Per-player arrays are (n_games, 2, slots) with
+    side 0 = home; home_idx / away_idx index the compiled teams of each game.
+    """
+    home_score: np.ndarray
+    away_score: np.ndarray
+    overtimes: np.ndarray
+    stats: dict
+    names: list
+    minutes: np.ndarray
+    home_idx: np.ndarray
+    away_idx: np.ndarray
+
+    @property
+    def n_games(self) -> int:
+        return len(self.home_score)
+
+    @property
+    def margin(self) -> np.ndarray:
+        return self.home_score - self.away_score
+
+    @property
+    def home_win_pct(self) -> float:
+        return float((self.margin > 0).mean())
+
+    def sides(self, game: int = 0) -> Tuple[int, int]:
+        """Compiled team indexes (home, away) of one game."""
+        return int(self.home_idx[game]), int(self.away_idx[game])
+
+    def box_score(self, game: Optional[int] = None) -> pd.DataFrame:
+        """
+        Per-player box score for one game, or per-game means over the batch if game
+        is None (meaningful when every game in the batch is the same matchup).
+        Roster slots outside the lineup (no planned minutes) are left out.
+        """
+        rows = []
+        for t, team in enumerate(self.sides(game or 0)):
+            for s, name in enumerate(self.names[team]):
+                if self.minutes[team, s] <= 0:
+                    continue
+                row = {'player': name, 'team': 'home' if t == 0 else 'away',
+                       'minutes': float(self.minutes[team, s])}
+                for k in _STATS:
+                    vals = self.stats[k][:, t, s]
+                    row[k] = int(vals[game]) if game is not None else float(vals.mean())
+                rows.append(row)
+        return pd.DataFrame(rows, columns=['player', 'team', 'minutes', *_STATS])
+
+
+def stream_matchups(compiled: dict, home_idx, away_idx, *, seed=None,
+                    factors: Optional[dict] = None,
+                    record: bool = True) -> Generator[dict, None, GameBatch]:
+    """
+    Simulate one game per (home_idx[i], away_idx[i]) pair of compiled teams, all in lockstep,
+    yielding event batches as each possession step completes.
+
+    Every possession step advances all unfinished games at once as NumPy arrays of
+    shape (n_games, ...). Shot selection, make probability (fg_pct / three_pct /
+    three_prop, fatigue_factor, age_multiplier) and rebounding (reb_rate) come
+    from the players' stats; league-level rates come from the engine factors.
+
+    Args:
+        compiled: output of compile_teams
+        home_idx, away_idx: arrays of team indexes into `compiled`, one per game
+        seed: int, SeedSequence or Generator for reproducible runs
+        factors: overrides for DEFAULT_FACTORS / saved weights
+        record: if False no events are built or yielded (results only)
+
+    Yields:
+        Event batches as dicts of equal-length arrays ('game', 'clock', 'team',
+        'slot', 'event', 'points', 'home_score', 'away_score'); 'team' is the side, 0 = home
+
+    Returns:
+        GameBatch with final scores and per-player stat arrays (as StopIteration.value)
+    """
+    rng = np.random.default_rng(seed)
+    f = load_factors(factors)
+    c = compiled
+    minutes = c['minutes']
+    two_pct, three_pct, three_prop = c['two_pct'], c['three_pct'], c['three_prop']
+    age_mult, usage, rebounders, strength = c['age_mult'], c['usage'], c['rebounders'], c['reb_strength']
+    home_edge = np.array([f['home_advantage'], 0.0])
+
+    sides = np.stack([np.asarray(home_idx, dtype=np.intp), np.asarray(away_idx, dtype=np.intp)], axis=1)
+    n, S = len(sides), minutes.shape[1]
+    score = np.zeros((n, 2), dtype=np.int32)
+    stats = {k: np.zeros((n, 2, S), dtype=np.int32) for k in _STATS}
+    clock = np.zeros(n)
+    game_end = np.full(n, float(REGULATION_SECONDS))
+    offense = rng.integers(0, 2, n)
+    mean_possession = REGULATION_SECONDS / (2 * f['pace'])
+    to_rate, ft_rate = f['turnover_rate'], f['turnover_rate'] + f['ft_trip_rate']
+
+    pending = []
+    n_possessions = n_events = 0
+
+    def emit(g, off, slot, code, pts):
+        if record and len(g):
+            pending.append({
+                'game': g, 'clock': clock[g].copy(), 'team': off, 'slot': slot,
+                'event': np.full(len(g), code, dtype=np.int8) if np.isscalar(code) else code,
+                'points': pts, 'home_score': score[g, 0].copy(), 'away_score': score[g, 1].copy(),
+            })
+
+    while True:
+        active = np.flatnonzero(clock < game_end)
+        if len(active) == 0:
+            tied = score[:, 0] == score[:, 1]
+            if not tied.any():
+                break
+            game_end[tied] += OVERTIME_SECONDS
+            continue
+
+        g = active
+        n_possessions += len(g)
+        off = offense[g]
+        team = sides[g, off]
+        # A possession cut short by the buzzer ends at it
+        clock[g] = np.minimum(clock[g] + rng.gamma(4.0, mean_possession / 4.0, len(g)), game_end[g])
+        u = rng.random((len(g), 2))
+
+        # Turnovers
+        to = u[:, 0] < to_rate
+        gt, ot = g[to], off[to]
+        st = _pick(usage[team[to]], rng.random(len(gt)))
+        stats['turnovers'][gt, ot, st] += 1
+        emit(gt, ot, st, TURNOVER, np.zeros(len(gt), np.int8))
+
+        # Free-throw trips: two attempts
+        ft = ~to & (u[:, 0] < ft_rate)
+        gf, of = g[ft], off[ft]
+        sf = _pick(usage[team[ft]], u[ft, 1])
+        for _ in range(2):
+            made = (rng.random(len(gf)) < f['ft_pct']).astype(np.int32)
+            score[gf, of] += made
+            stats['points'][gf, of, sf] += made
+            emit(gf, of, sf, np.where(made > 0, FT_MADE, FT_MISS).astype(np.int8), made.astype(np.int8))
+
+        # Field-goal attempts, with offensive rebounds extending the possession
+        live = ~to & ~ft
+        gs, os_ = g[live], off[live]
+        for _ in range(MAX_SHOTS_PER_POSSESSION):
+            if len(gs) == 0:
+                break
+            ts, td = sides[gs, os_], sides[gs, 1 - os_]
+            r = rng.random((len(gs), 4))
+            slot = _pick(usage[ts], r[:, 0])
+            is3 = r[:, 1] < three_prop[ts, slot]
+            played = minutes[ts, slot] * np.minimum(clock[gs], REGULATION_SECONDS) / REGULATION_SECONDS
+            fatigue = fatigue_factors(played)
+            p = np.where(is3, three_pct[ts, slot], two_pct[ts, slot])
+            p = p * f['shot_scale'] * fatigue * age_mult[ts, slot] + home_edge[os_]
+            made = r[:, 2] < p
+            pts = np.where(made, np.where(is3, 3, 2), 0).astype(np.int32)
+            score[gs, os_] += pts
+            for key, val in (('points', pts), ('fga', 1), ('fgm', made),
+                             ('fg3a', is3), ('fg3m', made & is3)):
+                stats[key][gs, os_, slot] += val
+            code = np.where(is3, np.where(made, MADE_3, MISS_3), np.where(made, MADE_2, MISS_2))
+            emit(gs, os_, slot, code.astype(np.int8), pts.astype(np.int8))
+
+            # Misses go to the boards
+            miss = ~made
+            gm, om = gs[miss], os_[miss]
+            oreb = np.clip(f['oreb_rate'] * strength[ts[miss]] / strength[td[miss]], 0.05, 0.6)
+            off_board = r[miss, 3] < oreb
+            board_side = np.where(off_board, om, 1 - om)
+            rb = _pick(rebounders[sides[gm, board_side]], rng.random(len(gm)))
+            stats['rebounds'][gm, board_side, rb] += 1
+            emit(gm, board_side, rb, np.where(off_board, OREB, DREB).astype(np.int8),
+                 np.zeros(len(gm), np.int8))
+            gs, os_ = gm[off_board], om[off_board]
+
+        offense[g] = 1 - off
+        if pending:
+            n_events += sum(len(e['game']) for e in pending)
+            yield from pending
+            pending.clear()
+
+    instr.count('possession_engine.games', n)
+    instr.count('possession_engine.possessions', n_possessions)
+    instr.count('possession_engine.events', n_events)
+    overtimes = ((game_end - REGULATION_SECONDS) // OVERTIME_SECONDS).astype(np.int32)
+    return GameBatch(
+        home_score=score[:, 0].copy(), away_score=score[:, 1].copy(), overtimes=overtimes,
+        stats=stats, names=c['names'], minutes=minutes,
+        home_idx=sides[:, 0].copy(), away_idx=sides[:, 1].copy(),
+    )
+
+
+@instr.timed('possession_engine.simulate_matchups')
+def simulate_matchups(compiled: dict, home_idx, away_idx, *, seed=None,
+                      factors: Optional[dict] = None,
+                      on_event: Optional[Callable[[dict], None]] = None) -> GameBatch:
+    """
+    Run stream_matchups to completion and return its GameBatch.
+    `on_event` (e.g. an event sink) receives every event batch as it is produced.
+    """
+    stream = stream_matchups(compiled, home_idx, away_idx, seed=seed, factors=factors,
+                             record=on_event is not None)
+    while True:
+        try:
+            events = next(stream)
+        except StopIteration as done:
+            return done.value
+        on_event(events)
+
+
+def simulate_games(home_team: Team, away_team: Team, n_games: int = 1000, *,
+                   seed=None, factors: Optional[dict] = None,
+                   on_event: Optional[Callable[[dict], None]] = None) -> GameBatch:
+    """
+    Simulate n independent games between two teams in lockstep.
+    See simulate_matchups for the model and the on_event format.
+    """
+    n = int(n_games)
+    return simulate_matchups(
+        compile_teams([home_team, away_team]), np.zeros(n, np.intp), np.ones(n, np.intp),
+        seed=seed, factors=factors, on_event=on_event,
+    )
+
+
+def win_probability(home_team: Team, away_team: Team, n_games: int = 10000, *,
+                    seed=None, factors: Optional[dict] = None) -> float:
+    """Monte Carlo estimate of the home team's win probability."""
+    return simulate_games(home_team, away_team, n_games, seed=seed, factors=factors).home_win_pct
+
+
+def _game_clock(elapsed: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Period number and seconds remaining in it, for elapsed game seconds (a period's end belongs to it)."""
+    elapsed = np.asarray(elapsed, dtype=float)
+    reg = elapsed <= REGULATION_SECONDS
+    ot_index = np.maximum(0, np.ceil((elapsed - REGULATION_SECONDS) / OVERTIME_SECONDS) - 1)
+    period = np.where(reg, np.maximum(1, np.ceil(elapsed / PERIOD_SECONDS)), 5 + ot_index).astype(int)
+    end = np.where(reg, period * PERIOD_SECONDS, REGULATION_SECONDS + (ot_index + 1) * OVERTIME_SECONDS)
+    return period, np.maximum(0, end - elapsed)
+
+
+def events_frame(events: dict, names: Tuple[list, list]) -> pd.DataFrame:
+    """Turn kernel event arrays for one game into a readable play-by-play DataFrame."""
+    if not events or len(events['event']) == 0:
+        return pd.DataFrame(columns=['period', 'time', 'team', 'player', 'description',
+                                     'points', 'home_score', 'away_score'])
+    period, remaining = _game_clock(events['clock'])
+    remaining = remaining.astype(int)
+    team = np.asarray(events['team'])
+    return pd.DataFrame({
+        'period': period,
+        'time': [f"{s // 60}:{s % 60:02d}" for s in remaining],
+        'team': np.where(team == 0, 'home', 'away'),
+        'player': [names[t][s] for t, s in zip(team, events['slot'])],
+        'description': [EVENT_NAMES[int(e)] for e in events['event']],
+        'points': events['points'],
+        'home_score': events['home_score'],
+        'away_score': events['away_score'],
+    })
+
+
+def iter_game_events(home_team: Team, away_team: Team, *, seed=None,
+                     factors: Optional[dict] = None) -> Iterator[dict]:
+    """
+    Stream a single simulated game: yield each play-by-play event as a dict
+    (period, time, team, player, description, points, home_score, away_score)
+    as soon as its possession is simulated.
+    """
+    compiled = compile_teams([home_team, away_team])
+    names = tuple(compiled['names'])
+    stream = stream_matchups(compiled, np.zeros(1, np.intp), np.ones(1, np.intp),
+                             seed=seed, factors=factors)
+    for events in stream:
+        yield from events_frame(events, names).to_dict('records')
+
+
+def simulate_game(home_team: Team, away_team: Team, *, seed=None,
+                  factors: Optional[dict] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
     Simulate a single NBA game between two Team instances.
 
     Args:
         home_team: Team instance for the home side (team_id, season, roster loaded)
         away_team: Team instance for the away side
+        seed: optional seed for a reproducible game
+        factors: optional engine factor overrides
 
     Returns:
         A tuple of (box_score_df, pbp_df):
           - box_score_df: pandas DataFrame summarizing final stats per player
           - pbp_df: pandas DataFrame of the play-by-play event log
     """
-    # Generate a synthetic game_id for simulation context
-    game_id = f"SIM_{home_team.team_id}_{away_team.team_id}_{home_team.season}"
-    season = home_team.season
-
-    # Determine if teams played yesterday (stub; replace with real logic)
-    def _played_yesterday(team: Team) -> bool:
-        return False
-
-    # Select starting lineups using roster_utils logic
-    home_start = assign_lineup(home_team.roster)
-    away_start = assign_lineup(away_team.roster)
-
-    # Collect play-by-play events
-    pbp_records = []
-    for event in iter_play_by_play(game_id=game_id, season=season):
-        # enrich each event with home/away context if needed
-        pbp_records.append(event)
-    pbp_df = pd.DataFrame(pbp_records)
-
-    # Placeholder box score: count events per player
-    box_score_df = (
-        pbp_df.groupby('player1_id')
-        .size()
-        .reset_index(name='events_count')
-    )
-
-    return box_score_df, pbp_df
+    sink = ArraySink(capacity=512)
+    batch = simulate_games(home_team, away_team, 1, seed=seed, factors=factors, on_event=sink)
+    home, away = batch.sides(0)
+    return batch.box_score(0), events_frame(sink.arrays(), (batch.names[home], batch.names[away]))
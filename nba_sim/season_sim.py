@@ -0,0 +1,174 @@
+# nba_sim/season_sim.py
+"""
+Season and playoff-bracket Monte Carlo on top of possession_engine.
+
+Every run plays the full regular-season schedule, seeds the top teams by wins
+(random tiebreak) into a single league-wide bracket and plays best-of-seven
+series. Runs are split into chunks that worker processes simulate; the compiled
+team tables are handed to the workers once (inherited through fork where
+available, otherwise once per worker via the pool initializer), and each chunk
+gets its own SeedSequence child so results do not depend on the worker count.
+"""
+import os
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from nba_sim.data_csv import get_season_schedule
+from nba_sim.possession_engine import compile_teams, load_factors, simulate_matchups
+from nba_sim.team_model import Team, get_team
+from nba_sim.utils.pool import SHARED, shared_pool
+
+PLAYOFF_TEAMS = 16
+SERIES_GAMES = 7
+CHUNK_RUNS = 8
+
+# Games hosted by the higher seed in a 2-2-1-1-1 series
+_SERIES_HOME = np.array([1, 1, 0, 0, 1, 0, 1], dtype=bool)
+
+def _bracket_order(n: int) -> np.ndarray:
+    """Seed indexes in bracket order so 1 plays n, and 1 and 2 can only meet in the final."""
+    order = [0]
+    while len(order) < n:
+        m = 2 * len(order)
+        order = [x for s in order for x in (s, m - 1 - s)]
+    return np.array(order)
+
+
+def _play_series(compiled, top, bottom, rng, factors) -> np.ndarray:
+    """Best-of-seven between arrays of teams; True where the higher seed `top` wins."""
+    shape = top.shape
+    top = top.reshape(-1, 1)
+    bottom = bottom.reshape(-1, 1)
+    home = np.where(_SERIES_HOME, top, bottom)
+    away = np.where(_SERIES_HOME, bottom, top)
+    batch = simulate_matchups(compiled, home.ravel(), away.ravel(), seed=rng, factors=factors)
+    home_won = (batch.margin > 0).reshape(home.shape)
+    top_won = np.where(_SERIES_HOME, home_won, ~home_won)
+    return (top_won.sum(axis=1) > SERIES_GAMES // 2).reshape(shape)
+
+
+def _run_chunk(task) -> dict:
+    """Simulate `n_runs` full seasons + playoffs; return summed counters."""
+    n_runs, seed_seq = task
+    compiled, factors = SHARED['compiled'], SHARED['factors']
+    home_idx, away_idx = SHARED['home_idx'], SHARED['away_idx']
+    n_teams, n_playoff = SHARED['n_teams'], SHARED['playoff_teams']
+    rng = np.random.default_rng(seed_seq)
+    runs = np.arange(n_runs)[:, None]
+
+    # Regular season: every scheduled game of every run in one lockstep batch
+    batch = simulate_matchups(compiled, np.tile(home_idx, n_runs), np.tile(away_idx, n_runs),
+                              seed=rng, factors=factors)
+    home_won = (batch.margin > 0).reshape(n_runs, len(home_idx))
+    winners = np.where(home_won, home_idx, away_idx)
+    wins = np.bincount((runs * n_teams + winners).ravel(),
+                       minlength=n_runs * n_teams).reshape(n_runs, n_teams)
+
+    # Seeding by wins, random tiebreak
+    ranked = np.argsort(-(wins + rng.random(wins.shape) * 0.5), axis=1)[:, :n_playoff]
+    seed_counts = np.zeros((n_teams, n_playoff), dtype=np.int64)
+    np.add.at(seed_counts, (ranked, np.broadcast_to(np.arange(n_playoff), ranked.shape)), 1)
+
+    # Bracket: keep each slot's team and seed number, higher seed hosts
+    order = _bracket_order(n_playoff)
+    alive, rank = ranked[:, order], np.broadcast_to(order, ranked.shape)
+    finals = np.zeros(n_teams, dtype=np.int64)
+    while alive.shape[1] > 1:
+        if alive.shape[1] == 2:
+            finals += np.bincount(alive.ravel(), minlength=n_teams)
+        a, b = alive[:, 0::2], alive[:, 1::2]
+        ra, rb = rank[:, 0::2], rank[:, 1::2]
+        a_top = ra < rb
+        top, bottom = np.where(a_top, a, b), np.where(a_top, b, a)
+        top_wins = _play_series(compiled, top, bottom, rng, factors)
+        alive = np.where(top_wins, top, bottom)
+        rank = np.where(top_wins, np.minimum(ra, rb), np.maximum(ra, rb))
+
+    return {
+        'runs': n_runs,
+        'wins': wins.sum(axis=0),
+        'wins_sq': (wins.astype(np.int64) ** 2).sum(axis=0),
+        'seeds': seed_counts,
+        'finals': finals,
+        'titles': np.bincount(alive[:, 0], minlength=n_teams),
+    }
+
+
+def simulate_season(season: int, n_runs: int = 1000, workers: Optional[int] = None, *,
+                    seed=None,
+                    teams: Optional[Dict[int, Team]] = None,
+                    schedule: Optional[pd.DataFrame] = None,
+                    playoff_teams: int = PLAYOFF_TEAMS,
+                    factors: Optional[dict] = None,
+                    chunk_runs: int = CHUNK_RUNS,
+                    progress: Optional[Callable[[int, int], None]] = None) -> pd.DataFrame:
+    """
+    Simulate a regular season and playoff bracket `n_runs` times.
+
+    Args:
+        season: season year; the schedule defaults to get_season_schedule(season)
+        n_runs: number of simulated seasons
+        workers: worker processes (default: all cores; 1 runs in-process)
+        seed: seed for the SeedSequence the per-chunk RNG streams are spawned from
+        teams: prebuilt Team objects by team_id (default: get_team(team_id, season))
+        schedule: DataFrame with team_id_home / team_id_away columns
+        playoff_teams: bracket size, a power of two
+        factors: engine factor overrides
+        chunk_runs: seasons simulated per task
+        progress: optional callback(done_runs, n_runs) as chunks stream back
+
+    Returns:
+        DataFrame per team_id: mean_wins, wins_std, playoff_pct, finals_pct,
+        title_pct and seed_1..seed_N probabilities
+    """
+    if schedule is None:
+        schedule = get_season_schedule(season)
+    home_ids = schedule['team_id_home'].astype(int).to_numpy()
+    away_ids = schedule['team_id_away'].astype(int).to_numpy()
+    team_ids = np.unique(np.r_[home_ids, away_ids])
+    playoff_teams = min(playoff_teams, 1 << (len(team_ids).bit_length() - 1))
+    if teams is None:
+        teams = {int(t): get_team(int(t), season) for t in team_ids}
+
+    shared = {
+        'compiled': compile_teams([teams[int(t)] for t in team_ids]),
+        'factors': load_factors(factors),
+        'home_idx': np.searchsorted(team_ids, home_ids),
+        'away_idx': np.searchsorted(team_ids, away_ids),
+        'n_teams': len(team_ids),
+        'playoff_teams': playoff_teams,
+    }
+    sizes = [min(chunk_runs, n_runs - i) for i in range(0, n_runs, chunk_runs)]
+    tasks = list(zip(sizes, np.random.SeedSequence(seed).spawn(len(sizes))))
+
+    totals = None
+    done = 0
+
+    def accumulate(res):
+        nonlocal totals, done
+        totals = res if totals is None else {k: totals[k] + res[k] for k in totals}
+        done += res['runs']
+        if progress is not None:
+            progress(done, n_runs)
+
+    workers = workers or os.cpu_count() or 1
+    # Workers get the compiled tables once; nothing is pickled per task but the seed
+    with shared_pool(shared, workers if len(tasks) > 1 else 1) as pool:
+        for res in (map(_run_chunk, tasks) if pool is None else pool.imap_unordered(_run_chunk, tasks)):
+            accumulate(res)
+
+    runs = totals['runs']
+    mean = totals['wins'] / runs
+    out = pd.DataFrame({
+        'team_id': team_ids,
+        'mean_wins': mean,
+        'wins_std': np.sqrt(np.maximum(0.0, totals['wins_sq'] / runs - mean ** 2)),
+        'playoff_pct': totals['seeds'].sum(axis=1) / runs,
+        'finals_pct': totals['finals'] / runs,
+        'title_pct': totals['titles'] / runs,
+    })
+    for s in range(playoff_teams):
+        out[f'seed_{s + 1}'] = totals['seeds'][:, s] / runs
+    return out.sort_values('mean_wins', ascending=False, ignore_index=True)
@@ -1,15 +1,178 @@
 # nba_sim/team_model.py
 
-from typing import List, Optional
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from nba_sim import data_csv
 from nba_sim.data_csv import get_roster
 from nba_sim.player_model import Player
-from nba_sim.utils.roster_utils import assign_lineup
+from nba_sim.utils import instrumentation as instr
+from nba_sim.utils.age_curve import age_multipliers
+from nba_sim.utils.injury import minutes_caps, status_codes
+from nba_sim.utils.roster_utils import lineup_slots, position_code
+from nba_sim.utils.stats_utils import stats_provider
+
+TEAM_MINUTES = 5 * 48
+
+# Built teams kept by get_team
+TEAM_CACHE_SIZE = 64
+# Seconds between checks of the data files for changes (each check stats every file)
+DATA_CHECK_SECONDS = 1.0
+
+
+def minutes_plan(n_starters: int, caps: np.ndarray) -> np.ndarray:
+    """
+    Planned minutes per lineup slot: starters up to their cap, the bench splits
+    the rest, and everything is rescaled to the 240 team minutes (max 48 each).
+    """
+    plan = caps.astype(float).copy()
+    n_bench = len(caps) - n_starters
+    if n_bench > 0:
+        left = max(0.0, TEAM_MINUTES - plan[:n_starters].sum())
+        plan[n_starters:] = np.minimum(caps[n_starters:], left / n_bench)
+    total = plan.sum()
+    if total <= 0:
+        return np.full(len(caps), TEAM_MINUTES / max(len(caps), 1))
+    return np.minimum(48.0, plan * TEAM_MINUTES / total)
+
+
+def _frozen(a) -> np.ndarray:
+    a = np.asarray(a)
+    a.setflags(write=False)
+    return a
+
+
+@dataclass(frozen=True)
+class TeamArrays:
+    """
+    Struct-of-arrays view of a roster: one read-only NumPy column per attribute,
+    indexed by roster slot. `starters` / `bench` are slot indexes; `minutes` is the
+    planned playing time and is 0 for players outside the lineup. The Player
+    objects stay reachable through `player(slot)`.
+    """
+    team_id: int
+    season: int
+    players: tuple
+    starters: np.ndarray
+    bench: np.ndarray
+    person_id: np.ndarray
+    fg_pct: np.ndarray
+    three_pct: np.ndarray
+    three_prop: np.ndarray
+    two_pct: np.ndarray
+    reb_rate: np.ndarray
+    age: np.ndarray           # NaN when unknown
+    age_mult: np.ndarray
+    minutes_cap: np.ndarray
+    minutes: np.ndarray
+    height: np.ndarray        # inches, 0 when unknown
+    position: np.ndarray      # roster_utils position codes
+
+    @classmethod
+    @instr.timed('team_model.team_arrays')
+    def from_players(cls, team_id, season, players: Sequence, starters=None, bench=None) -> "TeamArrays":
+        """
+        Build the columns from Player-like objects (.name, .stats and optionally
+        .person_id, .age, .height, .position, .status). Without explicit slot
+        indexes the lineup is picked by roster_utils.lineup_slots.
+        """
+        players = tuple(players)
+
+        def col(key):
+            return np.array([float(p.stats[key]) for p in players])
+
+        def attr(name, default):
+            return [getattr(p, name, None) or default for p in players]
+
+        position = np.array([position_code(getattr(p, "position", None)) for p in players], dtype=np.int8)
+        height = np.array(attr("height", 0), dtype=float)
+        if starters is None:
+            starters, bench = lineup_slots(position, height)
+        starters = np.asarray(starters, dtype=np.intp)
+        bench = np.asarray(bench if bench is not None else [], dtype=np.intp)
+        lineup = np.r_[starters, bench]
+        if len(lineup) == 0:
+            lineup = np.arange(len(players))
+            starters, bench = lineup[:5], lineup[5:]
+
+        fg, three, prop = col("fg_pct"), col("three_pct"), col("three_prop")
+        two = np.where(prop < 0.99, (fg - prop * three) / np.maximum(1e-9, 1 - prop), fg)
+        ages = np.array([np.nan if a is None else float(a) for a in (getattr(p, "age", None) for p in players)])
+        caps = minutes_caps(status_codes(attr("status", "healthy"))).astype(float)
+        minutes = np.zeros(len(players))
+        minutes[lineup] = minutes_plan(len(starters), caps[lineup])
+
+        return cls(
+            team_id=team_id,
+            season=season,
+            players=players,
+            starters=_frozen(starters),
+            bench=_frozen(bench),
+            person_id=_frozen(np.array(attr("person_id", 0), dtype=np.int64)),
+            fg_pct=_frozen(fg),
+            three_pct=_frozen(three),
+            three_prop=_frozen(prop),
+            two_pct=_frozen(two),
+            reb_rate=_frozen(col("reb_rate")),
+            age=_frozen(ages),
+            age_mult=_frozen(np.where(np.isnan(ages), 1.0, age_multipliers(ages))),
+            minutes_cap=_frozen(caps),
+            minutes=_frozen(minutes),
+            height=_frozen(height),
+            position=_frozen(position),
+        )
+
+    @classmethod
+    def from_team(cls, team) -> "TeamArrays":
+        """Build from any object with .roster, .starters and .bench lists of players."""
+        players = list(team.roster)
+        slot = {id(p): i for i, p in enumerate(players)}
+        for p in list(team.starters) + list(team.bench):
+            if id(p) not in slot:
+                slot[id(p)] = len(players)
+                players.append(p)
+        starters = [slot[id(p)] for p in team.starters]
+        bench = [slot[id(p)] for p in team.bench]
+        return cls.from_players(team.team_id, team.season, players, starters, bench)
+
+    def __len__(self) -> int:
+        return len(self.players)
+
+    @property
+    def names(self) -> List[str]:
+        return [p.name for p in self.players]
+
+    @property
+    def lineup(self) -> np.ndarray:
+        """Slots that get minutes: starters, then bench."""
+        return np.r_[self.starters, self.bench]
+
+    def player(self, slot: int):
+        return self.players[slot]
+
+
+def team_arrays(team) -> TeamArrays:
+    """The TeamArrays of a Team (built once), or built on the fly for Team-like objects."""
+    arrays = getattr(team, "arrays", None)
+    return arrays if isinstance(arrays, TeamArrays) else TeamArrays.from_team(team)
+
 
 class Team:
     """
     Represents an NBA team in a given season, with a roster broken into starters and bench.
-    You can pass in explicit `starters` and `bench` lists of player display names,
-    or omit them to have them selected automatically.
+    You can pass in explicit `starters` (five player display names) and optionally a
+    `bench` list, or omit them to have them selected automatically; starters without
+    a bench get the rest of the automatic lineup as their bench.
+    The roster is also held as a TeamArrays struct-of-arrays (`team.arrays`) that the
+    simulator works on; `starters` and `bench` are views over its slot indexes, and
+    assigning a list of players to either rebuilds the arrays (a player moved into
+    one is taken out of the other).
     """
     def __init__(
         self,
@@ -25,22 +188,183 @@ class Team:
         # Load the raw roster info and build Player objects
         roster_df = get_roster(team_id, season)
         # display_first_last is the column containing full names
-        self.roster = [
-            Player(row["display_first_last"], season)
-            for _, row in roster_df.iterrows()
-        ]
-
-        # If the user provided exact starters/bench, slice them out
-        if starters is not None and bench is not None:
-            name_to_player = {p.name: p for p in self.roster}
-            self.starters = [name_to_player[n] for n in starters if n in name_to_player]
-            self.bench    = [name_to_player[n] for n in bench    if n in name_to_player]
+        self.roster = [Player(name, season) for name in roster_df["display_first_last"]]
+
+        # If the user provided exact starters (and optionally a bench), slice them out
+        if starters is not None:
+            starter_slots, bench_slots = self._lineup_slots(starters, bench)
+        else:
+            # Otherwise, auto‑assign a starting five and bench by slot
+            starter_slots = bench_slots = None
+        self.arrays = TeamArrays.from_players(team_id, season, self.roster, starter_slots, bench_slots)
+
+    def _lineup_slots(self, starters: List[str], bench: Optional[List[str]]):
+        """
+        Roster slots of the named starters and bench. The starters must be five
+        roster players; without a bench the remaining players come off it in
+        automatic lineup order.
+        """
+        name_to_slot = {p.name: i for i, p in enumerate(self.roster)}
+        unknown = [n for n in starters if n not in name_to_slot]
+        if unknown:
+            raise ValueError(f"starters not on the {self.season} roster of team {self.team_id}: {unknown}")
+        starter_slots = list(dict.fromkeys(name_to_slot[n] for n in starters))
+        if len(starter_slots) != 5:
+            raise ValueError(f"need exactly 5 starters, got {len(starter_slots)}: {list(starters)}")
+        if bench is not None:
+            bench_slots = [name_to_slot[n] for n in bench if n in name_to_slot]
         else:
-            # Otherwise, auto‑assign a starting five and bench via utility
-            self.starters, self.bench = assign_lineup(self.roster)
+            first, rest = lineup_slots([position_code(p.position) for p in self.roster],
+                                       [p.height or 0 for p in self.roster])
+            bench_slots = [int(i) for i in np.r_[first, rest] if i not in starter_slots]
+        return starter_slots, bench_slots
+
+    @property
+    def starters(self) -> List[Player]:
+        return [self.roster[i] for i in self.arrays.starters]
+
+    @starters.setter
+    def starters(self, players: List[Player]):
+        starters = self._slots(players)
+        bench = [i for i in self.arrays.bench if i not in starters]
+        self.arrays = TeamArrays.from_players(self.team_id, self.season, self.roster, starters, bench)
+
+    @property
+    def bench(self) -> List[Player]:
+        return [self.roster[i] for i in self.arrays.bench]
+
+    @bench.setter
+    def bench(self, players: List[Player]):
+        bench = self._slots(players)
+        starters = [i for i in self.arrays.starters if i not in bench]
+        self.arrays = TeamArrays.from_players(self.team_id, self.season, self.roster, starters, bench)
+
+    def _slots(self, players) -> List[int]:
+        """Roster slots of Player objects; players not on the roster are added to it."""
+        slot = {id(p): i for i, p in enumerate(self.roster)}
+        for p in players:
+            if id(p) not in slot:
+                slot[id(p)] = len(self.roster)
+                self.roster.append(p)
+        return [slot[id(p)] for p in players]
 
     def __repr__(self):
         return (
             f"<Team id={self.team_id!r} season={self.season!r} "
             f"starters={[p.name for p in self.starters]!r}>"
         )
+
+
+class TeamCache:
+    """
+    Process-wide LRU of built Teams keyed by (team_id, season, starters, bench).
+    Lookups compare data_csv.data_version() at most every `check_interval`
+    seconds (and right after reload_tables); when a data file changed the cache
+    is dropped along with the loaded tables and the in-memory player ratings, so
+    rebuilt teams see the new data. Teams are built outside the cache lock, so
+    different teams build in parallel; concurrent lookups of the same key wait
+    for the one build.
+    Cached teams are shared between callers: treat them as read-only.
+    """
+
+    def __init__(self, max_size: int = TEAM_CACHE_SIZE, check_interval: float = DATA_CHECK_SECONDS):
+        self.max_size = max_size
+        self.check_interval = check_interval
+        self._teams = OrderedDict()
+        self._building = {}
+        self._lock = threading.RLock()
+        self._version = None
+        self._generation = None
+        self._checked = float('-inf')
+        # Bumped whenever the cache is dropped: builds started before are not stored
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(team_id, season, starters=None, bench=None) -> tuple:
+        return (
+            int(team_id), int(season),
+            None if starters is None else tuple(starters),
+            None if bench is None else tuple(bench),
+        )
+
+    def _check_version(self):
+        now = time.monotonic()
+        if data_csv.data_generation() == self._generation and now - self._checked < self.check_interval:
+            return
+        self._checked = now
+        version = data_csv.data_version()
+        if self._version is not None and version != self._version:
+            instr.count('team_model.cache_invalidations')
+            self._clear()
+            stats_provider.ratings.clear()
+            data_csv.reload_tables()
+            version = data_csv.data_version()
+        self._version = version
+        self._generation = data_csv.data_generation()
+
+    def _clear(self):
+        self._teams.clear()
+        self._building.clear()
+        self._epoch += 1
+
+    def get(self, team_id, season, starters=None, bench=None) -> Team:
+        key = self.key(team_id, season, starters, bench)
+        with self._lock:
+            self._check_version()
+            team = self._teams.get(key)
+            pending = self._building.get(key)
+            if team is not None or pending is not None:
+                self.hits += 1
+                instr.count('team_model.cache_hits')
+            if team is not None:
+                self._teams.move_to_end(key)
+                return team
+            if pending is None:
+                self.misses += 1
+                instr.count('team_model.cache_misses')
+                future = self._building[key] = Future()
+                epoch = self._epoch
+        if pending is not None:
+            return pending.result()
+
+        try:
+            with instr.timer('team_model.build_team'):
+                team = Team(key[0], key[1], starters=starters, bench=bench)
+        except BaseException as exc:
+            with self._lock:
+                if self._building.get(key) is future:
+                    del self._building[key]
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            if self._building.get(key) is future:
+                del self._building[key]
+            if epoch == self._epoch:
+                self._teams[key] = team
+                while len(self._teams) > self.max_size:
+                    self._teams.popitem(last=False)
+        future.set_result(team)
+        return team
+
+    def __len__(self) -> int:
+        return len(self._teams)
+
+    def invalidate(self):
+        """Drop every cached team (the data tables are left alone)."""
+        with self._lock:
+            self._clear()
+
+
+team_cache = TeamCache()
+
+
+def get_team(team_id, season, starters: Optional[List[str]] = None,
+             bench: Optional[List[str]] = None) -> Team:
+    """Return a Team from the process-wide cache, building it on first use."""
+    return team_cache.get(team_id, season, starters, bench)
+
+
+def clear_team_cache():
+    team_cache.invalidate()
@@ -1,10 +1,37 @@
+import numpy as np
+
+PEAK_START, PEAK_END = 22, 28
+FLOOR = 0.65
+
+# Multiplier per whole year of age, AGE_TABLE[age] for 0 <= age <= MAX_TABLE_AGE
+MAX_TABLE_AGE = 60
+
+
+def _curve(age: np.ndarray) -> np.ndarray:
+    return np.where(
+        age <= PEAK_START, 0.85 + 0.03 * (age - 18),
+        np.where(age <= PEAK_END, 1.0, np.fmax(FLOOR, 1.0 - 0.035 * (age - PEAK_END))),
+    )
+
+
+AGE_TABLE = _curve(np.arange(MAX_TABLE_AGE + 1, dtype=float))
+AGE_TABLE.flags.writeable = False
+
+
+def age_multipliers(ages) -> np.ndarray:
+    """
+    age_multiplier over an array of ages: a table lookup for whole ages in
+    [0, MAX_TABLE_AGE], the curve itself for anything else (fractional, NaN, ...).
+    """
+    ages = np.asarray(ages)
+    if ages.dtype.kind in 'iu' and (ages.size == 0 or (ages.min() >= 0 and ages.max() <= MAX_TABLE_AGE)):
+        return AGE_TABLE[ages]
+    return _curve(ages.astype(float))
+
+
 def age_multiplier(age: int) -> float:
     """
     Performance peaks ~28, gentle rise from 18 → 22, slow decline after 28.
     Returns a multiplier in [0.65, 1.0].
     """
-    if age <= 22:
-        return 0.85 + 0.03 * (age - 18)
-    if age <= 28:
-        return 1.0
-    return max(0.65, 1.0 - 0.035 * (age - 28))
+    return float(age_multipliers(age))
@@ -0,0 +1,266 @@
+"""
+Binary columnar cache for the CSV / gzip files under data/.
+
+Each source file is converted once into a directory of .npy column files:
+
+    <cache_dir>/<file name>/current                 name of the published generation
+    <cache_dir>/<file name>/<gen>/meta.json
+    <cache_dir>/<file name>/<gen>/<i>.npy           numeric / bool / datetime columns
+    <cache_dir>/<file name>/<gen>/<i>.mask.npy      (+ NA mask of nullable integer columns)
+    <cache_dir>/<file name>/<gen>/<i>.codes.npy     string columns, dictionary encoded
+    <cache_dir>/<file name>/<gen>/<i>.text.npy      (utf-8 dictionary + char offsets)
+    <cache_dir>/<file name>/<gen>/<i>.offsets.npy
+
+A write fills a new generation directory and then atomically replaces the
+`current` pointer file, so readers never see a half-written or half-removed
+cache; the generation it replaced is kept for readers still on it and removed
+by the next write.
+
+meta.json records the source file's size and mtime, so the cache is rebuilt
+automatically whenever the source changes. A reader may also pass a
+`transform` applied to the parsed frame before it is cached (e.g. a compact
+dtype schema); its `transform_tag` is recorded too, and a cache written with a
+different tag counts as stale. Numeric columns are memory-mapped,
+which makes reads zero-copy and lets several processes share pages through
+the OS page cache.
+"""
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+FORMAT_VERSION = 2
+CACHE_DIRNAME = '.cache'
+POINTER_NAME = 'current'
+
+# Set to False to always parse the source text (e.g. when the data dir is read-only)
+ENABLED = True
+
+
+def source_signature(path) -> dict:
+    """Return the size / mtime signature the cache is keyed on."""
+    st = os.stat(path)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def cache_path(path, cache_dir=None) -> Path:
+    """Return the cache directory for a source file."""
+    path = Path(path)
+    cache_dir = Path(cache_dir) if cache_dir is not None else path.parent / CACHE_DIRNAME
+    return cache_dir / path.name
+
+
+def _pointer(target: Path) -> list:
+    """[current, previous] generation names of a cache directory ([] if none is published)."""
+    try:
+        return (target / POINTER_NAME).read_text().split('\n')[:2]
+    except OSError:
+        return []
+
+
+def _generation(target: Path):
+    names = _pointer(target)
+    return target / names[0] if names and names[0] else None
+
+
+def _read_meta(gen):
+    if gen is None:
+        return None
+    try:
+        with open(gen / 'meta.json', 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def read_meta(target):
+    """Return the meta.json dict of a cache directory, or None if there is no (readable) cache."""
+    return _read_meta(_generation(Path(target)))
+
+
+def is_fresh(path, cache_dir=None, transform_tag=None) -> bool:
+    """True if a cache exists for `path`, matches its current size and mtime, and was written with `transform_tag`."""
+    meta = read_meta(cache_path(path, cache_dir))
+    return (
+        meta is not None
+        and meta.get('format') == FORMAT_VERSION
+        and meta.get('source') == source_signature(path)
+        and meta.get('transform') == transform_tag
+    )
+
+
+def column_names(path, cache_dir=None):
+    """Column names of the cache for `path` in file order, or None if it has no cache yet."""
+    meta = read_meta(cache_path(path, cache_dir))
+    return None if meta is None else [spec['name'] for spec in meta['columns']]
+
+
+def _save_column(tmp: Path, i: int, col: pd.Series) -> dict:
+    dtype = col.dtype
+    if isinstance(dtype, pd.api.extensions.ExtensionDtype) and dtype.kind in 'iu' \
+            and not isinstance(dtype, pd.CategoricalDtype):
+        # Nullable integers: values (0 under NA) plus the NA mask
+        np.save(tmp / f'{i}.npy', col.fillna(0).to_numpy(dtype=dtype.numpy_dtype))
+        np.save(tmp / f'{i}.mask.npy', col.isna().to_numpy())
+        return {'name': col.name, 'kind': 'masked'}
+    if isinstance(dtype, pd.CategoricalDtype):
+        codes = np.asarray(col.cat.codes)
+        values = np.asarray(col.cat.categories)
+        kind = 'category'
+    elif dtype.kind in 'biufcmM' and isinstance(dtype, np.dtype):
+        np.save(tmp / f'{i}.npy', np.ascontiguousarray(col.to_numpy()))
+        return {'name': col.name, 'kind': 'array'}
+    else:
+        codes, values = pd.factorize(col, use_na_sentinel=True)
+        values = np.asarray(values, dtype=object)
+        kind = 'dict'
+    np.save(tmp / f'{i}.codes.npy', codes.astype(np.int32, copy=False))
+    spec = {'name': col.name, 'kind': kind, 'ordered': bool(getattr(dtype, 'ordered', False))}
+    if all(isinstance(v, str) for v in values):
+        # Strings go into one utf-8 blob + offsets; no pickling, no fixed-width padding
+        offsets = np.zeros(len(values) + 1, dtype=np.int64)
+        np.cumsum([len(v) for v in values], out=offsets[1:])
+        text = ''.join(values).encode('utf-8')
+        np.save(tmp / f'{i}.text.npy', np.frombuffer(text, dtype=np.uint8))
+        np.save(tmp / f'{i}.offsets.npy', offsets)
+        spec['values'] = 'text'
+    else:
+        np.save(tmp / f'{i}.values.npy', values, allow_pickle=True)
+        spec['values'] = 'pickle'
+    return spec
+
+
+def write(df: pd.DataFrame, target, source=None, transform_tag=None) -> Path:
+    """
+    Write `df` as a new generation of the column cache at `target` and publish
+    it atomically (see the module docstring).
+    `source` is the signature dict stored in meta.json, with `transform_tag`.
+    """
+    target = Path(target)
+    target.mkdir(parents=True, exist_ok=True)
+    gen = Path(tempfile.mkdtemp(prefix='g.', dir=target))
+    try:
+        columns = [_save_column(gen, i, df[c]) for i, c in enumerate(df.columns)]
+        meta = {
+            'format': FORMAT_VERSION,
+            'source': source,
+            'transform': transform_tag,
+            'rows': int(len(df)),
+            'columns': columns,
+        }
+        with open(gen / 'meta.json', 'w') as f:
+            json.dump(meta, f)
+        _publish(target, gen)
+    except BaseException:
+        shutil.rmtree(gen, ignore_errors=True)
+        raise
+    return target
+
+
+def _publish(target: Path, gen: Path):
+    old = _pointer(target)
+    fd, tmp = tempfile.mkstemp(prefix=f'.{POINTER_NAME}.', dir=target)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(f"{gen.name}\n{old[0] if old else ''}")
+        os.replace(tmp, target / POINTER_NAME)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    if not old:
+        # Files of the flat layout (format 1) written before generations
+        for entry in target.iterdir():
+            if entry.is_file() and not entry.name.startswith('.') and entry.name != POINTER_NAME:
+                entry.unlink(missing_ok=True)
+    # Keep the generation just replaced for readers still on it; drop the one before
+    for name in old[1:]:
+        if name and name not in (gen.name, old[0]):
+            shutil.rmtree(target / name, ignore_errors=True)
+
+
+def _load_column(target: Path, i: int, spec: dict, mmap: bool):
+    mode = 'r' if mmap else None
+    if spec['kind'] == 'array':
+        return np.load(target / f'{i}.npy', mmap_mode=mode)
+    if spec['kind'] == 'masked':
+        values = np.asarray(np.load(target / f'{i}.npy', mmap_mode=mode))
+        return pd.arrays.IntegerArray(values, np.load(target / f'{i}.mask.npy'))
+    codes = np.load(target / f'{i}.codes.npy', mmap_mode=mode)
+    if spec['values'] == 'text':
+        text = np.load(target / f'{i}.text.npy').tobytes().decode('utf-8')
+        offsets = np.load(target / f'{i}.offsets.npy').tolist()
+        values = np.array([text[a:b] for a, b in zip(offsets[:-1], offsets[1:])], dtype=object)
+    else:
+        values = np.load(target / f'{i}.values.npy', allow_pickle=True)
+    if spec['kind'] == 'category':
+        return pd.Categorical.from_codes(codes, categories=values, ordered=spec.get('ordered', False))
+    # -1 codes index the trailing NaN slot
+    lookup = np.empty(len(values) + 1, dtype=object)
+    lookup[:-1] = values
+    lookup[-1] = np.nan
+    return lookup[codes]
+
+
+def _project(names, columns=None, exclude=()) -> list:
+    wanted = None if columns is None else set(columns)
+    return [c for c in names if (wanted is None or c in wanted) and c not in exclude]
+
+
+def read(target, columns=None, mmap=True, exclude=()) -> pd.DataFrame:
+    """Read a column cache directory, optionally projecting to `columns` and leaving out `exclude`."""
+    target = Path(target)
+    # Resolve the generation once: every column comes from the same write
+    gen = _generation(target)
+    meta = _read_meta(gen)
+    if meta is None:
+        raise FileNotFoundError(f"No column cache at {target}")
+    specs = meta['columns']
+    keep = set(_project([spec['name'] for spec in specs], columns, exclude))
+    data = {
+        spec['name']: _load_column(gen, i, spec, mmap)
+        for i, spec in enumerate(specs)
+        if spec['name'] in keep
+    }
+    return pd.DataFrame(data, copy=False)
+
+
+def _parse(path, transform, read_csv_kwargs) -> pd.DataFrame:
+    df = pd.read_csv(path, **read_csv_kwargs)
+    return transform(df) if transform is not None else df
+
+
+def read_csv(path, columns=None, cache_dir=None, *, exclude=(), transform=None, transform_tag=None,
+             **read_csv_kwargs) -> pd.DataFrame:
+    """
+    Drop-in for pd.read_csv that goes through the column cache.
+    The first call (or the first after the source changes) parses the text,
+    applies `transform` and writes the cache; later calls memory-map the
+    column files. `columns` / `exclude` project the returned frame.
+    """
+    if not ENABLED:
+        df = pd.read_csv(path, usecols=columns if transform is None else None, **read_csv_kwargs)
+        if transform is not None:
+            df = transform(df)
+        return df[_project(df.columns, columns, exclude)]
+    target = cache_path(path, cache_dir)
+    df = None
+    if not is_fresh(path, cache_dir, transform_tag):
+        signature = source_signature(path)
+        df = _parse(path, transform, read_csv_kwargs)
+        try:
+            write(df, target, source=signature, transform_tag=transform_tag)
+        except OSError:
+            # Read-only data dir: serve the parsed frame without caching
+            return df[_project(df.columns, columns, exclude)]
+    try:
+        return read(target, columns=columns, exclude=exclude)
+    except OSError:
+        # Another process republished the cache since it was checked, and removed
+        # the generation this read started on: serve the parsed text instead
+        if df is None:
+            df = _parse(path, transform, read_csv_kwargs)
+        return df[_project(df.columns, columns, exclude)]
@@ -0,0 +1,164 @@
+"""
+Sinks for the simulator's event stream.
+
+possession_engine.stream_matchups produces play-by-play events as batches of
+equal-length arrays (one entry per event). A sink is a callable that consumes
+those batches, so it can be passed straight to simulate_matchups /
+simulate_games as `on_event=sink`:
+
+    ArraySink        appends into preallocated typed arrays; .to_frame() on demand
+    ChunkedFileSink  writes compressed .npz chunk files, holding one chunk in memory
+
+Set `game_offset` between batches so several simulations can share one sink
+with distinct game numbers.
+"""
+import os
+from pathlib import Path
+from typing import Iterator, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+EVENT_DTYPES = {
+    'game': np.int64,
+    'clock': np.float32,
+    'team': np.int8,
+    'slot': np.int16,
+    'event': np.int8,
+    'points': np.int8,
+    'home_score': np.int16,
+    'away_score': np.int16,
+}
+
+_CHUNK_GLOB = 'part-[0-9]*.npz'
+
+
+class EventSink:
+    """Base class: call with an event batch; use as a context manager to close."""
+
+    game_offset = 0
+
+    def __call__(self, events: dict):
+        self.write(events)
+
+    def write(self, events: dict):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ArraySink(EventSink):
+    """Appends events into preallocated typed arrays, doubling capacity when full."""
+
+    def __init__(self, capacity: int = 1 << 16, game_offset: int = 0):
+        self.size = 0
+        self.game_offset = game_offset
+        self._cols = {k: np.empty(max(1, capacity), dtype=dt) for k, dt in EVENT_DTYPES.items()}
+
+    @property
+    def capacity(self) -> int:
+        return len(self._cols['event'])
+
+    def _reserve(self, needed: int):
+        if needed <= self.capacity:
+            return
+        cap = self.capacity
+        while cap < needed:
+            cap *= 2
+        for k, col in self._cols.items():
+            grown = np.empty(cap, dtype=col.dtype)
+            grown[:self.size] = col[:self.size]
+            self._cols[k] = grown
+
+    def write(self, events: dict):
+        n = len(events['event'])
+        self._reserve(self.size + n)
+        end = self.size + n
+        for k, col in self._cols.items():
+            col[self.size:end] = events[k]
+        if self.game_offset:
+            self._cols['game'][self.size:end] += self.game_offset
+        self.size = end
+
+    def arrays(self) -> dict:
+        """Views of the filled part of each column."""
+        return {k: col[:self.size] for k, col in self._cols.items()}
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.arrays())
+
+    def reset(self):
+        self.size = 0
+
+
+def _part_number(path: Path) -> int:
+    return int(path.stem.split('-')[1])
+
+
+class ChunkedFileSink(EventSink):
+    """
+    Writes events to `directory/part-NNNNN.npz` (compressed), flushing every
+    `chunk_rows` events so memory stays flat however many games are streamed.
+    Existing parts are kept and numbering continues after them.
+    """
+
+    def __init__(self, directory, chunk_rows: int = 1 << 20, game_offset: int = 0):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.chunk_rows = chunk_rows
+        self.game_offset = game_offset
+        self.paths = []
+        # After the highest existing part, so a gap in the numbering never overwrites one
+        self._next = max((_part_number(p) for p in self.directory.glob(_CHUNK_GLOB)), default=-1) + 1
+        self._buffer = ArraySink(capacity=chunk_rows)
+
+    def write(self, events: dict):
+        n = len(events['event'])
+        start = 0
+        while start < n:
+            take = min(n - start, self.chunk_rows - self._buffer.size)
+            part = {k: v[start:start + take] for k, v in events.items()}
+            if self.game_offset:
+                part['game'] = part['game'] + self.game_offset
+            self._buffer.write(part)
+            start += take
+            if self._buffer.size >= self.chunk_rows:
+                self.flush()
+
+    def flush(self):
+        if self._buffer.size == 0:
+            return
+        path = self.directory / f'part-{self._next:05d}.npz'
+        tmp = path.with_suffix('.tmp')
+        with open(tmp, 'wb') as fh:
+            np.savez_compressed(fh, **self._buffer.arrays())
+        os.replace(tmp, path)
+        self.paths.append(path)
+        self._next += 1
+        self._buffer.reset()
+
+    def close(self):
+        self.flush()
+
+
+def read_chunks(directory, columns: Optional[Sequence[str]] = None) -> Iterator[pd.DataFrame]:
+    """Yield the chunks written by a ChunkedFileSink one DataFrame at a time."""
+    for path in sorted(Path(directory).glob(_CHUNK_GLOB), key=_part_number):
+        with np.load(path) as npz:
+            keys = columns if columns is not None else npz.files
+            yield pd.DataFrame({k: npz[k] for k in keys})
+
+
+def read_events(directory, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Read every chunk in `directory` into one DataFrame."""
+    frames = list(read_chunks(directory, columns))
+    if not frames:
+        return pd.DataFrame(columns=list(columns or EVENT_DTYPES))
+    return pd.concat(frames, ignore_index=True)
@@ -1,6 +1,21 @@
+import numpy as np
+
+# Output drops FATIGUE_PER_MINUTE for every minute played beyond FATIGUE_START
+FATIGUE_START = 30
+FATIGUE_PER_MINUTE = 0.005
+
+
+def fatigue_factors(minutes_played) -> np.ndarray:
+    """
+    fatigue_factor over an array of minutes played, in one array operation
+    (NaN minutes count as fresh, like the scalar version).
+    """
+    minutes = np.asarray(minutes_played, dtype=float)
+    return 1.0 - FATIGUE_PER_MINUTE * np.fmax(0.0, minutes - FATIGUE_START)
+
+
 def fatigue_factor(minutes_played: float) -> float:
     """
     Simple linear fatigue: after 30 minutes, output drops 0.5 % per extra minute.
     """
-    excess = max(0, minutes_played - 30)
-    return 1.0 - 0.005 * excess
+    return float(fatigue_factors(minutes_played))
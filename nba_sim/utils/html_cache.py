@@ -0,0 +1,186 @@
+"""
+On-disk cache for fetched pages, shared by every process on the machine.
+
+Bodies are stored zlib-compressed under their content digest
+(<dir>/blobs/ab/abcdef....z), so identical pages are kept once. A SQLite index
+(<dir>/index.sqlite) maps the SHA-256 of each URL to its body digest, fetch
+time, compressed size and last access time. Entries older than the caller's TTL
+are misses, but they can still be served as a fallback when a refetch fails.
+Once the blobs exceed `max_bytes`, the least recently used entries are evicted.
+
+Blob files are written to a temporary name and renamed into place. Index
+updates are single SQLite transactions, so concurrent worker processes can
+share one cache directory.
+"""
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Optional
+
+MAX_BYTES = 256 << 20
+COMPRESSLEVEL = 6
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    url_key  TEXT PRIMARY KEY,
+    url      TEXT NOT NULL,
+    digest   TEXT NOT NULL,
+    size     INTEGER NOT NULL,
+    fetched  REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+CREATE INDEX IF NOT EXISTS entries_digest ON entries (digest);
+"""
+
+
+def url_key(url: str) -> str:
+    """Stable cache key of a URL (the same in every interpreter run)."""
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+class HtmlCache:
+    """Compressed, content-addressed page cache with a TTL and an LRU byte budget."""
+
+    def __init__(self, directory, max_bytes: int = MAX_BYTES):
+        self.directory = Path(directory)
+        self.blob_dir = self.directory / "blobs"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self._local = threading.local()
+        self._counter_lock = threading.Lock()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.directory / "index.sqlite", timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.blob_dir / digest[:2] / f"{digest}.z"
+
+    def _count(self, name: str):
+        with self._counter_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def get(self, url: str, ttl_hours: Optional[float] = None) -> Optional[str]:
+        """
+        Return the cached body of `url`, or None if it is missing or older than
+        `ttl_hours` (None: any age). Counts a hit or a miss.
+        """
+        body = self._read(url, ttl_hours)
+        self._count("hits" if body is not None else "misses")
+        return body
+
+    def get_stale(self, url: str) -> Optional[str]:
+        """Return the cached body of `url` whatever its age (fallback when a fetch fails)."""
+        body = self._read(url, None)
+        if body is not None:
+            self._count("stale_hits")
+        return body
+
+    def _read(self, url: str, ttl_hours: Optional[float]) -> Optional[str]:
+        conn = self._connect()
+        key = url_key(url)
+        row = conn.execute("SELECT digest, fetched FROM entries WHERE url_key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        digest, fetched = row
+        now = time.time()
+        if ttl_hours is not None and now - fetched >= ttl_hours * 3600:
+            return None
+        try:
+            data = self._blob_path(digest).read_bytes()
+        except FileNotFoundError:
+            # Evicted by another process between the lookup and the read
+            return None
+        with conn:
+            conn.execute("UPDATE entries SET accessed = ? WHERE url_key = ?", (now, key))
+        return zlib.decompress(data).decode("utf-8")
+
+    def put(self, url: str, body: str):
+        """Store `body` for `url`, then evict least recently used entries over the budget."""
+        data = zlib.compress(body.encode("utf-8"), COMPRESSLEVEL)
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as fh:
+                    fh.write(data)
+                os.replace(tmp, path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (url_key, url, digest, size, fetched, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url_key(url), url, digest, len(data), now, now),
+            )
+        self.evict()
+
+    def evict(self, max_bytes: Optional[int] = None):
+        """Drop least recently used entries until the stored bodies fit in `max_bytes`."""
+        budget = self.max_bytes if max_bytes is None else max_bytes
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            total = conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT digest, size FROM entries)"
+            ).fetchone()[0]
+            if total <= budget:
+                return
+            orphans = []
+            for key, digest, size in conn.execute(
+                    "SELECT url_key, digest, size FROM entries ORDER BY accessed").fetchall():
+                if total <= budget:
+                    break
+                conn.execute("DELETE FROM entries WHERE url_key = ?", (key,))
+                # A body shared by several URLs only frees space with its last reference
+                if conn.execute("SELECT 1 FROM entries WHERE digest = ? LIMIT 1", (digest,)).fetchone() is None:
+                    orphans.append(digest)
+                    total -= size
+        for digest in orphans:
+            try:
+                self._blob_path(digest).unlink()
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> dict:
+        """Hit / miss counters of this process plus the size of the shared cache."""
+        conn = self._connect()
+        entries = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        size = conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT digest, size FROM entries)"
+        ).fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "stale_hits": self.stale_hits,
+                "entries": entries, "bytes": size}
+
+    def clear(self):
+        """Remove every entry and body."""
+        conn = self._connect()
+        with conn:
+            digests = [d for (d,) in conn.execute("SELECT DISTINCT digest FROM entries")]
+            conn.execute("DELETE FROM entries")
+        for digest in digests:
+            try:
+                self._blob_path(digest).unlink()
+            except FileNotFoundError:
+                pass
@@ -8,11 +8,18 @@ Categories we recognise:
     - probable       -> cap 28 minutes
     - day‑to‑day     -> treated as probable
 """
-import re, requests
+import re
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 from bs4 import BeautifulSoup
 from unidecode import unidecode
 
+from nba_sim.utils import scraping
+
 UA = {"User-Agent": "nba-sim/0.5 (+https://github.com/you)"}
+PLAYER_URL = "https://www.espn.com/nba/player/_/name/{slug}"
+# Player pages are reused from the scraping cache for this long
+STATUS_TTL_HOURS = 6
 
 def _slug(name: str) -> str:
     return unidecode(name.lower()).replace(".", "").replace(" ", "-")
@@ -22,8 +29,8 @@ def get_status(full_name: str) -> str:
     Returns one of: 'out', 'doubtful', 'questionable', 'probable', 'healthy'
     """
     try:
-        url = f"https://www.espn.com/nba/player/_/name/{_slug(full_name)}"
-        html = requests.get(url, headers=UA, timeout=15).text
+        url = PLAYER_URL.format(slug=_slug(full_name))
+        html = scraping.fetch_url(url, ttl_hours=STATUS_TTL_HOURS, headers=UA, timeout=15)
         soup = BeautifulSoup(html, "lxml")
 
         # find injury table row
@@ -39,11 +46,30 @@ def get_status(full_name: str) -> str:
     except Exception:
         return "healthy"
 
+def get_statuses(names, max_workers: int = scraping.MAX_WORKERS) -> dict:
+    """
+    get_status for many players at once over the pooled, rate-limited session.
+    Returns {name: status}.
+    """
+    names = list(dict.fromkeys(names))
+    if not names:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(names)))) as pool:
+        return dict(zip(names, pool.map(get_status, names)))
+
+# Status codes for array-based rosters, in order of increasing severity
+STATUS_CODES = {"healthy": 0, "probable": 1, "questionable": 2, "doubtful": 3, "out": 4}
+# Minutes cap per status code
+MINUTES_CAPS = np.array([34, 28, 16, 8, 0], dtype=np.int64)
+MINUTES_CAPS.flags.writeable = False
+
+def status_codes(statuses) -> np.ndarray:
+    """Map status strings to STATUS_CODES (unknown statuses count as healthy)."""
+    return np.array([STATUS_CODES.get(s, 0) for s in statuses], dtype=np.int8)
+
+def minutes_caps(codes) -> np.ndarray:
+    """Minutes cap for an array of status codes, as one lookup."""
+    return MINUTES_CAPS[np.asarray(codes, dtype=np.intp)]
+
 def minutes_cap(status: str) -> int:
-    return {
-        "out":          0,
-        "doubtful":     8,
-        "questionable": 16,
-        "probable":     28,
-        "healthy":      34
-    }.get(status, 34)
+    return int(MINUTES_CAPS[STATUS_CODES.get(status, 0)])
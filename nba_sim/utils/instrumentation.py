@@ -0,0 +1,194 @@
+"""
+Opt-in timers and counters for the hot paths of nba_sim.
+
+Instrumentation is off by default; every hook then returns after one flag
+check. Turn it on for the whole process with NBA_SIM_INSTRUMENT=1, or for a
+block of code:
+
+    with instrumentation.instrument() as reg:
+        get_team(1610612744, 2022)
+    print(reg.to_prometheus())
+
+Stages record into the process-wide `registry`:
+
+    with timer('data_csv.get_roster'):     # call count, total and max seconds
+        ...
+    count('data_csv.rows_loaded', len(df))  # monotonic counter
+
+Names are dotted '<module>.<metric>'. The registry exports a JSON snapshot or
+Prometheus text. With NBA_SIM_INSTRUMENT_DUMP=<path> it is written to that
+file at exit (Prometheus text for *.prom / *.txt, JSON otherwise).
+"""
+import atexit
+import functools
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+ENV_VAR = 'NBA_SIM_INSTRUMENT'
+DUMP_ENV_VAR = 'NBA_SIM_INSTRUMENT_DUMP'
+PROMETHEUS_PREFIX = 'nba_sim_'
+
+_enabled = os.environ.get(ENV_VAR, '').strip().lower() not in ('', '0', 'false', 'no', 'off')
+
+
+class Registry:
+    """Thread-safe store of timers ({name: [calls, total_s, max_s]}) and counters ({name: value})."""
+
+    def __init__(self):
+        self._timers = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def add_time(self, name: str, seconds: float):
+        with self._lock:
+            stat = self._timers.get(name)
+            if stat is None:
+                self._timers[name] = [1, seconds, seconds]
+            else:
+                stat[0] += 1
+                stat[1] += seconds
+                stat[2] = max(stat[2], seconds)
+
+    def incr(self, name: str, n=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def snapshot(self) -> dict:
+        """{'timers': {name: {calls, total_s, max_s}}, 'counters': {name: value}}"""
+        with self._lock:
+            return {
+                'timers': {k: {'calls': c, 'total_s': t, 'max_s': m}
+                           for k, (c, t, m) in sorted(self._timers.items())},
+                'counters': dict(sorted(self._counters.items())),
+            }
+
+    def reset(self):
+        with self._lock:
+            self._timers.clear()
+            self._counters.clear()
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition: counters as *_total, timers as *_seconds_total / _calls_total / _seconds_max."""
+        snap = self.snapshot()
+        lines = []
+        for name, value in snap['counters'].items():
+            metric = _metric_name(name) + '_total'
+            lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+        for name, stat in snap['timers'].items():
+            base = _metric_name(name)
+            lines += [
+                f"# TYPE {base}_calls_total counter", f"{base}_calls_total {stat['calls']}",
+                f"# TYPE {base}_seconds_total counter", f"{base}_seconds_total {stat['total_s']:.9g}",
+                f"# TYPE {base}_seconds_max gauge", f"{base}_seconds_max {stat['max_s']:.9g}",
+            ]
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, path: str):
+        """Write Prometheus text (*.prom, *.txt) or JSON (anything else) to `path`."""
+        text = self.to_prometheus() if str(path).endswith(('.prom', '.txt')) else self.to_json()
+        with open(path, 'w') as f:
+            f.write(text)
+
+
+def _metric_name(name: str) -> str:
+    return PROMETHEUS_PREFIX + re.sub(r'[^a-zA-Z0-9_]', '_', name)
+
+
+registry = Registry()
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def enable(on: bool = True):
+    """Switch instrumentation on (or off) for the whole process."""
+    global _enabled
+    _enabled = bool(on)
+
+
+@contextmanager
+def instrument(reset: bool = True):
+    """Record within the block (starting from an empty registry if `reset`); yields the registry."""
+    previous = _enabled
+    if reset:
+        registry.reset()
+    enable(True)
+    try:
+        yield registry
+    finally:
+        enable(previous)
+
+
+class _Timer:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        registry.add_time(self.name, time.perf_counter() - self.start)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(name: str):
+    """Context manager timing its block under `name` (a shared no-op when disabled)."""
+    return _Timer(name) if _enabled else _NULL_TIMER
+
+
+def count(name: str, n=1):
+    """Add `n` to counter `name` (no-op when disabled)."""
+    if _enabled:
+        registry.incr(name, n)
+
+
+def timed(name: Optional[str] = None):
+    """Decorator timing every call of a function (default name: '<module>.<function>')."""
+    def wrap(fn):
+        label = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                registry.add_time(label, time.perf_counter() - start)
+        return inner
+    return wrap
+
+
+def _dump_at_exit():
+    path = os.environ.get(DUMP_ENV_VAR)
+    snap = registry.snapshot()
+    if path and (snap['timers'] or snap['counters']):
+        registry.dump(path)
+
+
+atexit.register(_dump_at_exit)
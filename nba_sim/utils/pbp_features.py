@@ -0,0 +1,136 @@
+"""
+Typed per-event features derived from raw play-by-play.
+
+add_features runs once per season file, as part of the schema transform
+applied before the file is written to the column cache (see
+data_csv.read_play_by_play), so the columns below are stored next to the
+events and consumers never parse description strings:
+
+    is_three        field goal attempt from three ('3PT' in the description)
+    shot_made       made field goal or made free throw
+    acting_side     side of player1: 0 home, 1 visitor, -1 none (int8)
+    acting_team_id  team of player1, or the team itself for team events (Int32)
+    offense_side    side with the ball, carried forward between events (int8)
+    possession_id   possession number within the game, from 0 (int32)
+    oreb, dreb      offensive / defensive rebound
+
+Possessions change when the side with the ball changes or a period starts;
+shots, free throws, turnovers and rebounds tell which side has the ball, so
+and-ones and offensive rebounds stay in the same possession.
+"""
+import numpy as np
+import pandas as pd
+
+# Bump when a feature definition changes: cached season files are rebuilt
+FEATURES_VERSION = 1
+
+FEATURE_COLUMNS = [
+    'is_three', 'shot_made', 'acting_side', 'acting_team_id', 'offense_side',
+    'possession_id', 'oreb', 'dreb',
+]
+
+# eventmsgtype codes
+MADE_SHOT, MISSED_SHOT, FREE_THROW, REBOUND, TURNOVER = 1, 2, 3, 4, 5
+
+# person1type codes: team events (2, 3) and player events (4, 5) per side
+_HOME_TYPES, _AWAY_TYPES = (2, 4), (3, 5)
+_TEAM_TYPES = (2, 3)
+
+# Events whose acting side has the ball
+_OFFENSE_EVENTS = (MADE_SHOT, MISSED_SHOT, FREE_THROW, TURNOVER)
+
+
+def _contains(pbp: pd.DataFrame, col: str, text: str) -> np.ndarray:
+    if col not in pbp.columns or pbp[col].dtype.kind in 'fiu':
+        # Missing, or an all-empty description column that parsed as float
+        return np.zeros(len(pbp), dtype=bool)
+    return pbp[col].str.contains(text, na=False, regex=False).to_numpy(dtype=bool)
+
+
+def _described(pbp: pd.DataFrame, text: str) -> np.ndarray:
+    flag = np.zeros(len(pbp), dtype=bool)
+    for col in ('homedescription', 'visitordescription'):
+        flag |= _contains(pbp, col, text)
+    return flag
+
+
+def _int_column(pbp: pd.DataFrame, col: str, missing=0) -> np.ndarray:
+    if col not in pbp.columns:
+        return np.full(len(pbp), missing, dtype=np.int64)
+    return pd.to_numeric(pbp[col], errors='coerce').fillna(missing).to_numpy(dtype=np.int64)
+
+
+def _ffill_within(values: np.ndarray, groups: np.ndarray) -> np.ndarray:
+    """Carry the last value >= 0 forward within runs of equal `groups`; -1 before the first."""
+    n = len(values)
+    pos = np.arange(n)
+    last = np.maximum.accumulate(np.where(values >= 0, pos, -1)) if n else pos
+    start = np.maximum.accumulate(np.where(np.r_[True, groups[1:] != groups[:-1]], pos, 0)) if n else pos
+    seen = last >= start
+    out = np.full(n, -1, dtype=values.dtype)
+    out[seen] = values[last[seen]]
+    return out
+
+
+def acting_side(pbp: pd.DataFrame) -> np.ndarray:
+    """Side of each event's player1 (0 home, 1 visitor, -1 none), falling back to which description is set."""
+    ptype = _int_column(pbp, 'person1type')
+    side = np.full(len(pbp), -1, dtype=np.int8)
+    for col, code in (('homedescription', 0), ('visitordescription', 1)):
+        if col in pbp.columns:
+            side[(side < 0) & pbp[col].notna().to_numpy()] = code
+    typed = np.isin(ptype, _HOME_TYPES + _AWAY_TYPES)
+    side[typed] = np.where(np.isin(ptype[typed], _AWAY_TYPES), 1, 0)
+    return side
+
+
+def add_features(pbp: pd.DataFrame) -> pd.DataFrame:
+    """Return `pbp` with FEATURE_COLUMNS added. Events must be in order within each game."""
+    if 'eventmsgtype' not in pbp.columns or 'game_id' not in pbp.columns:
+        return pbp
+    gids = _int_column(pbp, 'game_id')
+    starts = np.flatnonzero(np.r_[True, gids[1:] != gids[:-1]])
+    if len(np.unique(gids[starts])) != len(starts):
+        # A game is split across the file: derive on the rows grouped by game, in original order after
+        order = np.argsort(gids, kind='stable')
+        out = add_features(pbp.iloc[order])
+        return out.iloc[np.argsort(order)]
+    msg = _int_column(pbp, 'eventmsgtype')
+    game = _int_column(pbp, 'game_id')
+    period = _int_column(pbp, 'period')
+    ptype = _int_column(pbp, 'person1type')
+    shot = np.isin(msg, (MADE_SHOT, MISSED_SHOT))
+
+    side = acting_side(pbp)
+    team = _int_column(pbp, 'player1_team_id')
+    team_event = np.isin(ptype, _TEAM_TYPES)
+    team[team_event] = _int_column(pbp, 'player1_id')[team_event]
+
+    # Side with the ball: set by offensive events and rebounds, carried forward within a period
+    segment = game * 16 + period
+    has_ball = np.where(np.isin(msg, _OFFENSE_EVENTS + (REBOUND,)), side, -1).astype(np.int8)
+    offense = _ffill_within(has_ball, segment)
+    # Events before the first offensive event of a period belong to the first possession
+    first = _ffill_within(has_ball[::-1], segment[::-1])[::-1]
+    offense = np.where(offense < 0, first, offense)
+
+    changed = np.r_[True, (segment[1:] != segment[:-1]) | (offense[1:] != offense[:-1])]
+    new_game = np.r_[True, game[1:] != game[:-1]]
+    count = np.cumsum(changed)
+    possession = count - np.maximum.accumulate(np.where(new_game, count, 0))
+
+    # Rebounds: offensive if the rebounding side took the last shot before it in the period
+    took_shot = np.isin(msg, (MADE_SHOT, MISSED_SHOT, FREE_THROW))
+    shooter = _ffill_within(np.where(took_shot, side, -1).astype(np.int8), segment)
+    rebound = (msg == REBOUND) & (side >= 0) & (shooter >= 0)
+
+    out = pbp.copy()
+    out['is_three'] = shot & _described(pbp, '3PT')
+    out['shot_made'] = (msg == MADE_SHOT) | ((msg == FREE_THROW) & ~_described(pbp, 'MISS'))
+    out['acting_side'] = side
+    out['acting_team_id'] = pd.arrays.IntegerArray(np.maximum(team, 0).astype(np.int32), team <= 0)
+    out['offense_side'] = offense.astype(np.int8)
+    out['possession_id'] = possession.astype(np.int32)
+    out['oreb'] = rebound & (side == shooter)
+    out['dreb'] = rebound & (side != shooter)
+    return out
@@ -0,0 +1,148 @@
+"""
+Season-wide player rating table built from play-by-play.
+
+Each play_by_play_<key>.csv.gz file is reduced in one vectorized pass to shot
+and rebound counts per player: the player_counts artifact of the precompute
+store, rebuilt only for season files that are new or have changed. Counts
+from every file of a season year (preseason, playoffs, ...) are summed into
+FG%, 3P%, 3PA share and rebound rate, and served as O(1) dict lookups.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from nba_sim.utils import instrumentation as instr
+from nba_sim.utils import precompute
+
+COUNT_COLUMNS = ['fgm', 'fga', 'fg3m', 'fg3a', 'rebs', 'games']
+RATING_COLUMNS = ['fg_pct', 'three_pct', 'three_prop', 'reb_rate']
+
+# Used when a player has no attempts / games in the season
+DEFAULTS = {'fg_pct': 0.45, 'three_pct': 0.35, 'three_prop': 0.30, 'reb_rate': 0.15}
+
+# is_three is a derived column of the season file (see pbp_features)
+_COLUMNS = ['game_id', 'eventmsgtype', 'period', 'player1_id', 'is_three']
+
+
+def season_counts(pbp: pd.DataFrame, season: int) -> pd.DataFrame:
+    """
+    Reduce one season file's events to per-player counts in a single pass.
+    Returns columns ['season', 'player_id'] + COUNT_COLUMNS.
+    """
+    msg = pbp['eventmsgtype'].to_numpy()
+    pid = pbp['player1_id'].fillna(0).to_numpy(dtype=np.int64)
+    shot = np.isin(msg, (1, 2)) & (pbp['period'].to_numpy() <= 4)
+    three = shot & pbp['is_three'].to_numpy(dtype=bool)
+    made = msg == 1
+
+    per_event = pd.DataFrame({
+        'player_id': pid,
+        'fgm': (shot & made).astype(np.int32),
+        'fga': shot.astype(np.int32),
+        'fg3m': (shot & made & three).astype(np.int32),
+        'fg3a': (shot & three).astype(np.int32),
+        'rebs': (msg == 4).astype(np.int32),
+    })
+    per_event = per_event[per_event['player_id'] > 0]
+    counts = per_event.groupby('player_id').sum()
+    games = (
+        pd.DataFrame({'player_id': pid, 'game_id': pbp['game_id'].to_numpy()})
+        .drop_duplicates()
+        .groupby('player_id')
+        .size()
+    )
+    counts['games'] = games.reindex(counts.index).fillna(0).astype(np.int32)
+    counts = counts.reset_index()
+    counts.insert(0, 'season', np.int32(season))
+    return counts[['season', 'player_id'] + COUNT_COLUMNS]
+
+
+def rates(counts: pd.DataFrame) -> pd.DataFrame:
+    """Turn summed counts into rating columns, falling back to DEFAULTS."""
+    out = counts.copy()
+    fga, fg3a, games = (counts[c].to_numpy(dtype=float) for c in ('fga', 'fg3a', 'games'))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out['fg_pct'] = np.where(fga > 0, counts['fgm'] / fga, DEFAULTS['fg_pct'])
+        out['three_pct'] = np.where(fg3a > 0, counts['fg3m'] / fg3a, DEFAULTS['three_pct'])
+        out['three_prop'] = np.where(fga > 0, fg3a / fga, DEFAULTS['three_prop'])
+        out['reb_rate'] = np.where(
+            games > 0, np.minimum(1.0, counts['rebs'] / games / 100), DEFAULTS['reb_rate']
+        )
+    return out
+
+
+def _partition_counts(pbp: pd.DataFrame, key: str) -> pd.DataFrame:
+    instr.count('player_ratings.rows_scanned', len(pbp))
+    return season_counts(pbp, int(str(key)[1:]))
+
+
+def _sum_counts(parts) -> pd.DataFrame:
+    return pd.concat(parts, ignore_index=True).groupby(
+        ['season', 'player_id'], as_index=False
+    )[COUNT_COLUMNS].sum()
+
+
+PLAYER_COUNTS = precompute.register(precompute.Artifact(
+    'player_counts', 1, _COLUMNS, _partition_counts, _sum_counts,
+))
+
+
+class PlayerRatings:
+    """
+    Player rating table over a PlayByPlayStore.
+    Per-file counts come from the precompute store (<data>/.cache/precompute),
+    keyed on the source file's size and mtime, so a new season file only costs
+    its own pass.
+    """
+
+    def __init__(self, store, cache_dir=None):
+        self.store = store
+        self.precomputed = precompute.PrecomputeStore(store, cache_dir)
+        self._lookup = {}
+        self._lock = threading.Lock()
+
+    def partition(self, key) -> pd.DataFrame:
+        """Return the per-player counts of one season file, computing them if stale."""
+        return self.precomputed.partition(PLAYER_COUNTS, key)
+
+    def counts(self, seasons=None) -> pd.DataFrame:
+        """Summed counts per (season, player_id) over all files of the given season years."""
+        if seasons is None:
+            counts = self.precomputed.aggregate(PLAYER_COUNTS)
+        else:
+            counts = self.precomputed.partitions(PLAYER_COUNTS, seasons)
+        if counts.empty:
+            return pd.DataFrame(columns=['season', 'player_id'] + COUNT_COLUMNS)
+        return counts
+
+    def table(self, seasons=None) -> pd.DataFrame:
+        """Rating table indexed by (season, player_id)."""
+        return rates(self.counts(seasons)).set_index(['season', 'player_id'])
+
+    def season_lookup(self, season) -> dict:
+        """Dict of player_id -> rating dict for one season, built once."""
+        season = int(season)
+        lookup = self._lookup.get(season)
+        if lookup is None:
+            with self._lock:
+                lookup = self._lookup.get(season)
+                if lookup is None:
+                    instr.count('player_ratings.lookup_builds')
+                    tbl = rates(self.counts([season]))
+                    lookup = {
+                        int(pid): dict(zip(RATING_COLUMNS, vals))
+                        for pid, *vals in zip(tbl['player_id'], *(tbl[c].tolist() for c in RATING_COLUMNS))
+                    }
+                    self._lookup[season] = lookup
+        return lookup
+
+    def get(self, player_id, season) -> dict:
+        """Return the rating dict for a player in a season (DEFAULTS if unseen)."""
+        return dict(self.season_lookup(season).get(int(player_id), DEFAULTS))
+
+    def clear(self):
+        """Forget in-memory lookups (the on-disk partitions stay valid)."""
+        with self._lock:
+            self._lookup.clear()
+        self.precomputed.clear()
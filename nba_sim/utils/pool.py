@@ -0,0 +1,49 @@
+"""
+Process pools whose workers share read-only state.
+
+shared_pool puts a dict of state (compiled teams, engine factors, ...) into
+SHARED for the length of a with-block and starts the pool. Under fork the
+children inherit SHARED as it is, so tasks only carry small arguments
+(indexes, seeds); under spawn each worker receives it once through the pool
+initializer. Worker functions read their inputs from SHARED.
+"""
+import multiprocessing as mp
+from contextlib import contextmanager
+
+# Read-only state for worker functions, set by shared_pool
+SHARED: dict = {}
+
+
+def _init_worker(shared: dict):
+    SHARED.update(shared)
+
+
+def pool_context():
+    """The fork context where available (workers inherit SHARED), else the default one."""
+    methods = mp.get_all_start_methods()
+    return mp.get_context('fork') if 'fork' in methods else mp.get_context()
+
+
+@contextmanager
+def shared_pool(shared: dict, workers: int):
+    """
+    Yield a pool of `workers` processes that see `shared` in SHARED, or None
+    when workers <= 1 (the caller runs its tasks in-process, where SHARED is set
+    too). SHARED is restored on exit, so nested uses do not clobber each other.
+    """
+    saved = dict(SHARED)
+    SHARED.update(shared)
+    try:
+        if workers <= 1:
+            yield None
+            return
+        ctx = pool_context()
+        if ctx.get_start_method() == 'fork':
+            pool = ctx.Pool(workers)
+        else:
+            pool = ctx.Pool(workers, initializer=_init_worker, initargs=(shared,))
+        with pool:
+            yield pool
+    finally:
+        SHARED.clear()
+        SHARED.update(saved)
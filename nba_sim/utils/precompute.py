@@ -0,0 +1,304 @@
+"""
+Dependency-tracked store of products derived from the play-by-play season files.
+
+An Artifact is computed per season file (a partition) and merged across
+files into an aggregate. Both are written as column caches under
+<data>/.cache/precompute/<artifact>/:
+
+    <file name>/        one partition, keyed on its source file's size / mtime
+    _aggregate/         the merge of every partition, keyed on all of them
+
+and both record the code version they came from: the artifact's version plus
+the play-by-play schema they were derived from. When a season file is added
+or changes, only its partitions are recomputed and the aggregates re-merged
+from the cached partitions; a version bump rebuilds the artifact.
+
+Artifacts registered here:
+    games        game_id -> season key, season year and final score
+    pbp_rosters  (season, team_id, player_id) -> games with an event
+Modules add their own with register() (player_ratings: player_counts,
+stints: stints). Refresh everything, e.g. after a nightly data update, with
+
+    python -m nba_sim.utils.precompute [--workers N] [ARTIFACT ...]
+"""
+import argparse
+import importlib
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from nba_sim.utils import column_cache
+from nba_sim.utils import instrumentation as instr
+from nba_sim.utils.pool import shared_pool
+
+PRECOMPUTE_DIRNAME = 'precompute'
+AGGREGATE_NAME = '_aggregate'
+
+# Modules that register artifacts on import
+ARTIFACT_MODULES = ('nba_sim.utils.player_ratings', 'nba_sim.utils.stints')
+
+
+@dataclass(frozen=True)
+class Artifact:
+    """
+    name:     directory name under the store
+    version:  bump when `compute` or `merge` changes; cached data is rebuilt
+    columns:  play-by-play columns `compute` reads
+    compute:  (events of one season file, season key) -> partition DataFrame
+    merge:    list of partitions -> aggregate (default: concatenation)
+    """
+    name: str
+    version: int
+    columns: Sequence[str]
+    compute: Callable[[pd.DataFrame, str], pd.DataFrame]
+    merge: Optional[Callable[[List[pd.DataFrame]], pd.DataFrame]] = None
+
+
+ARTIFACTS: Dict[str, Artifact] = {}
+
+
+def register(artifact: Artifact) -> Artifact:
+    ARTIFACTS[artifact.name] = artifact
+    return artifact
+
+
+def load_artifacts() -> Dict[str, Artifact]:
+    """Import every module in ARTIFACT_MODULES and return the registry."""
+    for module in ARTIFACT_MODULES:
+        importlib.import_module(module)
+    return ARTIFACTS
+
+
+def _concat(parts: List[pd.DataFrame]) -> pd.DataFrame:
+    return pd.concat(parts, ignore_index=True)
+
+# Built-in artifacts
+
+def _games(pbp: pd.DataFrame, key: str) -> pd.DataFrame:
+    """Season and final (home, away) points of every game in one season file."""
+    last = pbp[pbp['score'].notna()].drop_duplicates('game_id', keep='last')
+    # score reads "VISITOR - HOME"
+    parts = last['score'].astype(str).str.split('-', n=1, expand=True).reindex(columns=[0, 1])
+    scores = pd.DataFrame({
+        'game_id': last['game_id'].to_numpy(dtype=np.int64),
+        'pts_home': pd.to_numeric(parts[1], errors='coerce').to_numpy(),
+        'pts_away': pd.to_numeric(parts[0], errors='coerce').to_numpy(),
+    })
+    games = pd.DataFrame({'game_id': np.unique(pbp['game_id'].to_numpy(dtype=np.int64))})
+    games.insert(1, 'season_key', str(key))
+    games.insert(2, 'season', np.int32(int(str(key)[1:])))
+    games.insert(3, 'season_type', np.int8(int(str(key)[0])))
+    return games.merge(scores, on='game_id', how='left')
+
+
+def _pbp_rosters(pbp: pd.DataFrame, key: str) -> pd.DataFrame:
+    """Games per (team, player) among the player events of one season file."""
+    ours = pbp[pbp['player1_team_id'].notna() & (pbp['player1_id'].fillna(0) > 0)]
+    out = pd.DataFrame({
+        'team_id': ours['player1_team_id'].to_numpy(dtype=np.int64),
+        'player_id': ours['player1_id'].to_numpy(dtype=np.int64),
+        'game_id': ours['game_id'].to_numpy(dtype=np.int64),
+    }).drop_duplicates().groupby(['team_id', 'player_id'], as_index=False).size()
+    out = out.rename(columns={'size': 'games'})
+    out.insert(0, 'season', np.int32(int(str(key)[1:])))
+    return out
+
+
+def _sum_rosters(parts: List[pd.DataFrame]) -> pd.DataFrame:
+    return pd.concat(parts, ignore_index=True).groupby(
+        ['season', 'team_id', 'player_id'], as_index=False)['games'].sum()
+
+
+GAMES = register(Artifact('games', 1, ['game_id', 'score'], _games))
+PBP_ROSTERS = register(Artifact('pbp_rosters', 1, ['game_id', 'player1_id', 'player1_team_id'],
+                                _pbp_rosters, _sum_rosters))
+
+# Store
+
+def _refresh_key(args) -> str:
+    directory, root, key, names = args
+    from nba_sim.data_csv import PlayByPlayStore
+    artifacts = load_artifacts()
+    PrecomputeStore(PlayByPlayStore(directory), root).compute_key(key, [artifacts[n] for n in names])
+    return key
+
+
+class PrecomputeStore:
+    """Artifacts over a PlayByPlayStore, cached under <data>/.cache/precompute."""
+
+    def __init__(self, store, root=None):
+        self.store = store
+        self.root = root or os.path.join(store.directory, column_cache.CACHE_DIRNAME, PRECOMPUTE_DIRNAME)
+        # In-memory copies: (artifact, key) -> (tag, source signature, frame)
+        self._memo = {}
+        self._lock = threading.Lock()
+
+    def code_version(self, artifact: Artifact) -> str:
+        """The version tag recorded with (and required of) an artifact's cached data."""
+        return f"{artifact.name}-v{artifact.version}/{getattr(self.store, 'schema_tag', '')}"
+
+    def _dir(self, artifact: Artifact) -> str:
+        return os.path.join(self.root, artifact.name)
+
+    def _keys(self, seasons=None) -> list:
+        if seasons is None:
+            return self.store.seasons()
+        return [k for s in seasons for k in self.store.season_keys(s)]
+
+    def is_fresh(self, artifact: Artifact, key) -> bool:
+        """True if the cached partition of `key` matches its source file and the artifact's code version."""
+        return column_cache.is_fresh(self.store.files[str(key)], self._dir(artifact), self.code_version(artifact))
+
+    def stale(self, artifact: Artifact, keys=None) -> list:
+        keys = self.store.seasons() if keys is None else [str(k) for k in keys]
+        return [k for k in keys if not self.is_fresh(artifact, k)]
+
+    def compute_key(self, key, artifacts: Sequence[Artifact]) -> Dict[str, pd.DataFrame]:
+        """Compute and cache the partitions of `key` for several artifacts from one load of its events."""
+        key = str(key)
+        path = self.store.files[key]
+        signature = column_cache.source_signature(path)
+        columns = list(dict.fromkeys(c for a in artifacts for c in a.columns))
+        events = self.store.load(key, columns)
+        out = {}
+        for artifact in artifacts:
+            instr.count('precompute.partition_builds')
+            with instr.timer(f'precompute.{artifact.name}'):
+                part = artifact.compute(events[list(artifact.columns)], key)
+            try:
+                column_cache.write(part, column_cache.cache_path(path, self._dir(artifact)),
+                                   source=signature, transform_tag=self.code_version(artifact))
+            except OSError:
+                pass
+            with self._lock:
+                self._memo[artifact.name, key] = (self.code_version(artifact), signature, part)
+            out[artifact.name] = part
+        return out
+
+    def partition(self, artifact: Artifact, key) -> pd.DataFrame:
+        """Return one season file's partition of `artifact`, computing it if stale."""
+        key = str(key)
+        path = self.store.files[key]
+        signature = column_cache.source_signature(path)
+        tag = self.code_version(artifact)
+        with self._lock:
+            memo = self._memo.get((artifact.name, key))
+        if memo is not None and memo[:2] == (tag, signature):
+            return memo[2]
+        if self.is_fresh(artifact, key):
+            instr.count('precompute.partition_hits')
+            part = column_cache.read(column_cache.cache_path(path, self._dir(artifact)))
+            with self._lock:
+                self._memo[artifact.name, key] = (tag, signature, part)
+            return part
+        instr.count('precompute.partition_misses')
+        return self.compute_key(key, [artifact])[artifact.name]
+
+    def refresh(self, artifacts: Optional[Sequence[Artifact]] = None, keys=None,
+                workers: Optional[int] = None) -> Dict[str, list]:
+        """
+        Bring the partitions of `artifacts` (all registered if None) for `keys`
+        (all season files if None) up to date, season files in parallel on
+        `workers` processes (default: all cores). When every season file is
+        covered, the aggregates are re-merged too. Returns {artifact name:
+        rebuilt keys}.
+        """
+        artifacts = list(load_artifacts().values()) if artifacts is None else list(artifacts)
+        keys = self.store.seasons() if keys is None else [str(k) for k in keys]
+        todo = {}
+        for artifact in artifacts:
+            for key in self.stale(artifact, keys):
+                todo.setdefault(key, []).append(artifact)
+        workers = min(workers or os.cpu_count() or 1, len(todo))
+        if workers <= 1:
+            for key, stale in todo.items():
+                self.compute_key(key, stale)
+        else:
+            tasks = [(self.store.directory, self.root, key, [a.name for a in stale])
+                     for key, stale in todo.items()]
+            with shared_pool({}, workers) as pool:
+                list(pool.imap_unordered(_refresh_key, tasks))
+        if len(keys) == len(self.store.seasons()):
+            for artifact in artifacts:
+                self.aggregate(artifact)
+        return {a.name: [k for k, stale in todo.items() if a in stale] for a in artifacts}
+
+    def partitions(self, artifact: Artifact, seasons=None) -> pd.DataFrame:
+        """Merge the partitions of the files of the given season years (all if None), without caching."""
+        parts = [self.partition(artifact, k) for k in self._keys(seasons)]
+        if not parts:
+            return pd.DataFrame()
+        return (artifact.merge or _concat)(parts)
+
+    def aggregate(self, artifact: Artifact) -> pd.DataFrame:
+        """
+        Return the merge of every season file's partition. The cached aggregate
+        is reused while no season file was added, removed or changed; otherwise
+        stale partitions are recomputed and the cached ones re-merged.
+        """
+        keys = self.store.seasons()
+        sources = {k: column_cache.source_signature(self.store.files[k]) for k in keys}
+        tag = self.code_version(artifact)
+        target = os.path.join(self._dir(artifact), AGGREGATE_NAME)
+        with self._lock:
+            memo = self._memo.get((artifact.name, AGGREGATE_NAME))
+        if memo is not None and memo[:2] == (tag, sources):
+            return memo[2]
+        meta = column_cache.read_meta(target)
+        if meta is not None and meta.get('transform') == tag and meta.get('source') == sources:
+            instr.count('precompute.aggregate_hits')
+            merged = column_cache.read(target)
+        else:
+            instr.count('precompute.aggregate_merges')
+            with instr.timer('precompute.merge'):
+                merged = self.partitions(artifact)
+            try:
+                column_cache.write(merged, target, source=sources, transform_tag=tag)
+            except OSError:
+                pass
+        with self._lock:
+            self._memo[artifact.name, AGGREGATE_NAME] = (tag, sources, merged)
+        return merged
+
+    def manifest(self) -> Dict[str, dict]:
+        """Per artifact: code version and, per season file, whether its cached partition is current."""
+        return {
+            a.name: {'code_version': self.code_version(a),
+                     'partitions': {k: self.is_fresh(a, k) for k in self.store.seasons()}}
+            for a in load_artifacts().values()
+        }
+
+    def clear(self):
+        """Forget in-memory copies (the cached files stay valid)."""
+        with self._lock:
+            self._memo.clear()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bring the precomputed play-by-play artifacts up to date.")
+    parser.add_argument("artifacts", nargs="*", help="artifact names (default: all)")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    from nba_sim.data_csv import pbp_store
+    artifacts = load_artifacts()
+    unknown = set(args.artifacts) - set(artifacts)
+    if unknown:
+        parser.error(f"unknown artifacts: {', '.join(sorted(unknown))} (known: {', '.join(sorted(artifacts))})")
+    chosen = [artifacts[n] for n in args.artifacts] if args.artifacts else None
+    start = time.perf_counter()
+    rebuilt = PrecomputeStore(pbp_store).refresh(chosen, workers=args.workers)
+    for name, keys in rebuilt.items():
+        print(f"{name}: {len(keys)} season file(s) rebuilt" + (f" ({', '.join(keys)})" if keys else ""))
+    print(f"done in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    # Through the package module: artifact modules register into its ARTIFACTS, not __main__'s
+    from nba_sim.utils import precompute
+    precompute.main()
@@ -1,38 +1,57 @@
-from collections import defaultdict
+import numpy as np
 
-def assign_lineup(players):
+# Primary position codes used by the slot-based lineup logic
+GUARD, FORWARD, CENTER = 0, 1, 2
+NO_POSITION = -1
+
+_POSITION_CODES = {
+    "G": GUARD, "PG": GUARD, "SG": GUARD, "GUARD": GUARD,
+    "F": FORWARD, "SF": FORWARD, "PF": FORWARD, "FORWARD": FORWARD,
+    "C": CENTER, "CENTER": CENTER,
+}
+
+
+def position_code(position) -> int:
     """
-    Given a list of Player objects (with .position and .height attributes),
-    return (starters, bench).
-    Logic:
-      • Pick 1 C (or tallest if no “C”)
-      • Pick 2 wings (SF/PF)
-      • Pick 2 guards (PG/SG)
-      • Fallback by height if a slot can’t be filled.
+    Map a listed position to GUARD / FORWARD / CENTER using its primary part
+    ('Forward-Center' -> FORWARD, 'PG' -> GUARD); NO_POSITION if unknown.
     """
-    by_pos = defaultdict(list)
-    for p in players:
-        by_pos[p.position or ""].append(p)
+    if not isinstance(position, str) or not position:
+        return NO_POSITION
+    return _POSITION_CODES.get(position.split("-")[0].strip().upper(), NO_POSITION)
 
-    # helper: sort descending by height (inches)
-    sort_height = lambda lst: sorted(lst, key=lambda x: x.height or 0, reverse=True)
+
+def lineup_slots(positions, heights, n_starters: int = 5):
+    """
+    Pick a starting lineup from per-slot position codes and heights (inches, 0 if unknown).
+    Returns (starters, bench) as integer slot index arrays; the bench keeps roster order.
+    Logic:
+      • Pick 1 C
+      • Pick 2 forwards
+      • Pick 2 guards
+      • Fill the remaining starting spots by height.
+    """
+    positions = np.asarray(positions, dtype=np.int64)
+    heights = np.nan_to_num(np.asarray(heights, dtype=float))
+    # tallest first; players without a height keep roster order at the end
+    by_height = np.argsort(-heights, kind="stable")
 
     starters = []
-    # center
-    cs = sort_height(by_pos.get("C", []))
-    if cs:
-        starters.append(cs.pop(0))
-    # wings
-    wings = sort_height(by_pos.get("SF",[]) + by_pos.get("PF",[]))
-    starters.extend(wings[:2])
-    # guards
-    guards = sort_height(by_pos.get("PG",[]) + by_pos.get("SG",[]))
-    starters.extend(guards[:2])
-
-    # if we’re still under 5 (missing positions), fill by tallest remaining
-    remaining = [p for p in players if p not in starters]
-    starters += sort_height(remaining)[: max(0, 5 - len(starters))]
-
-    # bench is everyone else
-    bench = [p for p in players if p not in starters]
-    return starters, bench
+    for code, count in ((CENTER, 1), (FORWARD, 2), (GUARD, 2)):
+        starters.extend(by_height[positions[by_height] == code][:count].tolist())
+    picked = np.zeros(len(positions), dtype=bool)
+    picked[starters] = True
+    starters.extend(by_height[~picked[by_height]][: max(0, n_starters - len(starters))].tolist())
+    picked[starters] = True
+    return np.array(starters, dtype=np.intp), np.flatnonzero(~picked)
+
+
+def assign_lineup(players):
+    """
+    Given a list of Player objects (with .position and .height attributes),
+    return (starters, bench) — a thin wrapper over lineup_slots.
+    """
+    positions = [position_code(getattr(p, "position", None)) for p in players]
+    heights = [getattr(p, "height", None) or 0 for p in players]
+    starters, bench = lineup_slots(positions, heights)
+    return [players[i] for i in starters], [players[i] for i in bench]
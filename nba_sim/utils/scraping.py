@@ -1,32 +1,144 @@
 from pathlib import Path
-import time, random, requests
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+import threading, time, requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 
+from nba_sim.utils.html_cache import HtmlCache
+
 CACHE_DIR = Path(__file__).resolve().parent.parent / "cache"
-CACHE_DIR.mkdir(parents=True, exist_ok=True)
 HEADERS = {"User-Agent": "nba-sim/0.8.1 (+https://github.com/you)"}
 
-def fetch_url(url: str, ttl_hours: int = 24) -> str:
+# Concurrent requests in fetch_many (and pooled connections per host)
+MAX_WORKERS = 8
+# Default per-host politeness: sustained requests per second and burst size
+HOST_RATE = 2.0
+HOST_BURST = 4
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, holding at most `burst`."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until one is available."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class HostRateLimiter:
+    """One TokenBucket per host, created on first use with the default rate."""
+
+    def __init__(self, rate: float = HOST_RATE, burst: int = HOST_BURST):
+        self.rate, self.burst = rate, burst
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def set_rate(self, host: str, rate: float, burst: int = 1):
+        with self._lock:
+            self._buckets[host] = TokenBucket(rate, burst)
+
+    def acquire(self, url: str):
+        host = urlsplit(url).netloc
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.rate, self.burst)
+        bucket.acquire()
+
+
+rate_limiter = HostRateLimiter()
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def session() -> requests.Session:
+    """Process-wide Session with a connection pool sized for MAX_WORKERS threads."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                s = requests.Session()
+                adapter = HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS)
+                s.mount("http://", adapter)
+                s.mount("https://", adapter)
+                s.headers.update(HEADERS)
+                _session = s
+    return _session
+
+
+def get(url: str, headers: dict = None, timeout: float = 30) -> str:
+    """
+    Rate-limited GET over the pooled session; returns the decoded body.
+    Raises requests.exceptions.RequestException on network or HTTP errors.
+    """
+    rate_limiter.acquire(url)
+    r = session().get(url, headers=headers, timeout=timeout)
+    r.raise_for_status()
+    return r.content.decode("utf-8", errors="replace")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def cache() -> HtmlCache:
+    """Process-wide page cache under CACHE_DIR, opened on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = HtmlCache(CACHE_DIR)
+    return _cache
+
+
+def fetch_url(url: str, ttl_hours: float = 24, headers: dict = None, timeout: float = 30) -> str:
     """
     Return page HTML (cached). If HTTP error, fall back to cache;
     if no cache, return empty string.
     """
-    fname = CACHE_DIR / f"{abs(hash(url))}.html"
+    pages = cache()
     # use fresh cache if valid
-    if fname.exists() and (time.time() - fname.stat().st_mtime) < ttl_hours * 3600:
-        return fname.read_text(encoding="utf-8")
+    html = pages.get(url, ttl_hours)
+    if html is not None:
+        return html
 
     try:
-        r = requests.get(url, headers=HEADERS, timeout=30)
-        r.raise_for_status()
-        html = r.content.decode("utf-8", errors="replace")
-        fname.write_text(html, encoding="utf-8")
-        time.sleep(random.uniform(1, 2.5))
+        html = get(url, headers=headers, timeout=timeout)
+        pages.put(url, html)
         return html
     except requests.exceptions.RequestException:
-        if fname.exists():
-            return fname.read_text(encoding="utf-8")
-        return ""   # graceful fallback
+        html = pages.get_stale(url)
+        return html if html is not None else ""   # graceful fallback
+
+
+def fetch_many(urls, ttl_hours: int = 24, max_workers: int = MAX_WORKERS) -> list:
+    """
+    fetch_url for many URLs on a bounded thread pool; returns the pages in input order.
+    Duplicate URLs are fetched once, and each host stays within its rate limit.
+    """
+    urls = list(urls)
+    unique = list(dict.fromkeys(urls))
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(unique) or 1))) as pool:
+        pages = dict(zip(unique, pool.map(lambda u: fetch_url(u, ttl_hours), unique)))
+    return [pages[u] for u in urls]
+
 
 def soup(url: str, ttl_hours: int = 24) -> BeautifulSoup:
     return BeautifulSoup(fetch_url(url, ttl_hours), "lxml")
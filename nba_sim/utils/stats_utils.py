@@ -1,18 +1,111 @@
+import argparse
 import sqlite3
+import threading
+import warnings
 import pandas as pd
 from pathlib import Path
-from nba_sim.data_csv import pbp_df
+from nba_sim.data_csv import data_dir, pbp_store
+from nba_sim.utils import instrumentation as instr
+from nba_sim.utils.player_ratings import PlayerRatings
+
+# Memory-mapped I/O window for SQLite reads
+MMAP_SIZE = 1 << 30
+
+# SQLite's default cap on bound parameters is 999
+_MAX_PARAMS = 900
+
+# eventmsgtype values counted as rebounds (the original rate's definition)
+_REBOUND_TYPES = (4, 5)
+
+# Season-type prefixes of season_id (pre, regular, all-star, playoffs, play-in)
+_SEASON_TYPES = (1, 2, 3, 4, 5)
+
+_INDEX_SQL = (
+    'CREATE INDEX IF NOT EXISTS idx_pbp_player_season_msg '
+    'ON play_by_play (player1_id, {season}eventmsgtype, game_id)'
+)
+
 
 class StatsProvider:
     """
-    Provides historical statistics for NBA players from the SQLite DB and in-memory pbp_df.
+    Provides historical statistics for NBA players from the SQLite DB and the play-by-play store.
+    SQLite reads go through one read-only connection per thread.
     """
 
-    def __init__(self, db_path: Path):
+    def __init__(self, db_path: Path, ratings: PlayerRatings = None):
         self.db_path = db_path
+        self.ratings = ratings if ratings is not None else PlayerRatings(pbp_store)
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._prepared = False
+        self._has_season = False
+        self._warned_season = False
+
+    def _uri(self, mode: str) -> str:
+        path = Path(self.db_path)
+        if not path.exists():
+            raise FileNotFoundError(f"SQLite database not found: {path}")
+        return f"{path.resolve().as_uri()}?mode={mode}"
+
+    def prepare(self):
+        """
+        One-time check per process, read-only: the DB must exist, and whether
+        play_by_play has season_id decides how season filters are written.
+        """
+        with self._lock:
+            if self._prepared:
+                return
+            con = sqlite3.connect(self._uri('ro'), uri=True)
+            try:
+                cols = {row[1] for row in con.execute('PRAGMA table_info(play_by_play)')}
+            finally:
+                con.close()
+            self._has_season = 'season_id' in cols
+            self._prepared = True
+
+    def build_index(self):
+        """
+        Setup step (not run by queries): switch the DB to WAL and create the covering
+        index on (player1_id, season_id, eventmsgtype, game_id). Slow on the full table.
+        """
+        self.prepare()
+        con = sqlite3.connect(self._uri('rw'), uri=True)
+        try:
+            con.execute('PRAGMA journal_mode=WAL')
+            con.execute(_INDEX_SQL.format(season='season_id, ' if self._has_season else ''))
+            con.commit()
+        finally:
+            con.close()
 
     def _connect(self):
-        return sqlite3.connect(self.db_path)
+        """Return this thread's pooled read-only connection, opening it on first use."""
+        con = getattr(self._local, 'con', None)
+        if con is None:
+            self.prepare()
+            con = sqlite3.connect(self._uri('ro'), uri=True, check_same_thread=False)
+            con.execute(f'PRAGMA mmap_size = {MMAP_SIZE}')
+            con.execute('PRAGMA temp_store = MEMORY')
+            self._local.con = con
+            with self._lock:
+                self._connections.append(con)
+        return con
+
+    def close(self):
+        """Close every pooled connection (threads reopen on their next query)."""
+        with self._lock:
+            for con in self._connections:
+                con.close()
+            self._connections.clear()
+            self._local = threading.local()
+
+    def get_player_stats(self, player_id: int, season: int) -> dict:
+        """
+        Returns 'fg_pct', 'three_pct', 'three_prop' and 'reb_rate' for a player
+        in one lookup against the precomputed season rating table.
+        """
+        instr.count('stats_utils.rating_lookups')
+        return self.ratings.get(player_id, season)
 
     def get_player_shooting(self, player_id: int, season: int) -> dict:
         """
@@ -20,27 +113,10 @@ class StatsProvider:
           - 'fg_pct': field goal percentage
           - 'three_pct': three-point percentage
           - 'three_prop': proportion of attempts that are threes
-        Uses pbp_df for play-by-play events.
+        Read from the season rating table built from that season's play-by-play files.
         """
-        # filter to that player and regulation periods
-        sub = pbp_df[
-            (pbp_df['player1_id'] == player_id) &
-            (pbp_df['period'] <= 4)
-        ]
-        made = len(sub[sub['eventmsgtype'] == 1])
-        att = len(sub[sub['eventmsgtype'].isin([1, 2])])
-        made3 = len(sub[
-            (sub['eventmsgtype'] == 1) &
-            (sub['homedescription'].str.contains('3PT', na=False) | sub['visitordescription'].str.contains('3PT', na=False))
-        ])
-        att3 = len(sub[
-            (sub['eventmsgtype'].isin([1, 2])) &
-            (sub['homedescription'].str.contains('3PT', na=False) | sub['visitordescription'].str.contains('3PT', na=False))
-        ])
-        fg_pct     = made / att  if att  > 0 else 0.45
-        three_pct  = made3 / att3 if att3 > 0 else 0.35
-        three_prop = att3  / att  if att  > 0 else 0.30
-        return {'fg_pct': fg_pct, 'three_pct': three_pct, 'three_prop': three_prop}
+        stats = self.ratings.get(player_id, season)
+        return {k: stats[k] for k in ('fg_pct', 'three_pct', 'three_prop')}
 
     def get_player_rebounding(self, player_id: int, season: int) -> dict:
         """
@@ -48,24 +124,63 @@ class StatsProvider:
           - 'reb_rate': chance to secure a rebound on any rebound opportunity
         Query the SQLite DB for rebound events.
         """
+        row = self.get_many([player_id], season).iloc[0]
+        return {'reb_rate': float(row['reb_rate'])}
+
+    @instr.timed('stats_utils.get_many')
+    def get_many(self, player_ids, season=None) -> pd.DataFrame:
+        """
+        Rebound counts for a whole roster with one IN (...) query per 900 players.
+        Returns a DataFrame indexed by player_id with 'rebs', 'games' and 'reb_rate';
+        players without events get reb_rate 0.15. Without a season_id column in
+        the DB the `season` filter cannot apply: every season is counted, with a
+        RuntimeWarning.
+        """
+        player_ids = [int(p) for p in dict.fromkeys(player_ids)]
         con = self._connect()
-        query = '''
-        SELECT 
-          SUM(CASE WHEN eventmsgtype IN (4,5) THEN 1 ELSE 0 END) AS rebs,
-          COUNT(DISTINCT game_id)                                 AS games
-        FROM play_by_play
-        WHERE player1_id = ?
-        '''
-        df = pd.read_sql(query, con, params=(player_id,))
-        con.close()
-        row = df.iloc[0]
-        rebs, games = row['rebs'], row['games']
-        if games > 0:
-            reb_rate = min(1.0, (rebs / games) / 100)
-        else:
-            reb_rate = 0.15
-        return {'reb_rate': reb_rate}
+        where, season_params = '', []
+        if season is not None and not self._has_season and not self._warned_season:
+            self._warned_season = True
+            warnings.warn(f"{self.db_path}: play_by_play has no season_id column; "
+                          f"rebound counts include every season", RuntimeWarning, stacklevel=2)
+        if season is not None and self._has_season:
+            season_params = [t * 10000 + int(season) for t in _SEASON_TYPES]
+            where = f" AND season_id IN ({','.join('?' * len(season_params))})"
+        types = ', '.join(str(t) for t in _REBOUND_TYPES)
+        rows = []
+        for i in range(0, len(player_ids), _MAX_PARAMS):
+            chunk = player_ids[i:i + _MAX_PARAMS]
+            query = f'''
+            SELECT
+              player1_id                                                 AS player_id,
+              SUM(CASE WHEN eventmsgtype IN ({types}) THEN 1 ELSE 0 END) AS rebs,
+              COUNT(DISTINCT game_id)                                    AS games
+            FROM play_by_play
+            WHERE player1_id IN ({','.join('?' * len(chunk))}){where}
+            GROUP BY player1_id
+            '''
+            rows.extend(con.execute(query, chunk + season_params).fetchall())
+            instr.count('stats_utils.sql_queries')
+        instr.count('stats_utils.sql_rows', len(rows))
+        df = pd.DataFrame(rows, columns=['player_id', 'rebs', 'games']).set_index('player_id')
+        df = df.reindex(player_ids, fill_value=0)
+        df.index.name = 'player_id'
+        games = df['games'].astype(float)
+        df['reb_rate'] = (df['rebs'] / games.where(games > 0) / 100).clip(upper=1.0).fillna(0.15)
+        return df
 
 # Instantiate a single provider for import elsewhere
-DB_PATH = Path(__file__).parent.parent / 'data' / 'nba.sqlite'
+DB_PATH = Path(data_dir) / 'nba.sqlite'
 stats_provider = StatsProvider(DB_PATH)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create the covering index the rebound queries use.")
+    parser.add_argument("db", nargs="?", type=Path, default=DB_PATH)
+    args = parser.parse_args(argv)
+    StatsProvider(args.db).build_index()
+    print(f"indexed {args.db}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+On-court lineup stints reconstructed from play-by-play substitutions.
+
+A stint is a stretch of one period during which neither five-man unit
+changes. Each season file is reduced in one vectorized pass to a stint table:
+
+    game_id, period, stint               stint number within the period
+    start, end                           game seconds elapsed (0 at tip-off)
+    home_1..home_5, away_1..away_5       player ids, sorted; 0 where unknown
+    home_pts, away_pts, plus_minus       points in the stint (home perspective)
+
+Period starters are not listed in the play-by-play: they are the players who
+appear in a period before (or without) being subbed in, up to five a side
+in order of first appearance. Substitution events (eventmsgtype 8: player1
+leaves, player2 enters) end a stint; consecutive substitutions form one
+boundary.
+
+Like the player rating counts, stint tables are an artifact of the
+precompute store: cached per season file, keyed on the source file and built
+on a process pool across files.
+"""
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from nba_sim.utils import precompute
+
+# Bump when the stint derivation changes: cached tables are rebuilt
+STINTS_VERSION = 1
+
+HOME_COLUMNS = [f'home_{i}' for i in range(1, 6)]
+AWAY_COLUMNS = [f'away_{i}' for i in range(1, 6)]
+STINT_COLUMNS = (['game_id', 'period', 'stint', 'start', 'end'] + HOME_COLUMNS + AWAY_COLUMNS
+                 + ['home_pts', 'away_pts', 'plus_minus'])
+
+SUBSTITUTION = 8
+PERIOD_SECONDS, OVERTIME_SECONDS = 720, 300
+
+# Play-by-play columns the stint pass reads (acting_side / shot_made / is_three are derived features)
+_COLUMNS = ['game_id', 'period', 'eventmsgtype', 'clock_seconds', 'acting_side', 'shot_made', 'is_three',
+            'person1type', 'player1_id', 'person2type', 'player2_id', 'person3type', 'player3_id']
+
+# person type codes of home / visitor players
+_HOME_PLAYER, _AWAY_PLAYER = 4, 5
+
+
+def _period_start(period: np.ndarray) -> np.ndarray:
+    """Game seconds elapsed at the start of each period (overtimes are 5 minutes)."""
+    regulation = np.minimum(period - 1, 4) * PERIOD_SECONDS
+    return regulation + np.maximum(period - 5, 0) * OVERTIME_SECONDS
+
+
+def _period_length(period: np.ndarray) -> np.ndarray:
+    return np.where(period <= 4, PERIOD_SECONDS, OVERTIME_SECONDS)
+
+
+def _int(pbp: pd.DataFrame, col: str) -> np.ndarray:
+    return pbp[col].fillna(0).to_numpy(dtype=np.int64)
+
+
+def season_stints(pbp: pd.DataFrame) -> pd.DataFrame:
+    """Reduce one season file's events (grouped by game, in event order) to its stint table."""
+    n = len(pbp)
+    if n == 0:
+        return pd.DataFrame(columns=STINT_COLUMNS)
+    game = _int(pbp, 'game_id')
+    period = _int(pbp, 'period')
+    msg = _int(pbp, 'eventmsgtype')
+    seg = np.cumsum(np.r_[True, (game[1:] != game[:-1]) | (period[1:] != period[:-1])]) - 1
+
+    # Stints: a run of substitutions opens a new stint
+    sub = msg == SUBSTITUTION
+    opens = sub & np.r_[True, ~sub[:-1] | (seg[1:] != seg[:-1])]
+    seg_first = np.r_[True, seg[1:] != seg[:-1]]
+    count = np.cumsum(opens)
+    stint = count - np.maximum.accumulate(np.where(seg_first, count - opens, 0))
+    # (segment, stint) -> dense id
+    key = seg * 4096 + stint
+    sid = np.cumsum(np.r_[True, key[1:] != key[:-1]]) - 1
+    n_stints = sid[-1] + 1
+
+    # Player appearances: (row, player, side, toggle); toggle +1 enters, -1 leaves, 0 acts
+    rows, pids, sides, toggles = [], [], [], []
+    for slot in (1, 2, 3):
+        ptype = _int(pbp, f'person{slot}type')
+        pid = _int(pbp, f'player{slot}_id')
+        on = np.isin(ptype, (_HOME_PLAYER, _AWAY_PLAYER)) & (pid > 0)
+        idx = np.flatnonzero(on)
+        rows.append(idx)
+        pids.append(pid[idx])
+        sides.append((ptype[idx] == _AWAY_PLAYER).astype(np.int64))
+        toggle = np.zeros(len(idx), dtype=np.int64)
+        if slot == 1:
+            toggle[sub[idx]] = -1
+        elif slot == 2:
+            toggle[sub[idx]] = 1
+        toggles.append(toggle)
+    app = pd.DataFrame({
+        'row': np.concatenate(rows), 'pid': np.concatenate(pids),
+        'side': np.concatenate(sides), 'toggle': np.concatenate(toggles),
+    }).sort_values('row', kind='stable')
+    app['seg'] = seg[app['row'].to_numpy()]
+    app['sid'] = sid[app['row'].to_numpy()]
+
+    # Period starters: first appearance is not an entry; at most five a side, by first appearance
+    first = app.drop_duplicates(['seg', 'pid'])
+    starters = first[first['toggle'] <= 0]
+    starters = starters[starters.groupby(['seg', 'side']).cumcount() < 5]
+
+    # On-court state per (player, stint): starters +1 from the first stint, entries / exits from theirs
+    seg_first_sid = np.flatnonzero(seg_first)
+    deltas = pd.concat([
+        pd.DataFrame({'seg': starters['seg'].to_numpy(), 'pid': starters['pid'].to_numpy(),
+                      'side': starters['side'].to_numpy(),
+                      'sid': sid[seg_first_sid][starters['seg'].to_numpy()], 'delta': 1}),
+        app.loc[app['toggle'] != 0, ['seg', 'pid', 'side', 'sid']].assign(delta=app['toggle'][app['toggle'] != 0]),
+    ], ignore_index=True)
+    deltas = deltas.groupby(['seg', 'pid', 'side', 'sid'], as_index=False)['delta'].sum()
+
+    # Expand each (segment, player) over the stints of its segment and carry the state forward
+    seg_stints = np.bincount(seg[np.r_[True, sid[1:] != sid[:-1]]], minlength=seg[-1] + 1)
+    seg_sid0 = np.r_[0, np.cumsum(seg_stints)[:-1]]
+    players = deltas.drop_duplicates(['seg', 'pid', 'side'])[['seg', 'pid', 'side']]
+    reps = seg_stints[players['seg'].to_numpy()]
+    grid = pd.DataFrame({
+        'seg': np.repeat(players['seg'].to_numpy(), reps),
+        'pid': np.repeat(players['pid'].to_numpy(), reps),
+        'side': np.repeat(players['side'].to_numpy(), reps),
+    })
+    starts = np.repeat(np.cumsum(reps) - reps, reps)
+    grid['sid'] = np.repeat(seg_sid0[players['seg'].to_numpy()], reps) + np.arange(len(grid)) - starts
+    grid = grid.merge(deltas, on=['seg', 'pid', 'side', 'sid'], how='left')
+    grid['on'] = grid['delta'].fillna(0).groupby([grid['seg'], grid['pid'], grid['side']]).cumsum() > 0
+    on = grid[grid['on']].sort_values(['sid', 'side', 'pid'])
+    on = on[on.groupby(['sid', 'side']).cumcount() < 5]
+    slot = on.groupby(['sid', 'side']).cumcount().to_numpy()
+    units = np.zeros((n_stints, 2, 5), dtype=np.int64)
+    units[on['sid'].to_numpy(), on['side'].to_numpy(), slot] = on['pid'].to_numpy()
+    # Sorted ids with unknown (0) slots last
+    units = np.where(units == 0, np.iinfo(np.int64).max, units)
+    units.sort(axis=2)
+    units = np.where(units == np.iinfo(np.int64).max, 0, units)
+
+    # Points scored in each stint
+    points = np.where(msg == 1, 2 + pbp['is_three'].to_numpy(dtype=np.int64), 0)
+    points = np.where((msg == 3) & pbp['shot_made'].to_numpy(dtype=bool), 1, points)
+    side = pbp['acting_side'].to_numpy()
+    home_pts = np.bincount(sid, weights=points * (side == 0), minlength=n_stints)
+    away_pts = np.bincount(sid, weights=points * (side == 1), minlength=n_stints)
+
+    # Stint clock: from its first event (period start for the first stint) to the next stint
+    head = np.r_[True, sid[1:] != sid[:-1]]
+    s_period = period[head]
+    clock = pbp['clock_seconds'].to_numpy(dtype=np.int64)[head]
+    length = _period_length(s_period)
+    elapsed = np.where(seg_first[head] | (clock < 0), 0, length - np.clip(clock, 0, length))
+    start = _period_start(s_period) + elapsed
+    last = np.r_[seg[head][1:] != seg[head][:-1], True]
+    end = np.where(last, _period_start(s_period) + length, np.r_[start[1:], 0])
+
+    out = pd.DataFrame({
+        'game_id': game[head].astype(np.int32),
+        'period': s_period.astype(np.int8),
+        'stint': stint[head].astype(np.int16),
+        'start': start.astype(np.int16),
+        'end': end.astype(np.int16),
+    })
+    for i in range(5):
+        out[HOME_COLUMNS[i]] = units[:, 0, i].astype(np.int32)
+    for i in range(5):
+        out[AWAY_COLUMNS[i]] = units[:, 1, i].astype(np.int32)
+    out['home_pts'] = home_pts.astype(np.int16)
+    out['away_pts'] = away_pts.astype(np.int16)
+    out['plus_minus'] = (home_pts - away_pts).astype(np.int16)
+    return out
+
+
+def player_minutes(stints: pd.DataFrame) -> pd.DataFrame:
+    """Per-player seconds on court, stints and plus-minus (own side's perspective) over a stint table."""
+    seconds = (stints['end'] - stints['start']).to_numpy(dtype=np.int64)
+    pm = stints['plus_minus'].to_numpy(dtype=np.int64)
+    parts = [
+        pd.DataFrame({'player_id': stints[col].to_numpy(dtype=np.int64), 'seconds': seconds,
+                      'plus_minus': pm * sign, 'stints': 1})
+        for cols, sign in ((HOME_COLUMNS, 1), (AWAY_COLUMNS, -1)) for col in cols
+    ]
+    long = pd.concat(parts, ignore_index=True)
+    long = long[long['player_id'] > 0]
+    out = long.groupby('player_id', as_index=False)[['seconds', 'plus_minus', 'stints']].sum()
+    out['minutes'] = out['seconds'] / 60
+    return out
+
+
+def lineup_totals(stints: pd.DataFrame) -> pd.DataFrame:
+    """Seconds and plus-minus per five-man unit (either side), most-used units first."""
+    seconds = (stints['end'] - stints['start']).to_numpy(dtype=np.int64)
+    pm = stints['plus_minus'].to_numpy(dtype=np.int64)
+    parts = []
+    for cols, sign in ((HOME_COLUMNS, 1), (AWAY_COLUMNS, -1)):
+        part = stints[cols].set_axis([f'player_{i}' for i in range(1, 6)], axis=1)
+        parts.append(part.assign(seconds=seconds, plus_minus=pm * sign))
+    long = pd.concat(parts, ignore_index=True)
+    long = long[(long[[f'player_{i}' for i in range(1, 6)]] > 0).all(axis=1)]
+    out = long.groupby([f'player_{i}' for i in range(1, 6)], as_index=False)[['seconds', 'plus_minus']].sum()
+    return out.sort_values('seconds', ascending=False, ignore_index=True)
+
+
+def _partition_stints(pbp: pd.DataFrame, key: str) -> pd.DataFrame:
+    return season_stints(pbp)
+
+
+STINTS = precompute.register(precompute.Artifact('stints', STINTS_VERSION, _COLUMNS, _partition_stints))
+
+
+class Stints:
+    """Stint tables over a PlayByPlayStore, cached per season file in the precompute store."""
+
+    def __init__(self, store, cache_dir=None):
+        self.store = store
+        self.precomputed = precompute.PrecomputeStore(store, cache_dir)
+
+    def partition(self, key) -> pd.DataFrame:
+        """Return the stint table of one season file, computing it if stale."""
+        return self.precomputed.partition(STINTS, key)
+
+    def build(self, keys: Optional[Sequence[str]] = None, workers: Optional[int] = None) -> list:
+        """
+        Bring the cached tables of `keys` (all season files if None) up to date,
+        building stale ones on `workers` processes (default: all cores). Returns
+        the keys that were rebuilt.
+        """
+        return self.precomputed.refresh([STINTS], keys, workers)[STINTS.name]
+
+    def table(self, seasons=None, workers: Optional[int] = None) -> pd.DataFrame:
+        """One stint table over every file of the given season years (all if None)."""
+        if seasons is None:
+            self.build(workers=workers)
+            table = self.precomputed.aggregate(STINTS)
+        else:
+            keys = [k for s in seasons for k in self.store.season_keys(s)]
+            self.build(keys, workers)
+            table = self.precomputed.partitions(STINTS, seasons)
+        return table if len(table.columns) else pd.DataFrame(columns=STINT_COLUMNS)
@@ -6,15 +6,25 @@ from pathlib import Path
 BASE_DIR = Path(__file__).parent.parent
 WEIGHTS_FILE = BASE_DIR / 'factors.json'
 
+# (path, mtime_ns, size) -> parsed factors, so repeated loads skip the file read
+_cache = {'key': None, 'factors': {}}
+
 
 def load() -> dict:
     """
     Load saved weight factors from the factors.json file.
+    The parsed file is reused until its mtime or size changes.
     """
-    if WEIGHTS_FILE.exists():
+    try:
+        st = WEIGHTS_FILE.stat()
+    except FileNotFoundError:
+        return {}
+    key = (str(WEIGHTS_FILE), st.st_mtime_ns, st.st_size)
+    if _cache['key'] != key:
         with open(WEIGHTS_FILE, 'r') as f:
-            return json.load(f)
-    return {}
+            _cache['factors'] = json.load(f)
+        _cache['key'] = key
+    return dict(_cache['factors'])
 
 
 def get_weights() -> dict:
@@ -1,50 +1,291 @@
 #!/usr/bin/env python3
-import pandas as pd
+"""
+Split the raw play-by-play dump into one file per season:
+data/play_by_play.csv.gz -> data/play_by_play_<season_id>.csv.gz
+
+The main process decompresses and parses the dump in chunks; a process pool
+groups each chunk by season and gzips the groups. Each compressed group is
+appended to its season file as a separate gzip member (readers see one
+stream), in chunk order.
+
+Progress is recorded in a manifest (data/play_by_play_split.json) after every
+chunk, so an interrupted run resumes where it stopped, and a dump that was
+already split is skipped. Passing a new dump (e.g. the next season's) appends
+its rows to the existing season files. A season file is recorded in the
+manifest before any rows go into it. Season files the manifest does not know
+about (e.g. from before it existed) stop the run, unless --append-existing
+adopts them as they are or --restart rewrites every season file touched.
+
+Usage:
+    python scripts/split_play_by_play_by_season.py [SRC ...] [--workers N]
+        [--compresslevel 6] [--chunksize 500000] [--build-cache]
+        [--restart | --append-existing]
+"""
+import argparse
 import gzip
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
+
 # 1) Paths
 DATA_DIR = Path("data")
 SRC      = DATA_DIR / "play_by_play.csv.gz"
-GAME_CSV = DATA_DIR / "game.csv"
-
-# 2) Load game → season mapping (dedupe by game_id)
-print("🔍 Loading game→season mapping…")
-game_df = pd.read_csv(GAME_CSV, usecols=["game_id","season_id"])
-game_df["game_id"]   = game_df["game_id"].astype(int)
-game_df["season_id"] = game_df["season_id"].astype(int)
-
-# Drop duplicate game_id rows (keep the first)
-game_df = game_df.drop_duplicates(subset="game_id", keep="first")
-
-season_map = game_df.set_index("game_id")["season_id"]
-
-# 3) Prepare writers
-writers = {}
-
-print("🗂️  Starting to stream split by season…")
-chunksize = 500_000
-for chunk in pd.read_csv(SRC, compression="gzip", chunksize=chunksize):
-    chunk["game_id"] = chunk["game_id"].astype(int)
-    # Map to season; rows with no mapping become NaN
-    chunk["season_id"] = chunk["game_id"].map(season_map)
-    chunk = chunk.dropna(subset=["season_id"])
-    chunk["season_id"] = chunk["season_id"].astype(int)
-
-    # Group and write out per‑season
-    for season, sub in chunk.groupby("season_id"):
-        out_path = DATA_DIR / f"play_by_play_{season}.csv.gz"
-        if season not in writers:
-            writers[season] = gzip.open(out_path, "wt", compresslevel=9)
-            sub.to_csv(writers[season], index=False, header=True)
+MANIFEST_NAME = "play_by_play_split.json"
+MANIFEST_VERSION = 1
+
+CHUNKSIZE = 500_000
+COMPRESSLEVEL = 6
+
+
+def season_ids(game_ids: np.ndarray) -> np.ndarray:
+    """
+    Season id (e.g. 22022) of each game_id, from its layout 00TYYNNNNN: season
+    type digit and two-digit year (same rule as data_csv.season_key_for_game).
+    """
+    gid = np.asarray(game_ids, dtype=np.int64)
+    kind = gid // 10_000_000 % 10
+    yy = gid // 100_000 % 100
+    return kind * 10_000 + np.where(yy >= 46, 1900, 2000) + yy
+
+
+def compress_chunk(chunk: pd.DataFrame, columns: list, level: int) -> dict:
+    """Group one parsed chunk by season; return {season_id: (gzip member bytes, rows)}."""
+    gid = pd.to_numeric(chunk["game_id"], errors="coerce")
+    chunk = chunk[gid.notna().to_numpy()]
+    chunk = chunk.assign(season_id=season_ids(gid.dropna().to_numpy()).astype(str))
+    out = {}
+    for season, sub in chunk.groupby("season_id", sort=True):
+        text = sub.reindex(columns=columns).to_csv(index=False, header=False)
+        out[int(season)] = (gzip.compress(text.encode("utf-8"), compresslevel=level), len(sub))
+    return out
+
+
+def season_path(data_dir: Path, season: int) -> Path:
+    return data_dir / f"play_by_play_{season}.csv.gz"
+
+
+# 2) Manifest
+
+def new_manifest() -> dict:
+    return {"version": MANIFEST_VERSION, "columns": None, "sources": {}, "seasons": {}}
+
+
+def load_manifest(path: Path) -> dict:
+    if path.exists():
+        with open(path) as f:
+            manifest = json.load(f)
+        if manifest.get("version") == MANIFEST_VERSION:
+            return manifest
+    return new_manifest()
+
+
+def save_manifest(path: Path, manifest: dict):
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
+
+
+def _signature(path: Path) -> dict:
+    st = path.stat()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+# 3) Split one source
+
+def _existing_state(path: Path, columns: list) -> dict:
+    """Manifest entry for a season file written outside the manifest, checked against `columns`."""
+    with gzip.open(path, "rt", encoding="utf-8", newline="") as f:
+        header = f.readline().rstrip("\r\n")
+        rows = sum(1 for _ in f)
+    if header.split(",") != columns:
+        raise SystemExit(f"{path} has different columns than the dump; rerun with --restart to rewrite it")
+    return {"bytes": path.stat().st_size, "rows": rows}
+
+
+class SeasonWriter:
+    """
+    Appends gzip members to the season files, truncating back to the manifest
+    on resume. A new season file is saved to the manifest at `manifest_path`
+    (with its header size) before rows are written to it. Existing files the
+    manifest does not know about are rewritten from a header when `overwrite`
+    is set, appended to as they are when `adopt` is set, and refused otherwise.
+    """
+
+    def __init__(self, data_dir: Path, manifest: dict, level: int, overwrite: bool = False,
+                 adopt: bool = False, manifest_path: Path = None):
+        self.data_dir = data_dir
+        self.manifest = manifest
+        self.level = level
+        self.overwrite = overwrite
+        self.adopt = adopt
+        self.manifest_path = manifest_path
+        self.handles = {}
+        self.touched = set()
+
+    def _handle(self, season: int):
+        fh = self.handles.get(season)
+        if fh is None:
+            path = season_path(self.data_dir, season)
+            state = self.manifest["seasons"].get(str(season))
+            if state is None and path.exists() and path.stat().st_size and not self.overwrite:
+                if not self.adopt:
+                    raise SystemExit(f"{path} exists but is not in the manifest; rerun with "
+                                     f"--append-existing to append to it or --restart to rewrite it")
+                # A file from an earlier, unrecorded run: keep its rows and append after them
+                state = _existing_state(path, self.manifest["columns"])
+                self.manifest["seasons"][str(season)] = state
+            if state is None:
+                # New season (or --restart): start over with a header
+                fh = open(path, "wb")
+                header = ",".join(self.manifest["columns"]) + "\n"
+                fh.write(gzip.compress(header.encode("utf-8"), compresslevel=self.level))
+                self.manifest["seasons"][str(season)] = {"bytes": fh.tell(), "rows": 0}
+            else:
+                # Drop anything written after the last recorded chunk
+                fh = open(path, "r+b")
+                fh.truncate(state["bytes"])
+                fh.seek(state["bytes"])
+            self.handles[season] = fh
+        return fh
+
+    def write(self, groups: dict):
+        known = set(self.handles)
+        handles = {season: self._handle(season) for season in groups}
+        if self.manifest_path is not None and set(handles) - known:
+            # Record the new files (header only) before any rows go in, so a crash
+            # before the chunk is committed truncates them back on resume
+            for fh in handles.values():
+                fh.flush()
+            save_manifest(self.manifest_path, self.manifest)
+        for season, (data, rows) in groups.items():
+            fh = handles[season]
+            fh.write(data)
+            self.manifest["seasons"][str(season)]["rows"] += rows
+            self.touched.add(season)
+
+    def commit(self):
+        """Flush every open file and record its size in the manifest."""
+        for season, fh in self.handles.items():
+            fh.flush()
+            self.manifest["seasons"][str(season)]["bytes"] = fh.tell()
+
+    def close(self):
+        for fh in self.handles.values():
+            fh.close()
+        self.handles.clear()
+
+
+def split_source(src: Path, manifest: dict, manifest_path: Path, writer: SeasonWriter,
+                 pool, workers: int, chunksize: int, level: int):
+    key = str(src.resolve())
+    signature = _signature(src)
+    state = manifest["sources"].get(key)
+    if state is not None:
+        if {k: state[k] for k in signature} != signature:
+            raise SystemExit(f"{src} changed since it was split; rerun with --restart")
+        if state["complete"]:
+            print(f"⏭️  {src} already split")
+            return
+        chunksize = state["chunksize"]
+    else:
+        state = {**signature, "chunksize": chunksize, "chunks": 0, "rows": 0, "complete": False}
+        manifest["sources"][key] = state
+
+    # Parse every field as text: values are written back exactly as read
+    reader = pd.read_csv(src, compression="gzip", chunksize=chunksize,
+                         dtype=str, keep_default_na=False, na_filter=False)
+    pending = deque()
+
+    def drain(limit):
+        while len(pending) > limit:
+            rows, result = pending.popleft()
+            writer.write(result.result() if pool is not None else result)
+            writer.commit()
+            state["chunks"] += 1
+            state["rows"] += rows
+            save_manifest(manifest_path, manifest)
+            print(f"  chunk {state['chunks']} ({state['rows']:,} rows)")
+
+    skip = state["chunks"]
+    if skip:
+        print(f"↩️  Resuming {src} after chunk {skip}")
+    for i, chunk in enumerate(reader):
+        if i < skip:
+            continue
+        if manifest["columns"] is None:
+            manifest["columns"] = [c for c in chunk.columns if c != "season_id"] + ["season_id"]
+        if pool is None:
+            pending.append((len(chunk), compress_chunk(chunk, manifest["columns"], level)))
         else:
-            sub.to_csv(writers[season], index=False, header=False)
+            pending.append((len(chunk), pool.submit(compress_chunk, chunk, manifest["columns"], level)))
+        # Keep a couple of chunks per worker in flight
+        drain(2 * workers)
+    drain(0)
+    state["complete"] = True
+    save_manifest(manifest_path, manifest)
+
+
+def build_cache(path: str) -> str:
+    """Write the column cache for one season file so the first load is already fast."""
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+    from nba_sim import data_csv
+    data_csv.read_play_by_play(path)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Split play-by-play dumps into per-season files.")
+    parser.add_argument("sources", nargs="*", type=Path, default=[SRC])
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE)
+    parser.add_argument("--compresslevel", type=int, default=COMPRESSLEVEL, choices=range(0, 10))
+    parser.add_argument("--build-cache", action="store_true",
+                        help="also write the column cache of every season file touched")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--restart", action="store_true",
+                      help="ignore the manifest and split from scratch, rewriting existing season files")
+    mode.add_argument("--append-existing", action="store_true",
+                      help="append to season files the manifest does not know about instead of stopping")
+    args = parser.parse_args(argv)
+
+    manifest_path = args.data_dir / MANIFEST_NAME
+    manifest = new_manifest() if args.restart else load_manifest(manifest_path)
+    writer = SeasonWriter(args.data_dir, manifest, args.compresslevel, overwrite=args.restart,
+                          adopt=args.append_existing, manifest_path=manifest_path)
+    pool = ProcessPoolExecutor(args.workers) if args.workers > 1 else None
+
+    print("🗂️  Splitting play-by-play by season…")
+    try:
+        for src in args.sources:
+            split_source(src, manifest, manifest_path, writer, pool, args.workers,
+                         args.chunksize, args.compresslevel)
+        writer.close()
+        touched = sorted(writer.touched)
+        if args.build_cache and touched:
+            print("🧊 Building column caches…")
+            paths = [str(season_path(args.data_dir, s)) for s in touched]
+            list(pool.map(build_cache, paths) if pool is not None else map(build_cache, paths))
+    finally:
+        writer.close()
+        if pool is not None:
+            pool.shutdown()
+
+    # 4) Report
+    print("✅ Split complete. Files updated:")
+    for season in touched:
+        size_mb = season_path(args.data_dir, season).stat().st_size / 1e6
+        rows = manifest["seasons"][str(season)]["rows"]
+        print(f"  • play_by_play_{season}.csv.gz — {rows:,} rows, {size_mb:.1f} MB")
+    return touched
 
-# 4) Close files and report
-for f in writers.values():
-    f.close()
 
-print("✅ Split complete. Files created:")
-for season in sorted(writers):
-    size_mb = (DATA_DIR / f"play_by_play_{season}.csv.gz").stat().st_size / 1e6
-    print(f"  • play_by_play_{season}.csv.gz — {size_mb:.1f} MB")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
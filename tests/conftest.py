@@ -4,3 +4,27 @@ import sys, os
 root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if root not in sys.path:
     sys.path.insert(0, root)
+
+from types import SimpleNamespace
+
+import pytest
+
+import nba_sim.weights as W
+
+
+@pytest.fixture
+def make_team():
+    """Factory of Team-like objects with `n` identical players, the first five starting."""
+    def make(team_id, fg=0.47, *, three=0.36, prop=0.35, reb=0.08, age=27, n=9, season=2022):
+        players = [SimpleNamespace(name=f"P{team_id}-{i}", age=age, stats={
+            'fg_pct': fg, 'three_pct': three, 'three_prop': prop, 'reb_rate': reb,
+        }) for i in range(n)]
+        return SimpleNamespace(team_id=team_id, season=season, roster=players,
+                               starters=players[:5], bench=players[5:])
+    return make
+
+
+@pytest.fixture
+def no_saved_factors(monkeypatch):
+    """Simulate with the default engine factors, not ones saved by a calibration run."""
+    monkeypatch.setattr(W, 'load', lambda: {})
@@ -0,0 +1,31 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+_BENCH = Path(__file__).resolve().parents[1] / 'benchmarks'
+
+
+def test_harness_runs_on_fixtures_and_compares(tmp_path):
+    out = tmp_path / 'run.json'
+    cmd = [sys.executable, str(_BENCH / 'run.py'), '--fixtures', str(tmp_path / 'data'),
+           '--teams', '4', '--games', '2', '--repeats', '1', '--out', str(out),
+           '--only', 'get_roster', 'team_build', 'simulate_game[100]']
+    subprocess.run(cmd, check=True, capture_output=True)
+    report = json.loads(out.read_text())
+    assert report['meta']['fixtures'] == {'teams': 4, 'games_per_team': 2, 'seed': 0}
+    assert set(report['results']) == {
+        'get_roster[rich,cold]', 'get_roster[rich,warm]', 'get_roster[sparse,cold]',
+        'get_roster[sparse,warm]', 'team_build[rich]', 'team_build[sparse]', 'simulate_game[100]',
+    }
+    assert report['results']['simulate_game[100]']['items_per_s'] > 0
+
+    # A slower head run is flagged
+    slow = json.loads(out.read_text())
+    slow['results']['team_build[rich]']['median_s'] *= 2
+    (tmp_path / 'slow.json').write_text(json.dumps(slow))
+    same = subprocess.run([sys.executable, str(_BENCH / 'run.py'), '--compare', str(out), str(out)])
+    worse = subprocess.run([sys.executable, str(_BENCH / 'run.py'), '--compare', str(out),
+                            str(tmp_path / 'slow.json')], capture_output=True, text=True)
+    assert same.returncode == 0
+    assert worse.returncode == 1 and 'slower' in worse.stdout
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from nba_sim import calibration
+
+
+pytestmark = pytest.mark.usefixtures('no_saved_factors')
+
+
+@pytest.fixture
+def targets():
+    return pd.DataFrame({
+        'game_id': np.arange(6), 'season': 2022,
+        'team_id_home': [1, 2, 1, 2, 1, 2], 'team_id_away': [2, 1, 2, 1, 2, 1],
+        'pts_home': [110, 104, 112, 99, 120, 101], 'pts_away': [101, 108, 95, 112, 100, 107],
+        'tov_home': [13, 15, np.nan, 14, 12, 16], 'tov_away': [14, 12, np.nan, 15, 13, 13],
+    })
+
+
+@pytest.fixture
+def teams(make_team):
+    return {(1, 2022): make_team(1, 0.48), (2, 2022): make_team(2, 0.45)}
+
+
+def test_evaluate_prefers_realistic_factors(targets, teams):
+    prepared = calibration.prepare(targets, teams)
+    realistic = calibration.evaluate(prepared, {}, 32, seed=1)
+    slow = calibration.evaluate(prepared, {'pace': 60.0}, 32, seed=1)
+    assert realistic < slow
+
+
+def test_calibrate_resumes_from_storage(targets, teams, tmp_path):
+    storage = str(tmp_path / 'study.journal')
+    kwargs = dict(workers=1, storage=storage, targets=targets, teams=teams, fidelities=(2, 4))
+    study = calibration.calibrate(6, **kwargs)
+    assert len(study.trials) == 6
+    assert set(study.best_params) == set(calibration.SEARCH_SPACE)
+
+    study = calibration.calibrate(8, **kwargs)
+    assert len(study.trials) == 8
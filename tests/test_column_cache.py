@@ -0,0 +1,78 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from nba_sim.utils import column_cache
+
+
+def _frame():
+    return pd.DataFrame({
+        'game_id': [42200161, 42200161, 42200162],
+        'player1_team_id': [1610612758.0, np.nan, 1610612744.0],
+        'homedescription': ['3PT Jump Shot', None, 'Layup'],
+    })
+
+
+def test_round_trip_matches_read_csv(tmp_path):
+    src = tmp_path / 'events.csv.gz'
+    _frame().to_csv(src, index=False, compression='gzip')
+
+    first = column_cache.read_csv(src, compression='gzip')
+    assert column_cache.is_fresh(src)
+    second = column_cache.read_csv(src, compression='gzip')
+
+    expected = pd.read_csv(src, compression='gzip')
+    for df in (first, second):
+        assert list(df.columns) == list(expected.columns)
+        assert (df['game_id'].to_numpy() == expected['game_id'].to_numpy()).all()
+        assert df['homedescription'].isna().tolist() == [False, True, False]
+        assert df['homedescription'].iloc[0] == '3PT Jump Shot'
+    assert isinstance(second['game_id'].to_numpy(), np.ndarray)
+
+
+def test_projection_reads_only_requested_columns(tmp_path):
+    src = tmp_path / 'events.csv'
+    _frame().to_csv(src, index=False)
+    df = column_cache.read_csv(src, columns=['game_id'])
+    assert list(df.columns) == ['game_id']
+
+
+def test_cache_rebuilds_when_source_changes(tmp_path):
+    src = tmp_path / 'events.csv'
+    _frame().to_csv(src, index=False)
+    column_cache.read_csv(src)
+
+    _frame().head(1).to_csv(src, index=False)
+    st = os.stat(src)
+    os.utime(src, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert not column_cache.is_fresh(src)
+    assert len(column_cache.read_csv(src)) == 1
+
+
+def test_writes_publish_generations_atomically(tmp_path):
+    target = tmp_path / 'cache' / 'events.csv'
+    target.mkdir(parents=True)
+    (target / 'meta.json').write_text('{}')  # flat layout of an older format
+
+    gens = []
+    for n in range(3):
+        column_cache.write(_frame().head(n + 1), target)
+        gens.append(column_cache._generation(target))
+        assert len(column_cache.read(target)) == n + 1
+    assert not (target / 'meta.json').exists()
+    # The replaced generation stays for readers still on it; older ones go
+    assert not gens[0].exists() and gens[1].exists() and gens[2].exists()
+
+
+def test_read_csv_serves_parsed_frame_if_cache_vanishes(tmp_path, monkeypatch):
+    src = tmp_path / 'events.csv'
+    _frame().to_csv(src, index=False)
+    column_cache.read_csv(src)
+
+    def republished(*args, **kwargs):
+        raise FileNotFoundError('generation removed')
+
+    monkeypatch.setattr(column_cache, 'read', republished)
+    df = column_cache.read_csv(src, columns=['game_id'])
+    assert df['game_id'].tolist() == [42200161, 42200161, 42200162]
@@ -0,0 +1,54 @@
+import pandas as pd
+import pytest
+
+import nba_sim.data_csv as data_csv
+
+
+@pytest.fixture
+def tables(monkeypatch):
+    # Set the module globals directly: tables absent on disk must not be loaded
+    monkeypatch.setitem(vars(data_csv), '_team_df', pd.DataFrame({
+        'id': [100, 200], 'full_name': ['Home Team', 'Away Team'], 'abbreviation': ['HOM', 'AWY'],
+    }))
+    monkeypatch.setitem(vars(data_csv), '_common_player_info_df', pd.DataFrame({
+        'person_id': [1, 2, 3, 4],
+        'display_first_last': ['Sam Smith', 'Sam Smith', 'Al Jones', 'Bo Brown'],
+        'team_id': [100, 200, 100, 100],
+        'from_year': [2001, 2010, 2015, None],
+        'to_year': [2008, 2020, 2022, None],
+    }))
+    monkeypatch.setitem(vars(data_csv), '_inactive_players_df', pd.DataFrame({
+        'game_id': [1], 'player_id': [4], 'team_id': [100],
+    }))
+    monkeypatch.setattr(data_csv, 'MIN_ROSTER_SIZE', 0)
+
+
+def test_resolve_team_key_by_id_abbreviation_and_name(tables):
+    assert data_csv._resolve_team_key(100) == 100
+    assert data_csv._resolve_team_key('200') == 200
+    assert data_csv._resolve_team_key('AWY') == 200
+    assert data_csv._resolve_team_key('Home Team') == 100
+    with pytest.raises(KeyError):
+        data_csv._resolve_team_key('XYZ')
+
+
+def test_player_ids_follow_career_intervals(tables):
+    assert data_csv.get_player_id('Sam Smith', 2005) == 1
+    assert data_csv.get_player_id('Sam Smith', 2015) == 2
+    assert data_csv.get_player_ids(['Sam Smith', 'Al Jones', 'Nobody', 'Bo Brown'], 2009) == [None, None, None, None]
+    assert data_csv.get_player_ids(['Al Jones', 'Sam Smith'], 2016) == [3, 2]
+    with pytest.raises(KeyError):
+        data_csv.get_player_id('Sam Smith', 2009)
+
+
+def test_roster_from_indexes(tables):
+    assert data_csv.get_roster('HOM', 2016)['person_id'].tolist() == [3, 4]
+    assert data_csv.get_roster(100, 2003)['person_id'].tolist() == [1, 4]
+
+
+def test_indexes_follow_replaced_tables(tables, monkeypatch):
+    assert data_csv._resolve_team_key('HOM') == 100
+    monkeypatch.setitem(vars(data_csv), '_team_df', pd.DataFrame({
+        'id': [300], 'full_name': ['New Team'], 'abbreviation': ['HOM'],
+    }))
+    assert data_csv._resolve_team_key('HOM') == 300
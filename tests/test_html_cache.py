@@ -0,0 +1,45 @@
+import subprocess
+import sys
+import time
+
+from nba_sim.utils.html_cache import HtmlCache, url_key
+
+
+def test_url_key_is_stable_across_interpreters():
+    code = "from nba_sim.utils.html_cache import url_key; print(url_key('https://x.test/a'))"
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == url_key('https://x.test/a')
+
+
+def test_ttl_and_counters(tmp_path):
+    cache = HtmlCache(tmp_path)
+    assert cache.get('u') is None
+    cache.put('u', '<html>a</html>')
+    assert cache.get('u', ttl_hours=1) == '<html>a</html>'
+    assert cache.get('u', ttl_hours=0) is None
+    assert cache.get_stale('u') == '<html>a</html>'
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['stale_hits'], stats['entries']) == (1, 2, 1, 1)
+    # A second process sees the same entries
+    assert HtmlCache(tmp_path).get('u') == '<html>a</html>'
+
+
+def test_identical_bodies_share_one_blob(tmp_path):
+    cache = HtmlCache(tmp_path)
+    cache.put('a', 'same page')
+    cache.put('b', 'same page')
+    assert len(list((tmp_path / 'blobs').rglob('*.z'))) == 1
+    assert cache.stats()['entries'] == 2
+
+
+def test_lru_eviction_under_byte_budget(tmp_path):
+    cache = HtmlCache(tmp_path)
+    for i in range(4):
+        cache.put(f'u{i}', f'page {i} ' * 50)
+        time.sleep(0.01)
+    cache.get('u0')
+    size = cache.stats()['bytes'] // 4
+    cache.evict(max_bytes=2 * size)
+    assert cache.get('u0') is not None and cache.get('u3') is not None
+    assert cache.get('u1') is None and cache.get('u2') is None
+    assert len(list((tmp_path / 'blobs').rglob('*.z'))) == 2
@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+from nba_sim import possession_engine as engine
+from nba_sim.utils import instrumentation as instr
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch, no_saved_factors):
+    monkeypatch.setattr(instr, '_enabled', False)
+    instr.registry.reset()
+    yield
+    instr.registry.reset()
+
+
+def test_disabled_records_nothing(make_team):
+    engine.simulate_games(make_team(1), make_team(2), 20, seed=1)
+    with instr.timer('x'):
+        instr.count('y')
+    assert instr.registry.snapshot() == {'timers': {}, 'counters': {}}
+
+
+def test_context_manager_records_engine_stages(make_team):
+    with instr.instrument() as reg:
+        engine.simulate_games(make_team(1), make_team(2), 20, seed=1)
+        engine.simulate_game(make_team(1), make_team(2), seed=1)
+    assert not instr.enabled()
+    snap = reg.snapshot()
+    assert snap['counters']['possession_engine.games'] == 21
+    assert snap['counters']['possession_engine.possessions'] > 21 * 150
+    assert snap['counters']['possession_engine.events'] > 0
+    assert snap['timers']['possession_engine.simulate_matchups']['calls'] == 2
+    assert snap['timers']['possession_engine.compile_teams']['calls'] == 2
+
+
+def test_exports(tmp_path):
+    with instr.instrument() as reg:
+        instr.count('data_csv.rows_loaded', 7)
+        with instr.timer('data_csv.load_table'):
+            pass
+
+        @instr.timed()
+        def work():
+            return 3
+        assert work() == 3
+
+    prom = reg.to_prometheus()
+    assert 'nba_sim_data_csv_rows_loaded_total 7' in prom
+    assert 'nba_sim_data_csv_load_table_calls_total 1' in prom
+    assert '# TYPE nba_sim_data_csv_load_table_seconds_max gauge' in prom
+    assert 'nba_sim_test_instrumentation_work_calls_total 1' in prom
+
+    reg.dump(tmp_path / 'metrics.json')
+    data = json.loads((tmp_path / 'metrics.json').read_text())
+    assert data['counters'] == {'data_csv.rows_loaded': 7}
+    assert data['timers']['data_csv.load_table']['calls'] == 1
@@ -0,0 +1,69 @@
+from itertools import combinations
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from nba_sim import lineups
+from nba_sim.team_model import TEAM_MINUTES, TeamArrays
+
+
+def _roster(seed, n=13, out=()):
+    rng = np.random.default_rng(seed)
+    positions = ['Guard', 'Forward', 'Center']
+    players = [SimpleNamespace(
+        name=f'P{i}', position=positions[i % 3], height=75 + i % 10, age=int(rng.integers(20, 36)),
+        status='out' if i in out else 'healthy',
+        stats={'fg_pct': rng.uniform(0.4, 0.55), 'three_pct': rng.uniform(0.3, 0.42),
+               'three_prop': rng.uniform(0.1, 0.5), 'reb_rate': rng.uniform(0.05, 0.2)},
+    ) for i in range(n)]
+    return TeamArrays.from_players(seed, 2022, players)
+
+
+def _brute_force_best(arrays):
+    values = lineups.player_values(arrays)
+    best, best_score = None, -np.inf
+    for unit in combinations(range(len(values)), 5):
+        pos = arrays.position[list(unit)]
+        score = values[list(unit)].sum() - lineups.POSITION_PENALTY * sum(
+            max(0, need - int((pos == code).sum())) for code, need in lineups.POSITION_NEEDS)
+        if score > best_score:
+            best, best_score = unit, score
+    return list(best), best_score
+
+
+def test_best_unit_matches_brute_force():
+    rosters = [_roster(s) for s in range(4)] + [_roster(9, n=8, out=(2,))]
+    plans = lineups.plan_rotations(rosters, k=5)
+    for arrays, plan in zip(rosters, plans):
+        unit, score = _brute_force_best(arrays)
+        assert sorted(plan.starters.tolist()) == unit
+        assert plan.scores[0] == pytest.approx(score)
+        assert (np.diff(plan.scores) <= 0).all()
+    assert 2 not in plans[-1].units
+
+
+def test_minutes_sum_to_team_minutes_within_caps():
+    arrays = _roster(3, out=(0, 4))
+    plan = lineups.plan_rotation(arrays)
+    assert plan.minutes.sum() == pytest.approx(TEAM_MINUTES)
+    assert (plan.minutes <= arrays.minutes_cap + 1e-9).all()
+    assert plan.minutes[[0, 4]].tolist() == [0, 0]
+    assert set(plan.bench) & set(plan.starters) == set()
+
+
+def test_short_roster():
+    plan = lineups.plan_rotation(_roster(1, n=4))
+    assert len(plan.minutes) == 4 and (plan.minutes <= 34).all()
+    assert sorted(plan.starters.tolist()) == [-1, 0, 1, 2, 3]
+
+
+def test_mixed_sizes_score_each_roster_on_its_own_table():
+    rosters = [_roster(s) for s in range(3)] + [_roster(7, n=20), _roster(8, n=4)]
+    lineups.unit_index.cache_clear()
+    plans = lineups.plan_rotations(rosters)
+    assert lineups.unit_index.cache_info().currsize == 3  # 13, 20 and a short roster padded to 5
+    for arrays, plan in zip(rosters, plans):
+        alone = lineups.plan_rotation(arrays)
+        assert (plan.units == alone.units).all()
+        assert plan.minutes == pytest.approx(alone.minutes)
@@ -0,0 +1,91 @@
+import json
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from nba_sim import main
+
+
+pytestmark = pytest.mark.usefixtures('no_saved_factors')
+
+
+@pytest.fixture
+def teams(make_team):
+    return {(1, 2022): make_team(1, 0.52), (2, 2022): make_team(2, 0.42), (3, 2022): make_team(3, 0.47)}
+
+
+def test_load_jobs_json_and_csv(tmp_path):
+    (tmp_path / 'jobs.json').write_text(json.dumps({'jobs': [
+        {'home': 1, 'away': 2, 'season': 2022, 'n_sims': 10, 'home_starters': list('ABCDE')},
+        {'id': 'x', 'home': 2, 'away': 1, 'season': '2022', 'seed': 4},
+    ]}))
+    (tmp_path / 'jobs.csv').write_text(
+        "home,away,season,n_sims,home_starters\n1,2,2022,10,A; B; C; D; E\n")
+    from_json = main.load_jobs(tmp_path / 'jobs.json')
+    from_csv = main.load_jobs(tmp_path / 'jobs.csv')
+    assert from_json[0]['home_starters'] == list('ABCDE') and from_json[0]['away_bench'] is None
+    assert from_json[1]['id'] == 'x' and from_json[1]['n_sims'] == main.N_SIMS and from_json[1]['seed'] == 4
+    assert from_csv[0]['home_starters'] == list('ABCDE') and from_csv[0]['n_sims'] == 10
+    with pytest.raises(ValueError):
+        main._normalize_job({'home': 1, 'season': 2022}, 0)
+    for n_sims in (0, -5, '0'):
+        with pytest.raises(ValueError, match='job 3: n_sims'):
+            main._normalize_job({'home': 1, 'away': 2, 'season': 2022, 'n_sims': n_sims}, 3)
+    with pytest.raises(ValueError, match='job 0: away_starters needs 5'):
+        main._normalize_job({'home': 1, 'away': 2, 'season': 2022, 'away_starters': ['A', 'B']}, 0)
+
+
+def test_run_jobs_aggregates_and_ignores_worker_count(tmp_path, teams):
+    jobs = [main._normalize_job(j, i) for i, j in enumerate([
+        {'home': 1, 'away': 2, 'season': 2022, 'n_sims': 300},
+        {'home': 3, 'away': 1, 'season': 2022, 'n_sims': 120},
+    ])]
+    seen = []
+    serial = main.run_jobs(jobs, 1, seed=5, teams=teams, chunk_games=100)
+    parallel = main.run_jobs(jobs, 2, seed=5, teams=teams, chunk_games=100,
+                             progress=lambda d, n: seen.append((d, n)))
+    for name in ('summary', 'scores', 'players'):
+        pd.testing.assert_frame_equal(serial[name], parallel[name])
+    assert seen[-1] == (420, 420)
+
+    summary = serial['summary'].set_index('job')
+    assert summary.loc['0', 'games'] == 300 and summary.loc['1', 'games'] == 120
+    assert summary.loc['0', 'home_win_pct'] > 0.5
+    scores = serial['scores']
+    assert scores.groupby('job')['games'].sum().tolist() == [300, 120]
+    players = serial['players']
+    home_pts = players[(players.job == '0') & (players.team == 'home')]['points'].sum()
+    assert home_pts == pytest.approx(summary.loc['0', 'home_pts_mean'])
+
+    paths = main.write_results(serial, tmp_path / 'out', 'csv')
+    assert [p.name for p in paths] == ['summary.csv', 'scores.csv', 'players.csv']
+    assert len(pd.read_csv(paths[0])) == 2
+
+
+def test_requested_starters_play_without_a_bench(monkeypatch):
+    from nba_sim import team_model
+
+    def roster(team_id, season):
+        return pd.DataFrame({'display_first_last': [f"T{team_id}-{i}" for i in range(10)]})
+
+    def player(name, season):
+        slot = int(name.split('-')[1])
+        return SimpleNamespace(name=name, position='Guard', height=70 + slot, age=27, status='healthy',
+                               stats={'fg_pct': 0.47, 'three_pct': 0.36, 'three_prop': 0.35, 'reb_rate': 0.08})
+
+    monkeypatch.setattr(team_model, 'get_roster', roster)
+    monkeypatch.setattr(team_model, 'Player', player)
+    monkeypatch.setattr(team_model, 'team_cache', team_model.TeamCache())
+    monkeypatch.setattr(team_model.data_csv, 'data_version', lambda: 0)
+
+    # The automatic lineup would start the tallest players
+    starters = [f"T1-{i}" for i in range(5)]
+    job = main._normalize_job({'home': 1, 'away': 2, 'season': 2022, 'n_sims': 20,
+                               'home_starters': starters}, 0)
+    players = main.run_jobs([job], 1, seed=1)['players']
+    home = players[players.team == 'home'].sort_values('minutes', ascending=False)
+    assert sorted(home['player'].head(5)) == starters
+    assert len(home) == 10
+    with pytest.raises(ValueError):
+        team_model.Team(1, 2022, starters=starters[:4])
@@ -0,0 +1,40 @@
+import numpy as np
+
+from nba_sim.utils import age_curve, fatigue, injury
+
+
+# The scalar definitions the array versions must reproduce exactly
+def _fatigue_reference(minutes_played):
+    excess = max(0, minutes_played - 30)
+    return 1.0 - 0.005 * excess
+
+
+def _age_reference(age):
+    if age <= 22:
+        return 0.85 + 0.03 * (age - 18)
+    if age <= 28:
+        return 1.0
+    return max(0.65, 1.0 - 0.035 * (age - 28))
+
+
+def test_fatigue_matches_scalar_definition():
+    minutes = np.r_[np.arange(0, 61), np.linspace(0.0, 58.0, 997), np.nan]
+    expected = [_fatigue_reference(m) for m in minutes]
+    assert fatigue.fatigue_factors(minutes).tolist() == expected
+    assert [fatigue.fatigue_factor(m) for m in minutes] == expected
+    assert fatigue.fatigue_factor(35) == _fatigue_reference(35)
+
+
+def test_age_matches_scalar_definition():
+    whole = np.arange(0, 80)
+    assert age_curve.age_multipliers(whole).tolist() == [_age_reference(int(a)) for a in whole]
+    assert [age_curve.age_multiplier(int(a)) for a in whole] == [_age_reference(int(a)) for a in whole]
+    fractional = np.r_[np.linspace(17.0, 45.0, 513), np.nan]
+    assert age_curve.age_multipliers(fractional).tolist() == [_age_reference(a) for a in fractional]
+
+
+def test_minutes_caps():
+    statuses = ['out', 'doubtful', 'questionable', 'probable', 'healthy', 'unknown']
+    caps = injury.minutes_caps(injury.status_codes(statuses))
+    assert caps.tolist() == [0, 8, 16, 28, 34, 34]
+    assert [injury.minutes_cap(s) for s in statuses] == caps.tolist()
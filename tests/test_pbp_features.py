@@ -0,0 +1,47 @@
+import pandas as pd
+
+from nba_sim.data_csv import PlayByPlayStore
+from nba_sim.utils import pbp_features
+
+
+def _game(game_id=42200101):
+    # home misses a three, offensive rebound, makes a two (and-one);
+    # visitor turns it over; home team rebound after a visitor miss
+    return pd.DataFrame({
+        'game_id': game_id,
+        'eventmsgtype': [12, 2, 4, 1, 3, 5, 2, 4, 13, 12, 1],
+        'period': [1] * 9 + [2, 2],
+        'pctimestring': ['12:00', '11:40', '11:38', '11:30', '11:30', '11:10', '10:55', '10:53',
+                         '0:00', '12:00', '11:45'],
+        'homedescription': [None, 'MISS Curry 3PT Jump Shot', 'Looney REBOUND', 'Curry Layup',
+                            'Curry Free Throw 1 of 1', None, None, 'Warriors Rebound', None, None, None],
+        'visitordescription': [None, None, None, None, None, 'Fox Turnover', 'MISS Fox Jump Shot',
+                               None, None, None, 'Fox Jump Shot'],
+        'person1type': [0, 4, 4, 4, 4, 5, 5, 2, 0, 0, 5],
+        'player1_id': [0, 201939, 1626172, 201939, 201939, 1628368, 1628368, 1610612744, 0, 0, 1628368],
+        'player1_team_id': [None, 1610612744, 1610612744, 1610612744, 1610612744,
+                            1610612758, 1610612758, None, None, None, 1610612758],
+    })
+
+
+def test_features_of_one_game():
+    df = pbp_features.add_features(_game())
+    assert df['is_three'].tolist() == [False, True] + [False] * 9
+    assert df['shot_made'].tolist() == [False, False, False, True, True, False, False, False, False, False, True]
+    assert df['acting_side'].tolist() == [-1, 0, 0, 0, 0, 1, 1, 0, -1, -1, 1]
+    assert df['acting_team_id'].tolist()[7] == 1610612744
+    assert df['oreb'].tolist()[2] and df['dreb'].tolist()[7]
+    assert not df['dreb'].tolist()[2] and not df['oreb'].tolist()[7]
+    # home 0-4 (and-one included), visitor 5-6, home team rebound 7-8, new period 9-10
+    assert df['possession_id'].tolist() == [0, 0, 0, 0, 0, 1, 1, 2, 2, 3, 3]
+
+
+def test_store_serves_features_without_descriptions(tmp_path):
+    games = pd.concat([_game(42200101), _game(42200102)], ignore_index=True)
+    games.to_csv(tmp_path / 'play_by_play_42022.csv.gz', index=False, compression='gzip')
+    store = PlayByPlayStore(str(tmp_path))
+    df = store.load('42022', ['possession_id', 'clock_seconds', 'is_three'])
+    assert list(df.columns) == ['possession_id', 'clock_seconds', 'is_three']
+    assert df['possession_id'].tolist()[11:] == [0, 0, 0, 0, 0, 1, 1, 2, 2, 3, 3]
+    assert df['clock_seconds'].tolist()[:2] == [720, 700]
+    assert 'homedescription' not in store._frames['42022']['df'].columns
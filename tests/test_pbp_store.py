@@ -0,0 +1,108 @@
+import pandas as pd
+import pytest
+
+import nba_sim.data_csv as data_csv
+from nba_sim.data_csv import PlayByPlayStore, season_key_for_game
+
+
+def _write_season(directory, key, game_ids):
+    rows = []
+    for gid in game_ids:
+        for n in range(3):
+            rows.append({
+                'game_id': gid, 'eventnum': n, 'eventmsgtype': 1 + n % 2, 'period': 1,
+                'homedescription': '3PT Jump Shot' if n == 0 else 'Layup',
+                'visitordescription': None,
+                'player1_id': 10 + n, 'player1_team_id': 100,
+            })
+    path = directory / f"play_by_play_{key}.csv.gz"
+    pd.DataFrame(rows).to_csv(path, index=False, compression='gzip')
+    return path
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    _write_season(tmp_path, '42021', [42100101, 42100102])
+    _write_season(tmp_path, '42022', [42200101])
+    store = PlayByPlayStore(str(tmp_path))
+    monkeypatch.setattr(data_csv, 'pbp_store', store)
+    return store
+
+
+def test_season_key_for_game():
+    assert season_key_for_game(42200161) == '42022'
+    assert season_key_for_game('0049600001') == '41996'
+    assert season_key_for_game('SIM_1_2_2023') is None
+
+
+def test_store_loads_nothing_until_asked(store):
+    assert store.seasons() == ['42021', '42022']
+    assert store.season_keys(2022) == ['42022']
+    assert store.loaded() == []
+
+
+def test_iter_play_by_play_touches_one_season(store):
+    events = list(data_csv.iter_play_by_play(42200101))
+    assert [ev['eventnum'] for ev in events] == [0, 1, 2]
+    assert store.loaded() == ['42022']
+
+
+def test_store_evicts_least_recently_used(store):
+    store.max_bytes = 1
+    store.load('42021')
+    store.load('42022')
+    assert store.loaded() == ['42022']
+
+
+def test_pbp_df_compatibility_view(store):
+    assert len(data_csv.pbp_df) == 9
+
+
+def test_get_play_by_play_batches_games_in_request_order(store):
+    events = data_csv.get_play_by_play([42200101, 42100102, 42100101, 'SIM_1'],
+                                       columns=['game_id', 'eventnum'])
+    assert list(events.columns) == ['game_id', 'eventnum']
+    assert events['game_id'].tolist() == [42200101] * 3 + [42100102] * 3 + [42100101] * 3
+    assert events['eventnum'].tolist()[:3] == [0, 1, 2]
+
+
+def test_index_regroups_interleaved_games(tmp_path):
+    pd.DataFrame({
+        'game_id': [42200102, 42200101, 42200102, 42200101],
+        'eventnum': [1, 1, 2, 2],
+    }).to_csv(tmp_path / 'play_by_play_42022.csv.gz', index=False, compression='gzip')
+    store = PlayByPlayStore(str(tmp_path))
+    assert store.game_ids('42022').tolist() == [42200101, 42200102]
+    assert store.events('42022', [42200102])['eventnum'].tolist() == [1, 2]
+
+
+def test_compact_schema_and_descriptions_on_request(store):
+    df = store.load('42021')
+    assert 'homedescription' not in df.columns
+    assert df['game_id'].dtype == 'int32'
+    assert df['eventmsgtype'].dtype == 'int8'
+    assert df['player1_id'].dtype == 'int32'
+    assert store.load('42021', descriptions=True)['homedescription'].tolist()[:2] == ['3PT Jump Shot', 'Layup']
+    # The iterator serves whole events, text included
+    assert next(data_csv.iter_play_by_play(42200101))['homedescription'] == '3PT Jump Shot'
+
+
+def test_store_reads_only_requested_columns(store):
+    assert list(store.load('42022', ['eventnum']).columns) == ['eventnum']
+    assert list(store._frames['42022']['df'].columns) == ['game_id', 'eventnum']
+    assert store.load('42022', ['period', 'eventnum'])['period'].tolist() == [1, 1, 1]
+    assert list(store._frames['42022']['df'].columns) == ['game_id', 'eventnum', 'period']
+
+
+def test_compact_pbp_keeps_values():
+    raw = pd.DataFrame({
+        'game_id': [42200101, 42200101], 'pctimestring': ['11:42', None],
+        'player1_team_id': [1610612744.0, None], 'player1_name': ['Stephen Curry', None],
+        'homedescription': ['Curry 3PT Jump Shot', None],
+    })
+    df = data_csv.compact_pbp(raw)
+    assert df['clock_seconds'].tolist() == [702, -1]
+    assert df['player1_team_id'].dtype == 'Int32'
+    assert df['player1_team_id'].tolist()[0] == 1610612744 and df['player1_team_id'].isna().tolist()[1]
+    assert df['player1_name'].dtype == 'category'
+    assert df['homedescription'].tolist()[0] == 'Curry 3PT Jump Shot'
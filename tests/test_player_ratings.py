@@ -0,0 +1,52 @@
+import pandas as pd
+import pytest
+
+from nba_sim.data_csv import PlayByPlayStore
+from nba_sim.utils import player_ratings
+from nba_sim.utils.player_ratings import DEFAULTS, PlayerRatings
+
+
+def _events(game_id, season_id):
+    # player 7: 3 FGA (2 made, one of them a three), 1 missed three, 2 rebounds
+    return pd.DataFrame({
+        'game_id': [game_id] * 6,
+        'eventmsgtype': [1, 1, 2, 2, 4, 4],
+        'period': [1, 2, 3, 4, 4, 4],
+        'player1_id': [7, 7, 7, 7, 7, 7],
+        'homedescription': ['Jump Shot', '3PT Jump Shot', 'MISS 3PT Jump Shot', 'MISS Layup', None, None],
+        'visitordescription': [None] * 6,
+        'season_id': [season_id] * 6,
+    })
+
+
+@pytest.fixture
+def store(tmp_path):
+    _events(42200101, 42022).to_csv(tmp_path / 'play_by_play_42022.csv.gz', index=False, compression='gzip')
+    return PlayByPlayStore(str(tmp_path))
+
+
+def test_ratings_from_one_pass(store):
+    stats = PlayerRatings(store).get(7, 2022)
+    assert stats['fg_pct'] == pytest.approx(2 / 4)
+    assert stats['three_pct'] == pytest.approx(1 / 2)
+    assert stats['three_prop'] == pytest.approx(2 / 4)
+    assert stats['reb_rate'] == pytest.approx(2 / 1 / 100)
+
+
+def test_unknown_player_gets_defaults(store):
+    assert PlayerRatings(store).get(999, 2022) == DEFAULTS
+
+
+def test_new_season_file_only_builds_its_partition(store, tmp_path, monkeypatch):
+    PlayerRatings(store).table()
+
+    _events(12200101, 12022).to_csv(tmp_path / 'play_by_play_12022.csv.gz', index=False, compression='gzip')
+    store.clear()
+    built = []
+    real = player_ratings.season_counts
+    monkeypatch.setattr(player_ratings, 'season_counts',
+                        lambda pbp, season: built.append(season) or real(pbp, season))
+
+    ratings = PlayerRatings(store)
+    assert ratings.counts([2022])['fga'].tolist() == [8]
+    assert built == [2022]
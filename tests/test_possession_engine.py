@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from nba_sim import possession_engine as engine
+
+
+pytestmark = pytest.mark.usefixtures('no_saved_factors')
+
+
+def test_batch_scores_are_realistic(make_team):
+    batch = engine.simulate_games(make_team(1), make_team(2), 2000, seed=1)
+    assert batch.n_games == 2000
+    total = batch.home_score + batch.away_score
+    assert 170 < total.mean() < 250
+    assert (batch.margin != 0).all(), "overtime must settle ties"
+    assert (batch.stats['points'].sum(axis=2) == np.stack([batch.home_score, batch.away_score], 1)).all()
+
+
+def test_same_seed_same_games(make_team):
+    a = engine.simulate_games(make_team(1), make_team(2), 50, seed=7)
+    b = engine.simulate_games(make_team(1), make_team(2), 50, seed=7)
+    assert (a.home_score == b.home_score).all() and (a.away_score == b.away_score).all()
+
+
+def test_better_shooters_win_more(make_team):
+    strong = make_team(1, fg=0.55, three=0.42)
+    weak = make_team(2, fg=0.40, three=0.30)
+    assert engine.win_probability(strong, weak, 2000, seed=3) > 0.8
+
+
+def test_simulate_game_returns_box_score_and_log(make_team):
+    box, pbp = engine.simulate_game(make_team(1), make_team(2), seed=5)
+    assert set(box['team']) == {'home', 'away'}
+    final = pbp.iloc[-1]
+    home_pts = box.loc[box['team'] == 'home', 'points'].sum()
+    assert final['home_score'] == home_pts
+    assert pbp['period'].min() == 1 and pbp['period'].max() >= 4
+
+
+def test_streamed_events_match_batch_log(make_team):
+    streamed = list(engine.iter_game_events(make_team(1), make_team(2), seed=5))
+    _, pbp = engine.simulate_game(make_team(1), make_team(2), seed=5)
+    assert len(streamed) == len(pbp)
+    assert streamed[-1]['home_score'] == pbp.iloc[-1]['home_score']
+
+
+def test_chunked_sink_keeps_every_event(tmp_path, make_team):
+    from nba_sim.utils.event_sinks import ArraySink, ChunkedFileSink, read_events
+
+    in_memory = ArraySink(capacity=8)
+    engine.simulate_games(make_team(1), make_team(2), 20, seed=2, on_event=in_memory)
+    with ChunkedFileSink(tmp_path, chunk_rows=1000) as sink:
+        for i in range(2):
+            sink.game_offset = 20 * i
+            engine.simulate_games(make_team(1), make_team(2), 20, seed=2, on_event=sink)
+    on_disk = read_events(tmp_path)
+    assert len(sink.paths) > 1
+    assert len(on_disk) == 2 * in_memory.size
+    assert on_disk['game'].max() == 39
+    assert (on_disk['points'][:in_memory.size].to_numpy() == in_memory.arrays()['points']).all()
+
+
+def test_events_stay_within_played_periods(make_team):
+    from nba_sim.utils.event_sinks import ArraySink
+
+    sink = ArraySink(capacity=512)
+    batch = engine.simulate_games(make_team(1), make_team(2), 200, seed=11, on_event=sink)
+    events = sink.arrays()
+    period, remaining = engine._game_clock(events['clock'])
+    last = np.zeros(batch.n_games, dtype=int)
+    np.maximum.at(last, events['game'], period)
+    assert (last == 4 + batch.overtimes).all()
+    assert (remaining >= 0).all()
+
+
+def test_chunked_sink_numbers_after_the_highest_part(tmp_path):
+    from nba_sim.utils.event_sinks import ChunkedFileSink, read_events
+
+    def events(game):
+        return {'game': np.full(2, game), 'clock': np.zeros(2), 'team': np.zeros(2, np.int8),
+                'slot': np.zeros(2, np.int8), 'event': np.zeros(2, np.int8), 'points': np.zeros(2, np.int8),
+                'home_score': np.zeros(2, np.int16), 'away_score': np.zeros(2, np.int16)}
+
+    for game in range(3):
+        with ChunkedFileSink(tmp_path) as sink:
+            sink.write(events(game))
+    (tmp_path / 'part-00001.npz').unlink()
+    with ChunkedFileSink(tmp_path) as sink:
+        sink.write(events(3))
+    assert sink.paths == [tmp_path / 'part-00003.npz']
+    assert read_events(tmp_path)['game'].tolist() == [0, 0, 2, 2, 3, 3]
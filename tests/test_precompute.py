@@ -0,0 +1,57 @@
+import dataclasses
+
+import pandas as pd
+import pytest
+
+from nba_sim.data_csv import PlayByPlayStore
+from nba_sim.utils import precompute
+from nba_sim.utils.precompute import GAMES, PBP_ROSTERS, PrecomputeStore
+
+
+def _write_season(directory, key, game_id, team_id=1610612744):
+    pd.DataFrame({
+        'game_id': [game_id] * 3,
+        'eventmsgtype': [1, 2, 1],
+        'period': [1, 1, 2],
+        'score': ['0 - 2', None, '3 - 2'],
+        'homedescription': ['Jump Shot', 'MISS Layup', None],
+        'visitordescription': [None, None, '3PT Jump Shot'],
+        'person1type': [4, 4, 5],
+        'player1_id': [7, 8, 9],
+        'player1_team_id': [team_id, team_id, 1610612758],
+    }).to_csv(directory / f"play_by_play_{key}.csv.gz", index=False, compression='gzip')
+
+
+@pytest.fixture
+def store(tmp_path):
+    _write_season(tmp_path, '22021', 22100001)
+    _write_season(tmp_path, '22022', 22200001)
+    return PlayByPlayStore(str(tmp_path))
+
+
+def test_refresh_rebuilds_only_new_or_changed_files(store, tmp_path):
+    rebuilt = PrecomputeStore(store).refresh([GAMES, PBP_ROSTERS], workers=1)
+    assert rebuilt == {'games': ['22021', '22022'], 'pbp_rosters': ['22021', '22022']}
+    assert PrecomputeStore(store).refresh([GAMES, PBP_ROSTERS], workers=1) == {'games': [], 'pbp_rosters': []}
+
+    _write_season(tmp_path, '42022', 42200001, team_id=1610612747)
+    store.clear()
+    pre = PrecomputeStore(store)
+    assert pre.refresh([GAMES, PBP_ROSTERS], workers=1) == {'games': ['42022'], 'pbp_rosters': ['42022']}
+
+    games = pre.aggregate(GAMES)
+    assert games['game_id'].tolist() == [22100001, 22200001, 42200001]
+    assert games[['pts_home', 'pts_away']].values.tolist() == [[2, 3]] * 3
+    rosters = pre.partitions(PBP_ROSTERS, [2022]).set_index(['team_id', 'player_id'])['games']
+    assert rosters.to_dict() == {(1610612744, 7): 1, (1610612744, 8): 1, (1610612747, 7): 1,
+                                 (1610612747, 8): 1, (1610612758, 9): 2}
+
+
+def test_code_version_bump_rebuilds(store, monkeypatch):
+    PrecomputeStore(store).refresh([GAMES], workers=1)
+    bumped = dataclasses.replace(GAMES, version=GAMES.version + 1)
+    monkeypatch.setitem(precompute.ARTIFACTS, 'games', bumped)
+    pre = PrecomputeStore(store)
+    assert pre.stale(GAMES) == []
+    assert pre.stale(bumped) == ['22021', '22022']
+    assert pre.manifest()['games']['partitions'] == {'22021': False, '22022': False}
@@ -0,0 +1,86 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from nba_sim.utils import injury, scraping
+from nba_sim.utils.html_cache import HtmlCache
+
+_STATUS_PAGE = "<table><tr><td>Status</td><td>{}</td></tr></table>"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+        time.sleep(0.05)
+        if self.path.startswith('/missing'):
+            body, code = b'', 404
+        elif self.path.startswith('/name/'):
+            status = {'lebron-james': 'Out', 'jane-doe': 'Day-To-Day'}.get(self.path[6:], '')
+            body, code = _STATUS_PAGE.format(status).encode() if status else b'<p>ok</p>', 200
+        else:
+            body, code = f"page {self.path}".encode(), 200
+        self.send_response(code)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        with cls.lock:
+            cls.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    _Handler.peak = 0
+    monkeypatch.setattr(scraping, '_cache', HtmlCache(tmp_path))
+    monkeypatch.setattr(scraping, 'rate_limiter', scraping.HostRateLimiter(rate=1000, burst=100))
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+
+
+def test_fetch_many_keeps_order_and_bounds_concurrency(server):
+    urls = [f"{server}/p{i}" for i in range(12)] + [f"{server}/p0", f"{server}/missing"]
+    pages = scraping.fetch_many(urls, max_workers=4)
+    assert pages[:12] == [f"page /p{i}" for i in range(12)]
+    assert pages[12] == pages[0] and pages[13] == ''
+    assert 1 < _Handler.peak <= 4
+
+
+def test_token_bucket_limits_per_host(server):
+    scraping.rate_limiter.set_rate(server.split('//')[1], rate=20, burst=1)
+    start = time.monotonic()
+    scraping.fetch_many([f"{server}/r{i}" for i in range(6)], max_workers=6)
+    assert time.monotonic() - start >= 5 / 20
+
+
+def test_get_statuses(server, monkeypatch):
+    monkeypatch.setattr(injury, 'PLAYER_URL', server + '/name/{slug}')
+    statuses = injury.get_statuses(['LeBron James', 'Jane Doe', 'Nobody Here'])
+    assert statuses == {'LeBron James': 'out', 'Jane Doe': 'probable', 'Nobody Here': 'healthy'}
+
+
+def test_fetch_url_serves_cache_and_stale_fallback(server, monkeypatch):
+    url = f"{server}/cached"
+    assert scraping.fetch_url(url) == "page /cached"
+    assert scraping.fetch_url(url) == "page /cached"
+    assert scraping.cache().stats()['hits'] == 1
+
+    def offline(*args, **kwargs):
+        raise scraping.requests.exceptions.ConnectionError("offline")
+
+    monkeypatch.setattr(scraping, 'get', offline)
+    assert scraping.fetch_url(url, ttl_hours=0) == "page /cached"
+    assert scraping.fetch_url(f"{server}/never") == ""
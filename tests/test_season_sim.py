@@ -0,0 +1,38 @@
+from itertools import permutations
+
+import pandas as pd
+import pytest
+
+from nba_sim.season_sim import _bracket_order, simulate_season
+
+
+@pytest.fixture
+def league(make_team, no_saved_factors):
+    teams = {tid: make_team(tid, fg, three=0.35, n=8)
+             for tid, fg in [(1, 0.55), (2, 0.47), (3, 0.46), (4, 0.38)]}
+    schedule = pd.DataFrame(list(permutations(teams, 2)), columns=['team_id_home', 'team_id_away'])
+    return teams, schedule
+
+
+def test_bracket_order():
+    assert _bracket_order(8).tolist() == [0, 7, 3, 4, 1, 6, 2, 5]
+
+
+def test_odds_are_consistent(league):
+    teams, schedule = league
+    odds = simulate_season(2022, 24, workers=1, seed=3, teams=teams, schedule=schedule,
+                           playoff_teams=4, chunk_runs=8)
+    assert odds['title_pct'].sum() == pytest.approx(1.0)
+    assert odds['finals_pct'].sum() == pytest.approx(2.0)
+    assert odds['mean_wins'].sum() == pytest.approx(len(schedule))
+    assert odds.iloc[0]['team_id'] == 1
+
+
+def test_results_do_not_depend_on_worker_count(league):
+    teams, schedule = league
+    kw = dict(seed=11, teams=teams, schedule=schedule, playoff_teams=2, chunk_runs=4)
+    seen = []
+    serial = simulate_season(2022, 12, workers=1, **kw)
+    parallel = simulate_season(2022, 12, workers=2, progress=lambda d, n: seen.append(d), **kw)
+    pd.testing.assert_frame_equal(serial, parallel)
+    assert seen[-1] == 12
@@ -0,0 +1,113 @@
+import importlib.util
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+_SCRIPT = Path(__file__).resolve().parents[1] / 'scripts' / 'split_play_by_play_by_season.py'
+
+
+@pytest.fixture(scope='module')
+def split():
+    spec = importlib.util.spec_from_file_location('split_play_by_play_by_season', _SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _dump(path, game_ids):
+    pd.DataFrame({
+        'game_id': [g for g in game_ids for _ in range(3)],
+        'eventnum': list(range(3)) * len(game_ids),
+        'homedescription': ['Jump Shot', '', 'Rebound'] * len(game_ids),
+        'player1_id': ['203932', '', '1628'] * len(game_ids),
+    }).to_csv(path, index=False, compression='gzip')
+    return path
+
+
+def test_season_ids(split):
+    assert split.season_ids([22200001, 49600001, 12100005]).tolist() == [22022, 41996, 12021]
+
+
+def test_split_resume_and_append(split, tmp_path):
+    src = _dump(tmp_path / 'raw.csv.gz', [22200001, 42200101, 22200002])
+    args = ['--data-dir', str(tmp_path), '--workers', '1', '--chunksize', '4']
+    assert split.main([str(src), *args]) == [22022, 42022]
+
+    season = pd.read_csv(tmp_path / 'play_by_play_22022.csv.gz', dtype=str, keep_default_na=False)
+    assert season['game_id'].tolist() == ['22200001'] * 3 + ['22200002'] * 3
+    assert season['player1_id'].tolist()[:3] == ['203932', '', '1628']
+    assert set(season['season_id']) == {'22022'}
+
+    # Already split: nothing to do
+    assert split.main([str(src), *args]) == []
+
+    # Simulate an interruption after the first chunk: files hold more than the manifest says
+    manifest_path = tmp_path / split.MANIFEST_NAME
+    manifest = split.load_manifest(manifest_path)
+    state = manifest['sources'][str(src.resolve())]
+    state.update(chunks=1, rows=4, complete=False)
+    manifest['seasons'] = {'22022': {'bytes': 0, 'rows': 0}}
+    first = split.new_manifest()
+    first['columns'] = manifest['columns']
+    writer = split.SeasonWriter(tmp_path, first, 6, overwrite=True)
+    writer.write(split.compress_chunk(pd.read_csv(src, dtype=str, keep_default_na=False, nrows=4),
+                                      manifest['columns'], 6))
+    writer.commit()
+    writer.close()
+    manifest['seasons'] = first['seasons']
+    split.save_manifest(manifest_path, manifest)
+    with open(tmp_path / 'play_by_play_22022.csv.gz', 'ab') as fh:
+        fh.write(b'partial member from the interrupted run')
+
+    split.main([str(src), *args])
+    resumed = pd.read_csv(tmp_path / 'play_by_play_22022.csv.gz', dtype=str, keep_default_na=False)
+    assert resumed.equals(season)
+
+    # A new dump appends to the existing season files
+    new = _dump(tmp_path / 'raw2.csv.gz', [22200003])
+    assert split.main([str(new), *args]) == [22022]
+    appended = pd.read_csv(tmp_path / 'play_by_play_22022.csv.gz')
+    assert appended['game_id'].tolist()[-3:] == [22200003] * 3
+    assert split.load_manifest(manifest_path)['seasons']['22022']['rows'] == 9
+
+
+def test_unrecorded_season_file_needs_opt_in(split, tmp_path):
+    # A season file split before the manifest existed
+    args = ['--data-dir', str(tmp_path), '--workers', '1']
+    split.main([str(_dump(tmp_path / 'old.csv.gz', [22200001])), *args])
+    (tmp_path / split.MANIFEST_NAME).unlink()
+
+    new = _dump(tmp_path / 'new.csv.gz', [22200002])
+    with pytest.raises(SystemExit, match='--append-existing'):
+        split.main([str(new), *args])
+    assert pd.read_csv(tmp_path / 'play_by_play_22022.csv.gz')['game_id'].tolist() == [22200001] * 3
+
+    assert not (tmp_path / split.MANIFEST_NAME).exists()
+    split.main([str(new), *args, '--append-existing'])
+    season = pd.read_csv(tmp_path / 'play_by_play_22022.csv.gz')
+    assert season['game_id'].tolist() == [22200001] * 3 + [22200002] * 3
+    assert split.load_manifest(tmp_path / split.MANIFEST_NAME)['seasons']['22022']['rows'] == 6
+
+    # --restart rewrites it from the given dump only
+    split.main([str(new), *args, '--restart'])
+    assert pd.read_csv(tmp_path / 'play_by_play_22022.csv.gz')['game_id'].tolist() == [22200002] * 3
+
+
+def test_crash_before_manifest_save_is_not_replayed(split, tmp_path, monkeypatch):
+    src = _dump(tmp_path / 'raw.csv.gz', [22200001, 22200002])
+    args = ['--data-dir', str(tmp_path), '--workers', '1']
+
+    # The chunk reaches the season file, then the run dies before the manifest is saved
+    def crash(self):
+        raise KeyboardInterrupt
+
+    with monkeypatch.context() as m:
+        m.setattr(split.SeasonWriter, 'commit', crash)
+        with pytest.raises(KeyboardInterrupt):
+            split.main([str(src), *args])
+    assert split.load_manifest(tmp_path / split.MANIFEST_NAME)['seasons']['22022']['rows'] == 0
+
+    assert split.main([str(src), *args]) == [22022]
+    season = pd.read_csv(tmp_path / 'play_by_play_22022.csv.gz')
+    assert season['game_id'].tolist() == [22200001] * 3 + [22200002] * 3
@@ -0,0 +1,83 @@
+import sqlite3
+import threading
+
+import pytest
+
+from nba_sim.utils.stats_utils import StatsProvider
+
+
+@pytest.fixture
+def provider(tmp_path):
+    db = tmp_path / 'nba.sqlite'
+    con = sqlite3.connect(db)
+    con.execute('CREATE TABLE play_by_play (game_id INT, season_id INT, eventmsgtype INT, player1_id INT)')
+    con.executemany('INSERT INTO play_by_play VALUES (?, ?, ?, ?)', [
+        (1, 22022, 4, 10), (1, 22022, 4, 10), (2, 22022, 1, 10),
+        (3, 22021, 4, 10),
+        (1, 22022, 4, 20),
+    ])
+    con.commit()
+    con.close()
+    p = StatsProvider(db)
+    yield p
+    p.close()
+
+
+def test_get_many_one_query_per_roster(provider):
+    df = provider.get_many([10, 20, 30], season=2022)
+    assert df.loc[10, 'rebs'] == 2 and df.loc[10, 'games'] == 2
+    assert df.loc[10, 'reb_rate'] == pytest.approx(2 / 2 / 100)
+    assert df.loc[30, 'reb_rate'] == 0.15
+
+
+def test_rebounding_respects_season(provider):
+    assert provider.get_player_rebounding(10, 2021)['reb_rate'] == pytest.approx(0.01)
+
+
+def test_covering_index_built_by_setup_only(provider):
+    def indexes():
+        return {row[1] for row in provider._connect().execute("PRAGMA index_list('play_by_play')")}
+
+    provider.get_many([10], 2022)
+    assert 'idx_pbp_player_season_msg' not in indexes()
+    provider.build_index()
+    provider.close()
+    assert 'idx_pbp_player_season_msg' in indexes()
+    assert provider.get_many([10], 2022).loc[10, 'rebs'] == 2
+
+
+def test_missing_db_is_not_created(tmp_path):
+    db = tmp_path / 'nba.sqlite'
+    with pytest.raises(FileNotFoundError):
+        StatsProvider(db).get_many([10], 2022)
+    assert not db.exists()
+
+
+def test_one_connection_per_thread(provider):
+    seen = []
+    t = threading.Thread(target=lambda: seen.append(provider._connect()))
+    t.start()
+    t.join()
+    assert seen[0] is not provider._connect()
+    assert provider._connect() is provider._connect()
+
+
+def test_rebounds_count_types_4_and_5(provider):
+    con = sqlite3.connect(provider.db_path)
+    con.execute('INSERT INTO play_by_play VALUES (4, 22022, 5, 20)')
+    con.commit()
+    con.close()
+    assert provider.get_many([20], 2022).loc[20, 'rebs'] == 2
+
+
+def test_season_filter_without_season_id_warns(tmp_path):
+    db = tmp_path / 'nba.sqlite'
+    con = sqlite3.connect(db)
+    con.execute('CREATE TABLE play_by_play (game_id INT, eventmsgtype INT, player1_id INT)')
+    con.executemany('INSERT INTO play_by_play VALUES (?, ?, ?)', [(1, 4, 10), (2, 4, 10)])
+    con.commit()
+    con.close()
+    p = StatsProvider(db)
+    with pytest.warns(RuntimeWarning, match='no season_id'):
+        assert p.get_many([10], 2022).loc[10, 'rebs'] == 2
+    p.close()
@@ -0,0 +1,51 @@
+import pandas as pd
+
+from nba_sim.data_csv import PlayByPlayStore, compact_pbp
+from nba_sim.utils import stints
+from nba_sim.utils.pbp_features import add_features
+from nba_sim.utils.stints import Stints
+
+HOME = [1, 2, 3, 4, 5]
+AWAY = [11, 12, 13, 14, 15]
+
+
+def _event(msg, clock, p1=(0, 0), p2=(0, 0), desc=None, period=1):
+    # p = (person type, player id); home players are type 4, visitors 5
+    home = desc if p1[0] == 4 else None
+    return {'game_id': 42200101, 'period': period, 'eventmsgtype': msg, 'pctimestring': clock,
+            'homedescription': home, 'visitordescription': desc if home is None else None,
+            'person1type': p1[0], 'player1_id': p1[1], 'person2type': p2[0], 'player2_id': p2[1],
+            'person3type': 0, 'player3_id': 0}
+
+
+def _game():
+    events = [_event(12, '12:00')]
+    # Every starter shows up before the first substitution, except player 5 who is subbed out
+    events += [_event(2, '11:50', (4, p), desc='MISS Jump Shot') for p in HOME[:4]]
+    events += [_event(1, '11:00', (5, p), desc='Jump Shot') for p in AWAY]
+    events += [
+        _event(8, '6:00', (4, 5), (4, 6), desc='SUB: 6 FOR 5'),
+        _event(1, '5:00', (4, 6), desc='3PT Jump Shot'),
+        _event(13, '0:00'),
+    ]
+    return pd.DataFrame(events)
+
+
+def test_stints_of_one_period():
+    table = stints.season_stints(add_features(compact_pbp(_game())))
+    assert table[['stint', 'start', 'end']].values.tolist() == [[0, 0, 360], [1, 360, 720]]
+    assert table[stints.HOME_COLUMNS].values.tolist() == [[1, 2, 3, 4, 5], [1, 2, 3, 4, 6]]
+    assert table[stints.AWAY_COLUMNS].values.tolist() == [AWAY, AWAY]
+    assert table['plus_minus'].tolist() == [-10, 3]
+
+    minutes = stints.player_minutes(table).set_index('player_id')
+    assert minutes.loc[5, 'seconds'] == 360 and minutes.loc[6, 'plus_minus'] == 3
+    assert minutes.loc[11, 'seconds'] == 720 and minutes.loc[11, 'plus_minus'] == 7
+
+
+def test_tables_are_cached_per_season_file(tmp_path):
+    _game().to_csv(tmp_path / 'play_by_play_42022.csv.gz', index=False, compression='gzip')
+    store = PlayByPlayStore(str(tmp_path))
+    assert Stints(store).build(workers=1) == ['42022']
+    assert Stints(store).build(workers=1) == []
+    assert len(Stints(store).table([2022])) == 2
@@ -0,0 +1,124 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from nba_sim.team_model import TEAM_MINUTES, TeamArrays
+from nba_sim.utils.roster_utils import CENTER, FORWARD, GUARD, assign_lineup, lineup_slots
+
+
+def _player(name, position=None, height=None, status='healthy'):
+    return SimpleNamespace(name=name, position=position, height=height, status=status, age=27,
+                           stats={'fg_pct': 0.46, 'three_pct': 0.36, 'three_prop': 0.3, 'reb_rate': 0.1})
+
+
+def test_lineup_slots_fills_positions_then_height():
+    positions = [GUARD, GUARD, GUARD, FORWARD, FORWARD, FORWARD, CENTER, -1]
+    heights = [74, 76, 75, 80, 79, 81, 84, 90]
+    starters, bench = lineup_slots(positions, heights)
+    assert starters.tolist() == [6, 5, 3, 1, 2]
+    assert bench.tolist() == [0, 4, 7]
+
+
+def test_assign_lineup_maps_listed_positions():
+    roster = [_player('A', 'Guard', 75), _player('B', 'Center-Forward', 83),
+              _player('C', 'Forward', 80), _player('D', 'Guard-Forward', 77),
+              _player('E', 'Forward', 79), _player('F', None, None)]
+    starters, bench = assign_lineup(roster)
+    assert [p.name for p in starters] == ['B', 'C', 'E', 'D', 'A']
+    assert [p.name for p in bench] == ['F']
+
+
+def test_team_arrays_columns_by_slot():
+    roster = [_player(f'P{i}', 'Guard', 70 + i) for i in range(10)]
+    roster[3].status = 'out'
+    arrays = TeamArrays.from_players(1, 2022, roster, starters=[0, 1, 2, 3, 4], bench=[5, 6, 7])
+    assert len(arrays) == 10 and arrays.player(3) is roster[3]
+    assert arrays.minutes[3] == 0 and (arrays.minutes[[8, 9]] == 0).all()
+    assert arrays.minutes.sum() == pytest.approx(TEAM_MINUTES)
+    assert np.allclose(arrays.two_pct, (0.46 - 0.3 * 0.36) / 0.7)
+    with pytest.raises(ValueError):
+        arrays.fg_pct[0] = 1.0
+
+
+def test_team_arrays_from_team_like_object():
+    roster = [_player(f'P{i}') for i in range(7)]
+    team = SimpleNamespace(team_id=2, season=2022, roster=roster, starters=roster[2:7], bench=roster[:2])
+    arrays = TeamArrays.from_team(team)
+    assert arrays.starters.tolist() == [2, 3, 4, 5, 6]
+    assert arrays.names == [p.name for p in roster]
+
+
+def test_team_cache_reuses_and_invalidates_on_data_change(monkeypatch):
+    from nba_sim import team_model
+
+    built, version, reloads = [], [1], []
+    monkeypatch.setattr(team_model, 'Team', lambda *a, **kw: built.append(a) or object())
+    monkeypatch.setattr(team_model.data_csv, 'data_version', lambda: version[0])
+    monkeypatch.setattr(team_model.data_csv, 'reload_tables', lambda: reloads.append(1))
+    cache = team_model.TeamCache(max_size=2, check_interval=0)
+
+    first = cache.get(1, 2022, ['A'], ['B'])
+    assert cache.get(1, 2022, ['A'], ['B']) is first
+    assert cache.get(1, 2022) is not first
+    cache.get(2, 2022)
+    assert len(cache) == 2 and (cache.hits, cache.misses) == (1, 3)
+
+    version[0] = 2
+    cache.get(2, 2022)
+    assert reloads and len(built) == 4 and len(cache) == 1
+
+
+def test_team_cache_checks_data_files_on_a_timer(monkeypatch):
+    from nba_sim import team_model
+
+    checks = []
+    monkeypatch.setattr(team_model, 'Team', lambda *a, **kw: object())
+    monkeypatch.setattr(team_model.data_csv, 'data_version', lambda: checks.append(1) or 1)
+    cache = team_model.TeamCache(check_interval=60)
+    for _ in range(5):
+        cache.get(1, 2022)
+    assert len(checks) == 1
+
+
+def test_team_cache_builds_different_teams_in_parallel(monkeypatch):
+    import threading
+    from nba_sim import team_model
+
+    both = threading.Barrier(2, timeout=5)
+    built = []
+
+    def build(team_id, season, **kw):
+        both.wait()  # only returns once the other team's build has started too
+        built.append(team_id)
+        return object()
+
+    monkeypatch.setattr(team_model, 'Team', build)
+    monkeypatch.setattr(team_model.data_csv, 'data_version', lambda: 1)
+    cache = team_model.TeamCache()
+    threads = [threading.Thread(target=cache.get, args=(t, 2022)) for t in (1, 2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(built) == [1, 2] and len(cache) == 2
+
+
+def test_assigning_starters_and_bench_updates_arrays(monkeypatch):
+    import pandas as pd
+    from nba_sim import team_model
+
+    monkeypatch.setattr(team_model, 'get_roster',
+                        lambda team_id, season: pd.DataFrame({'display_first_last': [f'P{i}' for i in range(9)]}))
+    monkeypatch.setattr(team_model, 'Player', lambda name, season: _player(name, 'Guard', 70 + int(name[1:])))
+    team = team_model.Team(1, 2022)
+    roster = team.roster
+
+    team.starters = roster[:5]
+    assert team.arrays.starters.tolist() == [0, 1, 2, 3, 4]
+    assert not set(team.arrays.bench.tolist()) & {0, 1, 2, 3, 4}
+    team.bench = [roster[5], roster[0]]
+    assert [p.name for p in team.starters] == ['P1', 'P2', 'P3', 'P4']
+    assert team.arrays.bench.tolist() == [5, 0]
+    assert (team.arrays.minutes[[6, 7, 8]] == 0).all()
+    assert team.arrays.minutes.sum() == pytest.approx(TEAM_MINUTES)